@@ -0,0 +1,133 @@
+"""
+Affiliation-to-country matching: all institute names and country keywords
+are compiled into one Aho-Corasick automaton, and the match with the lowest
+priority (earliest in the lookup order) wins.
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton returning the best-priority pattern found in a text.
+
+    Parameters:
+    - patterns: Iterable of (pattern, priority, value) tuples; when several
+      patterns occur in a text the one with the lowest priority is reported
+    """
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.best = [None]  # (priority, value) of the best pattern ending at each node
+        self.empty_match = None
+
+        for pattern, priority, value in patterns:
+            if not pattern:
+                # An empty pattern is contained in every text
+                if self.empty_match is None or priority < self.empty_match[0]:
+                    self.empty_match = (priority, value)
+                continue
+
+            node = 0
+            for char in pattern:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                node = next_node
+
+            if self.best[node] is None or priority < self.best[node][0]:
+                self.best[node] = (priority, value)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and inherited best matches"""
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+
+                # A node also matches everything its failure state matches
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited[0] < self.best[child][0]):
+                    self.best[child] = inherited
+
+    def search(self, text):
+        """
+        Return (priority, value) of the best pattern contained in text, or None.
+        """
+        goto = self.goto
+        fail = self.fail
+        best_at = self.best
+        best = self.empty_match
+        node = 0
+
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            candidate = best_at[node]
+            if candidate is not None and (best is None or candidate[0] < best[0]):
+                best = candidate
+
+        return best
+
+
+class CountryMatcher:
+    """
+    Compiled affiliation-to-country lookup used by extract_country.
+
+    Parameters:
+    - institute_country_db: Institute -> country mapping, checked in dict order
+    - country_keywords: Country -> list of keywords, checked in dict order
+    - extra_mappings: Further institute -> country mappings, checked after the
+      database and before the keywords (in the given order)
+    """
+
+    def __init__(self, institute_country_db, country_keywords, extra_mappings=()):
+        # Exact "..., <keyword>" suffix lookup; the first country listing a keyword wins
+        self.last_part_country = {}
+        for country, keywords in country_keywords.items():
+            for keyword in keywords:
+                self.last_part_country.setdefault(keyword.upper(), country)
+
+        patterns = []
+        priority = 0
+        for mapping in [institute_country_db] + list(extra_mappings):
+            for institute, country in mapping.items():
+                patterns.append((institute.upper(), priority, country))
+                priority += 1
+
+        # All keywords of one country share a priority, matching the per-country any() scan
+        for country, keywords in country_keywords.items():
+            for keyword in keywords:
+                patterns.append((keyword.upper(), priority, country))
+            priority += 1
+
+        self.automaton = AhoCorasick(patterns)
+
+    def match_last_part(self, affiliation):
+        """Return the country named by the last comma-separated part, or None"""
+        if ',' not in affiliation:
+            return None
+        last_part = affiliation.split(',')[-1].strip()
+        return self.last_part_country.get(last_part.upper())
+
+    def match(self, affiliation):
+        """Return the country of the best institute or keyword found in affiliation, or None"""
+        found = self.automaton.search(affiliation.upper())
+        return found[1] if found else None
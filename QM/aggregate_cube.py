@@ -0,0 +1,272 @@
+"""
+AggregateCube: talk counts per (year, talk type, country, institute), from
+which the country, region, diversity and institute figures are sliced.
+build_aggregate_cube saves it per dataset version and reloads it.
+"""
+
+import json
+import os
+from collections import Counter
+
+from lazy_imports import lazy_module
+from processing_manifest import hash_files
+from talk_table import TALK_TYPES, TalkTable, _categorical, count_talks, talks_to_table
+
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
+
+CUBE_FILE = "data/processed/aggregate_cube.csv"
+CUBE_FORMAT_VERSION = 1
+
+CUBE_DIMENSIONS = ['Year', 'Talk_Type', 'Country', 'Institute']
+
+# Modules that decide which country and institute a talk is counted under
+# (relative to this file)
+CODE_FILES = ['analyze_conference_data.py', 'talk_table.py', 'institute_names.py', 'aggregate_cube.py']
+
+_CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _metadata_file(cube_file):
+    return os.path.splitext(cube_file)[0] + '.json'
+
+
+def dataset_version(data_files):
+    """
+    Version of an analysis dataset: hash of the files the talks were loaded
+    from and of the code that counts them.
+    """
+    return hash_files(list(data_files) + [os.path.join(_CODE_DIR, name) for name in CODE_FILES])
+
+
+def _marginal(cells, column, exclude=()):
+    """Counter of column value -> talks, in order of first appearance"""
+    # cells are sorted by first talk, so unsorted groups come out in first-seen order
+    totals = cells.groupby(column, observed=True, sort=False)['Talks'].sum()
+    return Counter({value: int(count) for value, count in totals.items() if value not in exclude})
+
+
+class AggregateCube:
+    """
+    Talk counts by year, talk type, country and normalised institute.
+
+    Parameters:
+    - cells: DataFrame with one row per occurring combination: categorical
+      Year, Talk_Type, Country and Institute (NaN when the talks have no
+      institute), Talks (number of talks) and First (index of the first
+      talk), sorted by First
+    - years: All years of the dataset, including years without talks
+    - talk_types: Talk types the cube was built from
+    """
+
+    def __init__(self, cells, years, talk_types):
+        self.cells = cells
+        self.years = list(years)
+        self.talk_types = list(talk_types)
+
+    @classmethod
+    def from_talk_table(cls, table):
+        """Aggregate a TalkTable"""
+        frame = table.frame
+        codes = [frame[column].cat.codes.to_numpy().astype(np.int64) + 1 for column in CUBE_DIMENSIONS]
+        shape = [len(frame[column].cat.categories) + 1 for column in CUBE_DIMENSIONS]
+
+        # One integer per combination; code 0 stands for a missing value
+        keys = np.ravel_multi_index(codes, shape) if len(frame) else np.zeros(0, dtype=np.int64)
+        keys, first, talks = np.unique(keys, return_index=True, return_counts=True)
+        order = np.argsort(first, kind='stable')
+        cell_codes = np.unravel_index(keys[order], shape)
+
+        cells = pd.DataFrame({
+            column: pd.Categorical.from_codes(cell_codes[i] - 1, categories=frame[column].cat.categories)
+            for i, column in enumerate(CUBE_DIMENSIONS)
+        })
+        cells['Talks'] = talks[order].astype(np.int64)
+        cells['First'] = first[order].astype(np.int64)
+        return cls(cells, table.years, table.talk_types)
+
+    def __len__(self):
+        """Number of talks in the cube"""
+        return int(self.cells['Talks'].sum())
+
+    @property
+    def institutes(self):
+        """Normalised institutes, in order of first appearance"""
+        return list(self.cells['Institute'].cat.categories)
+
+    def select(self, year=None, talk_type=None, country=None):
+        """Cells of one year, talk type and/or country"""
+        mask = None
+        for column, value in (('Year', year), ('Talk_Type', talk_type), ('Country', country)):
+            if value is not None:
+                condition = self.cells[column] == value
+                mask = condition if mask is None else mask & condition
+        return self.cells if mask is None else self.cells[mask]
+
+    def talk_count(self, year=None, talk_type=None):
+        """Number of selected talks"""
+        return int(self.select(year, talk_type)['Talks'].sum())
+
+    def country_counts(self, year=None, talk_type=None):
+        """Counter of known countries for the selected talks"""
+        return _marginal(self.select(year, talk_type), 'Country', exclude=('Unknown',))
+
+    def institute_counts(self, year=None, talk_type=None):
+        """Counter of normalised institutes for the selected talks (talks without one are skipped)"""
+        return _marginal(self.select(year, talk_type), 'Institute')
+
+    def missing_institutes(self, year=None, talk_type=None):
+        """Number of selected talks without institute information"""
+        cells = self.select(year, talk_type)
+        return int(cells.loc[cells['Institute'].isna(), 'Talks'].sum())
+
+    def pivot(self, index, columns, year=None, talk_type=None):
+        """
+        Talk counts of the selected cells with one row per value of index and
+        one column per value of columns (both cube dimensions).
+        """
+        cells = self.select(year, talk_type)
+        return cells.pivot_table(index=index, columns=columns, values='Talks', aggfunc='sum',
+                                 observed=True, sort=False, fill_value=0)
+
+    def _by_year(self, column):
+        """DataFrame of talk counts with one row per year and one column per category of column"""
+        years = self.cells['Year'].cat.categories
+        categories = self.cells[column].cat.categories
+        year_codes = self.cells['Year'].cat.codes.to_numpy().astype(np.int64)
+        codes = self.cells[column].cat.codes.to_numpy()
+        talks = self.cells['Talks'].to_numpy()
+
+        known = codes >= 0
+        flat = year_codes[known] * len(categories) + codes[known]
+        counts = np.bincount(flat, weights=talks[known], minlength=len(years) * len(categories))
+        return pd.DataFrame(counts.astype(np.int64).reshape(len(years), len(categories)),
+                            index=years, columns=categories)
+
+    def country_by_year(self, countries=None, years=None):
+        """
+        Talk counts per year for the given countries (all known ones if None).
+
+        Returns:
+        - DataFrame indexed by year with one column per country
+        """
+        years = self.years if years is None else years
+        table = self._by_year('Country')
+        if countries is None:
+            countries = [country for country in table.columns if country != 'Unknown']
+        return table.reindex(index=years, columns=countries, fill_value=0)
+
+    def institute_by_year(self, institutes=None, years=None):
+        """Talk counts per year for the given institutes (all if None), as a DataFrame indexed by year"""
+        years = self.years if years is None else years
+        table = self._by_year('Institute')
+        if institutes is None:
+            institutes = list(table.columns)
+        return table.reindex(index=years, columns=institutes, fill_value=0)
+
+    def hhi_by_year(self, years=None):
+        """
+        Number of known countries and Herfindahl-Hirschman index (x 10000) per year.
+
+        Returns:
+        - Tuple of (unique countries by year, HHI by year) dictionaries
+        """
+        years = self.years if years is None else years
+        counts = self.country_by_year(years=years).to_numpy(dtype=float)
+        totals = counts.sum(axis=1)
+        shares = np.divide(counts, totals[:, None], out=np.zeros_like(counts), where=totals[:, None] > 0)
+
+        unique_countries = dict(zip(years, (counts > 0).sum(axis=1).tolist()))
+        hhi_by_year = dict(zip(years, ((shares ** 2).sum(axis=1) * 10000).tolist()))
+        return unique_countries, hhi_by_year
+
+    def save(self, cube_file=CUBE_FILE, version=None):
+        """Write the cells as CSV and the years, talk types and version next to them"""
+        os.makedirs(os.path.dirname(cube_file) or '.', exist_ok=True)
+        metadata_file = _metadata_file(cube_file)
+        suffix = f".tmp{os.getpid()}"
+
+        self.cells.to_csv(cube_file + suffix, index=False)
+        with open(metadata_file + suffix, 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': CUBE_FORMAT_VERSION,
+                'dataset_version': version,
+                'years': self.years,
+                'talk_types': self.talk_types,
+                'talks': len(self)
+            }, f, indent=2)
+
+        os.replace(cube_file + suffix, cube_file)
+        os.replace(metadata_file + suffix, metadata_file)
+
+    @classmethod
+    def load(cls, cube_file=CUBE_FILE, version=None):
+        """
+        Read a saved cube.
+
+        Returns:
+        - AggregateCube, or None if the files are missing, unreadable or were
+          saved for another dataset version
+        """
+        try:
+            with open(_metadata_file(cube_file), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            if metadata.get('format') != CUBE_FORMAT_VERSION or metadata.get('dataset_version') != version:
+                return None
+
+            # Country codes such as 'NA' must stay strings; only empty institutes are missing
+            cells = pd.read_csv(cube_file, dtype={column: str for column in CUBE_DIMENSIONS},
+                                keep_default_na=False, na_values={'Institute': ['']})
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Could not read aggregate cube {cube_file}: {e}")
+            return None
+
+        cells['Year'] = pd.Categorical(cells['Year'], categories=metadata['years'])
+        cells['Talk_Type'] = pd.Categorical(cells['Talk_Type'], categories=metadata['talk_types'])
+        cells['Country'] = _categorical(cells['Country'].tolist())
+        cells['Institute'] = _categorical(cells['Institute'].where(cells['Institute'].notna(), None).tolist())
+        cube = cls(cells, metadata['years'], metadata['talk_types'])
+
+        if len(cube) != metadata.get('talks'):
+            print(f"Aggregate cube {cube_file} is incomplete; rebuilding it")
+            return None
+        return cube
+
+
+def cube_from_talks(talks):
+    """Build an AggregateCube from a plain list of talks"""
+    return AggregateCube.from_talk_table(talks_to_table(talks))
+
+
+def build_aggregate_cube(conference_data, version=None, talk_types=TALK_TYPES, cube_file=CUBE_FILE):
+    """
+    Build the AggregateCube of conference_data.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk type -> list of talks
+    - version: Dataset version of conference_data (see dataset_version); if
+      given, the cube saved for that version is loaded, or the new cube is
+      saved for it
+    - talk_types: Talk types to include
+    - cube_file: File the cube is saved to
+    """
+    talk_types = list(talk_types)
+    cube = None
+    if version is not None:
+        cube = AggregateCube.load(cube_file, version)
+        if cube is not None and (cube.talk_types != talk_types
+                                 or len(cube) != count_talks(conference_data, talk_types)):
+            cube = None
+        if cube is not None:
+            print(f"Loaded aggregate cube from {cube_file}")
+
+    if cube is None:
+        cube = AggregateCube.from_talk_table(TalkTable(conference_data, talk_types))
+        if version is not None:
+            try:
+                cube.save(cube_file, version)
+                print(f"Saved aggregate cube with {len(cube.cells)} cells to {cube_file}")
+            except OSError as e:
+                print(f"Could not save aggregate cube to {cube_file}: {e}")
+    return cube
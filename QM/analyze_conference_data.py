@@ -1,40 +1,47 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter
+import argparse
 import os
 import json
-from wordcloud import WordCloud
-import matplotlib.gridspec as gridspec
 import csv
 import re
 import traceback
 import datetime
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from matplotlib.colors import LinearSegmentedColormap
 from collections import defaultdict
-
-# Only keep the font settings needed for plots
-plt.rcParams.update({
-    'font.size': 13,
-    'axes.titlesize': 'large',
-    'axes.labelsize': 'medium',
-    'xtick.labelsize': 'medium',
-    'ytick.labelsize': 'medium',
-    'legend.fontsize': 'medium',
-    'figure.titlesize': 'x-large'
-})
-
-# Set font that supports CJK characters
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'DejaVu Sans', 'Microsoft YaHei']
-plt.rcParams['axes.unicode_minus'] = False
-
-# Create directories if they don't exist
-os.makedirs('data', exist_ok=True)
-os.makedirs('figures', exist_ok=True)
+from lazy_imports import lazy_module
+from institute_names import canonical_institute_name as normalize_institute_name
+from keyword_index import KeywordIndex
+from talk_tokens import get_talk_tokens, is_valid_keyword
+from gender_estimation import estimate_genders, gender_counts, gender_coverage, get_gender_estimator
+from topic_classifier import DETECTORS, EXPERIMENT_KEYWORDS, PHYSICS_CATEGORIES, THEORY_KEYWORDS, TopicMatrix
+from aggregate_cube import AggregateCube, build_aggregate_cube, cube_from_talks, dataset_version
+from processed_store import STORE_DIR as TALK_STORE_DIR, have_talk_store_support, load_talk_store, talk_store_exists, talk_store_files
+from figure_scheduler import FigureTask, render_figures
+from talk_table import count_talks
+from participant_files import PARTICIPANTS_DIR, PARTICIPANTS_FILE, iter_participants, load_participant_counts
+from tracing import configure_logging, export_trace, log, stage
+
+def configure_plot_style(plt):
+    """Apply the plot style; called when matplotlib.pyplot is first used"""
+    # Only keep the font settings needed for plots
+    plt.rcParams.update({
+        'font.size': 13,
+        'axes.titlesize': 'large',
+        'axes.labelsize': 'medium',
+        'xtick.labelsize': 'medium',
+        'ytick.labelsize': 'medium',
+        'legend.fontsize': 'medium',
+        'figure.titlesize': 'x-large'
+    })
+    
+    # Set font that supports CJK characters
+    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'DejaVu Sans', 'Microsoft YaHei']
+    plt.rcParams['axes.unicode_minus'] = False
+
+# Plotting and data stacks are imported the first time they are used (see lazy_imports)
+plt = lazy_module('matplotlib.pyplot', on_import=configure_plot_style)
+gridspec = lazy_module('matplotlib.gridspec')
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
 
 # Conference locations for reference
 CONFERENCE_LOCATIONS = {
@@ -62,7 +69,7 @@ def load_processed_data(base_dir='data/processed'):
             return None
             
         # Get all year directories
-        year_dirs = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
+        year_dirs = [d for d in os.listdir(base_dir) if d.isdigit() and os.path.isdir(os.path.join(base_dir, d))]
         
         for year in sorted(year_dirs):
             year_path = os.path.join(base_dir, year)
@@ -100,9 +107,24 @@ def load_participant_data():
     Returns:
     - Dictionary mapping years to participant counts
     """
+    participants_by_year = load_participant_counts()
+    if participants_by_year is not None:
+        return participants_by_year
     participants_by_year = {}
     
-    # First try to load from JSON file
+    # Without the count sidecar, count the newline-delimited participant list
+    ndjson_path = os.path.join(PARTICIPANTS_DIR, PARTICIPANTS_FILE)
+    if os.path.exists(ndjson_path):
+        try:
+            for participant in iter_participants(ndjson_path):
+                year = str(participant.get('year', ''))
+                participants_by_year[year] = participants_by_year.get(year, 0) + 1
+            return participants_by_year
+        except Exception as e:
+            print(f"Error loading participant data from {ndjson_path}: {e}")
+            participants_by_year = {}
+    
+    # Participant lists written by older versions of fetch_participants.py
     json_path = "data/participants/all_participants.json"
     if os.path.exists(json_path):
         try:
@@ -185,11 +207,11 @@ def update_speaker_info_from_participant_data(conference_data, participant_data)
                                 'country': country
                             })
             
-            print(f"Created {len(participant_data[year])} participant entries for year {year}")
+            log.debug("Created %d participant entries for year %s", len(participant_data[year]), year)
     
     # Now build the mapping from all participant data
     for year, participants in participant_data.items():
-        print(f"  Processing participant data for {year}...")
+        log.debug("  Processing participant data for %s...", year)
         for participant in participants:
             name = participant.get('name', '')
             if name:
@@ -241,7 +263,7 @@ def update_speaker_info_from_participant_data(conference_data, participant_data)
                                 if talk.get('Institute', '') == 'Unknown' and participant_map[participant_name]['Institute']:
                                     talk['Institute'] = participant_map[participant_name]['Institute']
                                     updated_institute_count += 1
-                                    print(f"Fuzzy matched: '{speaker}' with '{participant_name}'")
+                                    log.debug("Fuzzy matched: '%s' with '%s'", speaker, participant_name)
                                 
                                 # Update country if unknown
                                 if talk.get('Country', '') == 'Unknown' and participant_map[participant_name]['Country']:
@@ -942,11 +964,11 @@ def filter_relevant_talk_types(conference_data):
         
         # Remove other talk types if they exist
         if 'flash_talks' in data:
-            print(f"  Removed {len(data['flash_talks'])} flash talks from QM{year}")
+            log.debug("  Removed %d flash talks from QM%s", len(data['flash_talks']), year)
             del data['flash_talks']
         
         if 'other_talks' in data:
-            print(f"  Removed {len(data['other_talks'])} other talks from QM{year}")
+            log.debug("  Removed %d other talks from QM%s", len(data['other_talks']), year)
             del data['other_talks']
     
     return conference_data
@@ -1316,21 +1338,6 @@ def create_representation_ratio_plot(plenary_country, parallel_country):
 
 def extract_keywords_from_talk(talk):
     """Extract keywords from a talk using multiple potential formats"""
-    # Define the same stopwords as in fetch_and_analyze_conferences.py
-    stopwords = set(['and', 'the', 'in', 'of', 'for', 'on', 'with', 'at', 'from', 'by', 
-                    'to', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-                    'have', 'has', 'had', 'do', 'does', 'did', 'but', 'or', 'as', 'if',
-                    'then', 'else', 'when', 'up', 'down', 'conference', 'study', 'analysis',
-                    'measurement', 'results', 'data', 'using', 'via', 'new', 'recent',
-                    'quark', 'matter', 'qm', 'physics', 'collision', 'collisions', 'ion', 'ions',
-                    'heavy', 'experiment', 'experimental', 'theory', 'theoretical', 'model', 'models'])
-    
-    # Additional filter function matching fetch_and_analyze_conferences.py
-    def is_valid_keyword(word):
-        return (word.lower() not in stopwords 
-                and len(word) > 2  # Skip very short words
-                and not word.isdigit())  # Skip pure numbers
-    
     # Try various possible keyword fields
     if 'Keywords' in talk and talk['Keywords']:
         # Filter keywords from the Keywords field
@@ -1361,54 +1368,19 @@ def extract_keywords_from_talk(talk):
             return [talk['Topic']]
         return []
     
-    # If no explicit keywords, try to extract from title
+    # If no explicit keywords, take words and bigrams of the title; title and
+    # abstract are tokenised once per talk (see talk_tokens)
     if 'Title' in talk and talk['Title']:
-        title = talk['Title']
-        
-        # Simple tokenization without NLTK
-        # Remove punctuation and convert to lowercase
-        title = re.sub(r'[^\w\s]', ' ', title.lower())
-        
-        # Simple tokenization by splitting on whitespace
-        tokens = title.split()
-        
-        # Filter out stopwords, short words, and pure digits
-        keywords = [word for word in tokens if is_valid_keyword(word)]
-        
-        # Also try to extract multi-word phrases that might be keywords
-        # For bigrams (two-word phrases)
-        bigrams = []
-        for i in range(len(tokens) - 1):
-            # At least one part should not be a stopword
-            if not (tokens[i].lower() in stopwords and tokens[i+1].lower() in stopwords):
-                bigram = f"{tokens[i]} {tokens[i+1]}"
-                # Both parts should be valid independently
-                if is_valid_keyword(tokens[i]) or is_valid_keyword(tokens[i+1]):
-                    bigrams.append(bigram)
-        
-        # Combine individual keywords and bigrams
-        potential_keywords = keywords + bigrams
-        
-        # Return the extracted keywords if we found any
-        if potential_keywords:
-            return potential_keywords
+        return list(get_talk_tokens(talk).title_keywords)
     
-    # If still no keywords, try abstract as last resort
+    # If still no keywords, try a keywords section of the abstract as last resort
     elif 'Abstract' in talk and talk['Abstract']:
-        abstract = talk['Abstract']
-        if isinstance(abstract, str):
-            # Try to extract a keywords section first
-            keyword_section = re.search(r'keywords?:?\s*(.*?)(?:\.|$)', abstract.lower())
-            if keyword_section:
-                # Split by common separators
-                keywords = [k.strip() for k in re.split(r'[,;]', keyword_section.group(1))]
-                # Filter using same criteria
-                return [k for k in keywords if k and is_valid_keyword(k)]
+        return list(get_talk_tokens(talk).abstract_keywords)
     
     # No keywords found
     return []
 
-def create_keywords_plot(conference_data):
+def create_keywords_plot(conference_data, title_index=None):
     """Create visualization of keyword trends over conference years"""
     print("Creating keywords visualization...")
     
@@ -1419,33 +1391,20 @@ def create_keywords_plot(conference_data):
             years.append(str(year))
     years.sort(key=int)  # Sort numerically
     
-    # Extract keywords from talk titles for each year
+    # Define common keywords to track
+    keywords = [
+        'qgp', 'flow', 'jet', 'heavy flavor', 'quarkonia', 'photon', 
+        'dilepton', 'small system', 'high-pt', 'lhc', 'rhic', 'alice', 
+        'cms', 'atlas', 'star', 'phenix'
+    ]
+    
+    # Count the talks mentioning each keyword in their title, for each year
+    if title_index is None:
+        title_index = KeywordIndex(conference_data)
     keywords_by_year = {}
     
     for year in years:
-        # Get all talk titles for this year
-        titles = []
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                titles.extend([talk.get('Title', '') for talk in conference_data[year][talk_type]])
-        
-        # Analyze keywords in titles
-        text = ' '.join([t.lower() for t in titles if t])
-        
-        # Define common keywords to track
-        keywords = [
-            'qgp', 'flow', 'jet', 'heavy flavor', 'quarkonia', 'photon', 
-            'dilepton', 'small system', 'high-pt', 'lhc', 'rhic', 'alice', 
-            'cms', 'atlas', 'star', 'phenix'
-        ]
-        
-        # Count keywords
-        year_counts = {}
-        for keyword in keywords:
-            year_counts[keyword] = text.count(keyword)
-        
-        keywords_by_year[year] = year_counts
+        keywords_by_year[year] = {keyword: title_index.count(year, keyword) for keyword in keywords}
     
     # Create visualization
     plt.figure(figsize=(14, 10))
@@ -1472,7 +1431,7 @@ def create_keywords_plot(conference_data):
     plt.legend(loc='best', fontsize=12)
     plt.title('Keyword Trends Across QM Conferences', fontsize=16)
     plt.xlabel('Conference Year', fontsize=14)
-    plt.ylabel('Frequency', fontsize=14)
+    plt.ylabel('Number of Talks', fontsize=14)
     plt.grid(True, linestyle='--', alpha=0.7)
     plt.tight_layout()
     
@@ -1577,7 +1536,7 @@ def create_representation_ratio_plot(plenary_country, parallel_country):
     plt.savefig('figures/representation_ratio_by_year.pdf')
     plt.close()
 
-def create_regional_diversity_plot(country_counts, conference_data):
+def create_regional_diversity_plot(country_counts, conference_data, cube=None):
     """Create visualization showing regional diversity over time"""
     print("Creating regional diversity visualization...")
     
@@ -1606,18 +1565,12 @@ def create_regional_diversity_plot(country_counts, conference_data):
     # Calculate regional percentages by year
     regional_percentages = {region: [] for region in regions}
     other_percentages = []
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
     
     for year in years:
-        data = conference_data[year]
-        year_country_counts = Counter()
-        
         # Count countries for all talk types
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in data:
-                for talk in data[talk_type]:
-                    country = talk.get('Country', 'Unknown')
-                    if country != 'Unknown':
-                        year_country_counts[country] += 1
+        year_country_counts = cube.country_counts(year=year)
         
         # Skip years with no data
         if sum(year_country_counts.values()) == 0:
@@ -1664,24 +1617,19 @@ def create_regional_diversity_plot(country_counts, conference_data):
     plt.savefig('figures/regional_diversity_by_year.pdf')
     plt.close()
 
-def create_regional_diversity_by_year(years, conference_data, regions):
+def create_regional_diversity_by_year(years, conference_data, regions, cube=None):
     """Create plot showing regional diversity by year"""
     print("Creating regional diversity by year visualization...")
     
     # Calculate regional distribution by year
     region_by_year = {region: [] for region in regions.keys()}
     region_by_year['Other'] = []  # Ensure 'Other' category exists
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
     
     for year in years:
         # Collect country counts for this year
-        year_country_counts = Counter()
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    country = talk.get('Country', 'Unknown')
-                    if country != 'Unknown':
-                        year_country_counts[country] += 1
+        year_country_counts = cube.country_counts(year=year)
         
         # Calculate regional distribution
         year_region_counts = Counter()
@@ -1723,45 +1671,27 @@ def create_regional_diversity_by_year(years, conference_data, regions):
     plt.savefig('figures/regional_diversity_by_year.pdf')
     plt.close()
 
-def plot_talks_by_institute(talks, title, filename):
+def plot_talks_by_institute(talks, title, filename, talk_type=None):
     """
     Create a bar chart showing the top institutes by number of talks.
     
     Parameters:
-    - talks: List of talk data
+    - talks: List of talk data, or an AggregateCube
     - title: Title for the plot
     - filename: Filename to save the plot
+    - talk_type: Only count talks of this type (AggregateCube only)
     """
     print(f"Creating institute visualization for {title}...")
     
-    # Count talks by institute
-    institute_counts = Counter()
+    if not isinstance(talks, AggregateCube):
+        talks = cube_from_talks(talks)
     
-    # Tracking for debugging
-    missing_institute_count = 0
+    # Count talks by (normalized) institute; talks without one are tracked for debugging
+    institute_counts = talks.institute_counts(talk_type=talk_type)
+    missing_institute_count = talks.missing_institutes(talk_type=talk_type)
     
-    # Check for different field names that might contain institute information
-    for talk in talks:
-        institute = None
-        
-        # Try different possible field names for institute information
-        for field in ['Institute', 'Affiliation', 'institution', 'affiliation']:
-            if field in talk and talk[field] and talk[field] != 'Unknown':
-                institute = talk[field]
-                break
-        
-        # Clean up institute name if needed
-        if institute:
-            # Normalize the institute name
-            institute = normalize_institute_name(institute)
-            
-            # Add to counts
-            institute_counts[institute] += 1
-        else:
-            missing_institute_count += 1
-    
-    print(f"  Found {len(institute_counts)} unique institutes for {sum(institute_counts.values())} talks")
-    print(f"  {missing_institute_count} talks were missing institute information")
+    log.debug("  Found %d unique institutes for %d talks", len(institute_counts), sum(institute_counts.values()))
+    log.debug("  %d talks were missing institute information", missing_institute_count)
     
     # Check if we found any institutes
     if not institute_counts:
@@ -1775,8 +1705,7 @@ def plot_talks_by_institute(talks, title, filename):
     # Get top institutes (limit to 25 for readability)
     top_institutes = institute_counts.most_common(25)
     
-    # Debug print to see what we found
-    print(f"  Top 5 institutes: {top_institutes[:5]}")
+    log.debug("  Top 5 institutes: %s", top_institutes[:5])
     
     # Prepare data for horizontal bar chart
     institutes = []
@@ -1816,98 +1745,19 @@ def plot_talks_by_institute(talks, title, filename):
     plt.savefig(f'figures/{filename}')
     plt.close()
 
-def normalize_institute_name(name):
-    """
-    Normalize institute names to group similar entries.
-    
-    Parameters:
-    - name: Raw institute name
-    
-    Returns:
-    - Normalized institute name
-    """
-    # Convert to string if not already
-    if not isinstance(name, str):
-        return "Unknown"
-    
-    # Convert to lowercase for case-insensitive comparison
-    normalized = name.lower()
-    
-    # Remove common appendages and punctuation
-    for pattern in [', inc.', ', ltd.', ', llc', ', gmbh', ', corp', ', corporation', 
-                    ' incorporated', ' limited', ' corporation', ' university']:
-        normalized = normalized.replace(pattern.lower(), '')
-    
-    # Normalize common abbreviations
-    abbr_map = {
-        'univ': 'university',
-        'inst': 'institute',
-        'lab': 'laboratory',
-        'natl': 'national',
-        'dept': 'department',
-        'coll': 'college',
-        'tech': 'technology',
-        'sci': 'science',
-        'phys': 'physics',
-        'sch': 'school',
-        'assoc': 'association',
-        'res': 'research',
-        'acad': 'academy',
-        'center': 'centre',  # Standardize US/UK spelling
-        'center': 'centre'
-    }
-    
-    # Apply abbreviation normalization
-    for abbr, full in abbr_map.items():
-        # Look for the abbreviation as a standalone word
-        normalized = re.sub(r'\b' + abbr + r'\b', full, normalized)
-        # Also replace when followed by a period
-        normalized = normalized.replace(abbr + '.', full)
-    
-    # Special cases for major institutions
-    institution_map = {
-        'mit': 'Massachusetts Institute of Technology',
-        'lbl': 'Lawrence Berkeley National Laboratory',
-        'cern': 'CERN',
-        'ornl': 'Oak Ridge National Laboratory',
-        'bnl': 'Brookhaven National Laboratory',
-        'jlab': 'Jefferson Laboratory',
-        'fnal': 'Fermi National Accelerator Laboratory',
-        'lanl': 'Los Alamos National Laboratory',
-        'pnnl': 'Pacific Northwest National Laboratory',
-        'slac': 'SLAC National Accelerator Laboratory'
-    }
-    
-    # Check for major institution names
-    for abbr, full in institution_map.items():
-        if abbr == normalized or abbr + ' ' in normalized or ' ' + abbr in normalized:
-            return full
-    
-    # Capitalize properly and return
-    words = normalized.split()
-    if words:
-        return ' '.join(word.capitalize() for word in words)
-    else:
-        return "Unknown"
-
-def analyze_institute_diversity(conference_data):
+def analyze_institute_diversity(conference_data, cube=None):
     """Analyze institute diversity across conferences"""
     print("Analyzing institute diversity...")
     
-    # Extract all years (including 2025)
-    years = sorted([year for year in conference_data.keys()])
+    # Talk counts of all years (including 2025) by institute and talk type
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
     
     # Create aggregate visualization for all talk types combined
     try:
-        all_talks = []
-        for year in years:
-            for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-                if talk_type in conference_data[year]:
-                    all_talks.extend(conference_data[year][talk_type])
-        
-        if all_talks:
+        if len(cube):
             plot_talks_by_institute(
-                all_talks,
+                cube,
                 "All Talks",
                 "all_institutes.pdf"
             )
@@ -1918,18 +1768,13 @@ def analyze_institute_diversity(conference_data):
     # Create visualizations for individual talk types (without yearly breakdowns)
     for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
         try:
-            # Collect all talks of this type across years
-            all_talks = []
-            for year in years:
-                if talk_type in conference_data[year]:
-                    all_talks.extend(conference_data[year][talk_type])
-            
             # Create visualization for all years combined
-            if all_talks:
+            if cube.talk_count(talk_type=talk_type):
                 plot_talks_by_institute(
-                    all_talks,
+                    cube,
                     f"All Years {talk_type.replace('_', ' ').title()}",
-                    f"all_years_{talk_type}_by_institute.pdf"
+                    f"all_years_{talk_type}_by_institute.pdf",
+                    talk_type=talk_type
                 )
             
         except Exception as e:
@@ -1973,26 +1818,14 @@ def debug_data_structure(conference_data):
     
     print("===== END DEBUGGING =====\n")
 
-def analyze_country_distribution(conference_data):
+def analyze_country_distribution(conference_data, cube=None):
     """Analyze country distribution across conferences"""
     print("Analyzing country distribution...")
     
     # Get all countries across all years
-    country_counts = Counter()
-    
-    for year, data in conference_data.items():
-        year_country_counts = Counter()
-        
-        # Count countries for each talk type
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in data:
-                for talk in data[talk_type]:
-                    country = talk.get('Country', 'Unknown')
-                    if country != 'Unknown':
-                        year_country_counts[country] += 1
-        
-        # Update overall counts
-        country_counts.update(year_country_counts)
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
+    country_counts = cube.country_counts()
     
     # Create plot
     plt.figure(figsize=(12, 8))
@@ -2038,16 +1871,12 @@ def analyze_country_distribution(conference_data):
     # Create custom legend elements
     legend_elements = []
     
+    # Talk counts per year for the tracked countries
+    counts_by_year = cube.country_by_year(top_countries_to_track, years)
+    
     # For each country, use consistent marker style
     for i, country in enumerate(top_countries_to_track):
-        country_by_year = []
-        for year in years:
-            year_count = 0
-            for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-                if talk_type in conference_data[year]:
-                    year_count += sum(1 for talk in conference_data[year][talk_type] 
-                                    if talk.get('Country', 'Unknown') == country)
-            country_by_year.append(year_count)
+        country_by_year = counts_by_year[country].tolist()
         
         # Assign marker and color for this country
         marker = markers[i % len(markers)]
@@ -2074,28 +1903,15 @@ def analyze_country_distribution(conference_data):
     
     return country_counts
 
-def analyze_plenary_vs_parallel(conference_data):
+def analyze_plenary_vs_parallel(conference_data, cube=None):
     """Analyze plenary vs parallel talks by country"""
     print("Analyzing plenary vs parallel talks...")
     
     # Count countries for plenary and parallel talks
-    plenary_country = Counter()
-    parallel_country = Counter()
-    
-    for year, data in conference_data.items():
-        # Count plenary talks
-        if 'plenary_talks' in data:
-            for talk in data['plenary_talks']:
-                country = talk.get('Country', 'Unknown')
-                if country != 'Unknown':
-                    plenary_country[country] += 1
-        
-        # Count parallel talks
-        if 'parallel_talks' in data:
-            for talk in data['parallel_talks']:
-                country = talk.get('Country', 'Unknown')
-                if country != 'Unknown':
-                    parallel_country[country] += 1
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
+    plenary_country = cube.country_counts(talk_type='plenary_talks')
+    parallel_country = cube.country_counts(talk_type='parallel_talks')
     
     return plenary_country, parallel_country
 
@@ -2164,8 +1980,37 @@ def create_representation_ratio_plot(plenary_country, parallel_country):
     plt.savefig('figures/representation_ratio_by_year.pdf')  # Match existing filename
     plt.close()
 
-def load_processed_data():
-    """Load the processed conference data from JSON file"""
+# Talk columns the analysis reads; TEXT_COLUMNS only when a figure needs one
+# of the text structures in TEXT_SHARED_VALUES
+ANALYSIS_COLUMNS = ['Session', 'Type', 'Title', 'Speaker', 'Institute', 'Country']
+TEXT_COLUMNS = ['Abstract']
+TEXT_SHARED_VALUES = {'topic_matrix'}
+
+def load_processed_data(columns=None):
+    """
+    Load the processed conference data, from the columnar talk store if it
+    exists (see processed_store) and otherwise from the JSON file.
+    
+    Parameters:
+    - columns: Talk columns to load from the columnar store (all if None)
+    
+    Returns:
+    - Conference data dictionary, or None on error
+    """
+    try:
+        conference_data = load_talk_store(columns=columns)
+        if conference_data:
+            # Per-year statistics are kept next to the CSV exports
+            for year, data in conference_data.items():
+                stats_file = os.path.join('data/processed', year, 'statistics.json')
+                if os.path.exists(stats_file):
+                    with open(stats_file, 'r') as f:
+                        data.update(json.load(f))
+            print(f"Loaded processed data for {len(conference_data)} conferences from {TALK_STORE_DIR}")
+            return conference_data
+    except Exception as e:
+        print(f"Error loading columnar talk store, falling back to JSON: {e}")
+    
     try:
         with open('data/processed_conference_data.json', 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -2173,13 +2018,19 @@ def load_processed_data():
         print(f"Error loading processed data: {e}")
         return None
 
+def processed_data_files():
+    """Files load_processed_data reads the talks from (used to version derived data)"""
+    if have_talk_store_support() and talk_store_exists():
+        return talk_store_files()
+    return ['data/processed_conference_data.json']
+
 def display_conference_summary(conference_data):
     """Display summary of conference data"""
     for year, data in sorted(conference_data.items()):
-        print(f"\nYear: {year}")
+        log.info("Year: %s", year)
         for talk_type in data:
             if isinstance(data[talk_type], list):
-                print(f"  {talk_type}: {len(data[talk_type])} talks")
+                log.info("  %s: %d talks", talk_type, len(data[talk_type]))
 
 def fix_unknown_institute_country_data(conference_data):
     """Fix unknown institute and country data"""
@@ -2234,45 +2085,25 @@ def filter_relevant_talk_types(conference_data):
         
         # Remove other talk types if they exist
         if 'flash_talks' in data:
-            print(f"  Removed {len(data['flash_talks'])} flash talks from QM{year}")
+            log.debug("  Removed %d flash talks from QM%s", len(data['flash_talks']), year)
             del data['flash_talks']
         
         if 'other_talks' in data:
-            print(f"  Removed {len(data['other_talks'])} other talks from QM{year}")
+            log.debug("  Removed %d other talks from QM%s", len(data['other_talks']), year)
             del data['other_talks']
     
     return conference_data
 
-def analyze_country_diversity(filtered_data):
+def analyze_country_diversity(filtered_data, cube=None):
     """Analyze country diversity metrics"""
     # Include all years, including 2025
     years = sorted([year for year in filtered_data.keys() if year.isdigit()])
     
-    # Track metrics by year
-    unique_countries = {}
-    hhi_by_year = {}  # Herfindahl-Hirschman Index - measure of concentration
-    
-    for year in years:
-        # Count countries
-        country_counts = Counter()
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in filtered_data[year]:
-                for talk in filtered_data[year][talk_type]:
-                    country = talk.get('Country', 'Unknown')
-                    if country != 'Unknown':
-                        country_counts[country] += 1
-        
-        # Calculate metrics
-        unique_countries[year] = len(country_counts)
-        
-        # Calculate HHI
-        total_talks = sum(country_counts.values())
-        if total_talks > 0:
-            hhi = sum((count/total_talks)**2 for count in country_counts.values())
-            hhi_by_year[year] = hhi * 10000  # Scale for better visualization
-        else:
-            hhi_by_year[year] = 0
+    # Unique countries and Herfindahl-Hirschman Index (measure of concentration,
+    # scaled by 10000 for better visualization) by year
+    if cube is None:
+        cube = build_aggregate_cube(filtered_data)
+    unique_countries, hhi_by_year = cube.hhi_by_year(years)
     
     return unique_countries, hhi_by_year
 
@@ -2306,47 +2137,7 @@ def create_diversity_metrics_plot(years, unique_countries, hhi_by_year):
     plt.savefig('figures/data_quality.pdf')  # Match existing filename
     plt.close()
 
-def normalize_institute_name(name):
-    """Normalize institute names for consistent identification"""
-    # Basic normalization
-    name = name.strip().lower()
-    
-    # Handle common variations and abbreviations
-    mappings = {
-        'cern': 'CERN',
-        'brookhaven': 'BNL',
-        'bnl': 'BNL',
-        'lawrence berkeley': 'LBNL',
-        'lbnl': 'LBNL',
-        'berkeley lab': 'LBNL',
-        'mit': 'MIT',
-        'berkeley': 'UC Berkeley',
-        'los alamos': 'LANL',
-        'lanl': 'LANL',
-        'oak ridge': 'ORNL',
-        'ornl': 'ORNL',
-        'argonne': 'ANL',
-        'anl': 'ANL',
-        'jyväskylä': 'University of Jyväskylä',
-        'jyvaskyla': 'University of Jyväskylä',
-        'university of jyväskylä': 'University of Jyväskylä',
-        'university of jyvaskyla': 'University of Jyväskylä',
-        'unam': 'UNAM',
-        'gsi': 'GSI',
-        'infn': 'INFN',
-        'dubna': 'JINR',
-        'jinr': 'JINR'
-    }
-    
-    # Apply mappings
-    for key, value in mappings.items():
-        if key in name:
-            return value
-    
-    # Return the original name with first letters capitalized for readability
-    return ' '.join(word.capitalize() for word in name.split())
-
-def create_institute_bubble_chart(conference_data):
+def create_institute_bubble_chart(conference_data, cube=None):
     """
     Create a bubble chart showing institute contributions across conference years.
     
@@ -2358,46 +2149,18 @@ def create_institute_bubble_chart(conference_data):
     # Extract years (including 2025)
     years = sorted([year for year in conference_data.keys() if year.isdigit()])
     
-    # Count institutes across all years
-    all_institute_counts = Counter()
+    # Count (normalized) institutes by year, one column per institute
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
+    institute_by_year = cube.institute_by_year(years=years)
     
-    # Dictionary to store institute counts by year
-    institute_by_year = {}
-    
-    # First, count all institutes across all years
-    for year in years:
-        institute_counts = Counter()
-        
-        # Get all talks for this year
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    # Try different possible fields for institute
-                    institute = None
-                    for field in ['Institute', 'Affiliation', 'institution', 'affiliation']:
-                        if field in talk and talk[field] and talk[field] != 'Unknown':
-                            institute = normalize_institute_name(talk[field])
-                            break
-                    
-                    if institute:
-                        institute_counts[institute] += 1
-        
-        # Add to overall counts
-        all_institute_counts.update(institute_counts)
-        
-        # Store this year's counts
-        institute_by_year[year] = institute_counts
-    
-    # Get top 30 institutes by total count
-    top_institutes = [inst for inst, count in all_institute_counts.most_common(30)]
+    # Get top 30 institutes by total count (ties keep first-seen order)
+    all_institute_counts = institute_by_year.sum()
+    all_institute_counts = all_institute_counts[all_institute_counts > 0]
+    top_institutes = all_institute_counts.sort_values(ascending=False, kind='stable').index[:30].tolist()
     
     # Create a matrix for the bubble chart
-    matrix = []
-    for institute in top_institutes:
-        row = []
-        for year in years:
-            row.append(institute_by_year[year].get(institute, 0))
-        matrix.append(row)
+    matrix = institute_by_year[top_institutes].T.to_numpy().tolist()
     
     # Create the bubble chart
     plt.figure(figsize=(14, 12))
@@ -2436,15 +2199,135 @@ def create_institute_bubble_chart(conference_data):
     plt.savefig('figures/institute_bubble_chart.pdf', bbox_inches='tight')
     plt.close()
 
-def analyze_conference_data(conference_data=None, output_dir='figures'):
-    """Main function to analyze conference data and generate visualizations"""
+def create_gender_diversity_figures(conference_data):
+    """Analyze gender diversity and create its plots"""
+    print("Analyzing gender diversity...")
+    gender_by_year, gender_by_talk_type = analyze_gender_diversity(conference_data)
+    create_gender_diversity_plot(gender_by_year, gender_by_talk_type)
+
+def paper_figure_tasks(figures=None):
+    """
+    Figure tasks of the paper, in rendering order.
+    
+    Parameters:
+    - figures: Names of the figures to render (all if None)
+    
+    Returns:
+    - List of FigureTask
+    """
+    tasks = [
+        FigureTask('QM talk statistics', create_talk_statistics_figure, ['filtered_data']),
+        FigureTask('gender diversity', create_gender_diversity_figures, ['filtered_data']),
+        FigureTask('keywords', create_keywords_plot, ['filtered_data', 'keyword_index']),
+        FigureTask('country distribution', analyze_country_distribution, ['filtered_data', 'cube']),
+        FigureTask('plenary country', create_plenary_country_plot, ['plenary_country']),
+        FigureTask('parallel country', create_parallel_country_plot, ['parallel_country']),
+        FigureTask('diversity metrics', analyze_diversity_metrics, ['filtered_data', 'cube']),
+        FigureTask('representation ratio', create_representation_ratio_plot,
+                   ['plenary_country', 'parallel_country']),
+        FigureTask('theory/experiment balance', create_theory_experiment_balance_plot,
+                   ['filtered_data', 'topic_matrix']),
+        FigureTask('regional diversity', create_regional_diversity_plot,
+                   ['country_counts', 'filtered_data', 'cube']),
+        FigureTask('institutes', analyze_institute_diversity, ['filtered_data', 'cube']),
+        FigureTask('institute bubble chart', create_institute_bubble_chart, ['filtered_data', 'cube']),
+    ]
+    if figures is not None:
+        unknown = set(figures) - {task.name for task in tasks}
+        if unknown:
+            raise ValueError(f"Unknown figures: {', '.join(sorted(unknown))}")
+        tasks = [task for task in tasks if task.name in figures]
+    return tasks
+
+def analysis_columns(figures=None):
+    """Talk columns to load for the paper figures (see paper_figure_tasks)"""
+    needed = {name for task in paper_figure_tasks(figures) for name in task.args}
+    if needed & TEXT_SHARED_VALUES:
+        return ANALYSIS_COLUMNS + TEXT_COLUMNS
+    return list(ANALYSIS_COLUMNS)
+
+def render_paper_figures(filtered_data, max_workers=None, figures=None, version=None):
+    """
+    Generate all paper figures from the filtered conference data.
+    
+    Aggregates and indexes the figures need (the aggregate cube, the title
+    keyword index and the topic matrix) are computed once here and handed
+    to the workers; the figures themselves are independent and rendered in
+    parallel (see figure_scheduler).
+    
+    Parameters:
+    - filtered_data: Conference data restricted to plenary, parallel and poster talks
+    - max_workers: Number of rendering processes (default: one per CPU, 1 = serial)
+    - figures: Names of the figures to render (all if None)
+    - version: Dataset version of filtered_data, to reuse the saved aggregate
+      cube (see aggregate_cube.build_aggregate_cube)
+    
+    Returns:
+    - Dictionary mapping figure name to (seconds, error text or None)
+    """
+    tasks = paper_figure_tasks(figures)
+    needed = {name for task in tasks for name in task.args}
+    shared = {'filtered_data': filtered_data}
+    
+    # The figures get the structures built here as arguments; workers run on
+    # a copy of filtered_data and never build them again
+    cube = None
+    if needed & {'cube', 'country_counts', 'plenary_country', 'parallel_country'}:
+        try:
+            cube = shared['cube'] = build_aggregate_cube(filtered_data, version)
+            # Same counts as analyze_country_distribution returns
+            shared['country_counts'] = cube.country_counts()
+        except Exception as e:
+            print(f"Error building the aggregate cube: {e}")
+            traceback.print_exc()
+    
+    if needed & {'plenary_country', 'parallel_country'}:
+        try:
+            plenary_country, parallel_country = analyze_plenary_vs_parallel(filtered_data, cube)
+            shared['plenary_country'] = plenary_country
+            shared['parallel_country'] = parallel_country
+        except Exception as e:
+            print(f"Error analyzing plenary vs parallel talks: {e}")
+            traceback.print_exc()
+    
+    if 'keyword_index' in needed:
+        try:
+            shared['keyword_index'] = KeywordIndex(filtered_data)
+        except Exception as e:
+            print(f"Error indexing talk titles: {e}")
+            traceback.print_exc()
+    
+    if 'topic_matrix' in needed:
+        try:
+            shared['topic_matrix'] = TopicMatrix(filtered_data)
+        except Exception as e:
+            print(f"Error matching talk topics: {e}")
+            traceback.print_exc()
+    
+    return render_figures(tasks, shared, max_workers=max_workers)
+
+def analyze_conference_data(conference_data=None, output_dir='figures', max_workers=None, figures=None):
+    """
+    Main function to analyze conference data and generate visualizations.
+    
+    Parameters:
+    - conference_data: Conference data (loaded from data/processed if None)
+    - output_dir: Output directory for figures
+    - max_workers: Number of processes rendering figures (default: one per CPU, 1 = serial)
+    - figures: Names of the paper figures to render (all if None, see paper_figure_tasks)
+    """
     print("Analyzing conference data...")
     
     # First load the processed data if not provided
+    dataset_files = None
     if conference_data is None:
         try:
-            print("\nLoading processed data...")
-            conference_data = load_processed_data()
+            with stage("Loading processed data") as step:
+                dataset_files = processed_data_files()
+                # Abstracts are only loaded for the topic figures
+                conference_data = load_processed_data(columns=analysis_columns(figures))
+                if conference_data:
+                    step.items = count_talks(conference_data)
             if not conference_data:
                 print("Error: Could not load processed data")
                 return
@@ -2458,16 +2341,16 @@ def analyze_conference_data(conference_data=None, output_dir='figures'):
     
     # Fix unknown countries for known institutes
     try:
-        print("\nFixing unknown countries for known institutes...")
-        conference_data = fix_unknown_countries_for_known_institutes(conference_data)
+        with stage("Fixing unknown countries for known institutes"):
+            conference_data = fix_unknown_countries_for_known_institutes(conference_data)
     except Exception as e:
         print(f"Error fixing unknown countries: {e}")
         traceback.print_exc()
     
     # Pre-process the data
-    print("\nPre-processing data...")
     try:
-        filtered_data = preprocess_conference_data(conference_data)
+        with stage("Pre-processing data"):
+            filtered_data = preprocess_conference_data(conference_data)
     except Exception as e:
         print(f"Error pre-processing data: {e}")
         traceback.print_exc()
@@ -2483,146 +2366,47 @@ def analyze_conference_data(conference_data=None, output_dir='figures'):
     print("\nConference summary from processed data:")
     display_conference_summary(conference_data)
     
+    talks = count_talks(conference_data)
+    
     # STEP 1: Fix inconsistencies in institute and country data
-    print("\nSTEP 1: Fixing inconsistencies in institute and country data...")
-    conference_data = fix_unknown_institute_country_data(conference_data)
+    with stage("STEP 1: Fixing inconsistencies in institute and country data", items=talks):
+        conference_data = fix_unknown_institute_country_data(conference_data)
     
     # STEP 2: Fix common affiliation problems
-    print("\nSTEP 2: Fixing common affiliation problems...")
-    conference_data = fix_common_affiliation_problems(conference_data)
+    with stage("STEP 2: Fixing common affiliation problems", items=talks):
+        conference_data = fix_common_affiliation_problems(conference_data)
     
     # STEP 3: Add manual country fixes
-    print("\nSTEP 3: Adding manual country fixes...")
-    conference_data = add_manual_country_fixes(conference_data)
+    with stage("STEP 3: Adding manual country fixes", items=talks):
+        conference_data = add_manual_country_fixes(conference_data)
     
     # STEP 4: Specifically fix unknown institutes
-    print("\nSTEP 4: Specifically fixing unknown institutes...")
-    conference_data = fix_unknown_institutes(conference_data)
+    with stage("STEP 4: Specifically fixing unknown institutes", items=talks):
+        conference_data = fix_unknown_institutes(conference_data)
     
     # Display final conference summary
     print("\nFinal conference summary:")
     display_conference_summary(conference_data)
     
     # STEP 5: Filter to only include relevant talk types
-    print("\nSTEP 5: Filtering to include only relevant talk types...")
-    filtered_data = filter_relevant_talk_types(conference_data)
-    if not filtered_data:
-        print("Error: Filtering failed, using original data")
-        filtered_data = conference_data
+    with stage("STEP 5: Filtering to include only relevant talk types", items=talks) as step:
+        filtered_data = filter_relevant_talk_types(conference_data)
+        if not filtered_data:
+            print("Error: Filtering failed, using original data")
+            filtered_data = conference_data
+        step.args['kept'] = count_talks(filtered_data)
     
-    # Create QM talk statistics figure with the filtered data
-    print("\nCreating QM talk statistics figure...")
-    try:
-        create_talk_statistics_figure(filtered_data)
-        print("QM talk statistics figure created successfully!")
-    except Exception as e:
-        print(f"Error creating QM talk statistics figure: {e}")
-        traceback.print_exc()
-        
-    # STEP 6: Generate all visualizations for the paper
-    print("\nSTEP 6: Generating visualizations for the paper...")
+    # Aggregates of data loaded from data/processed are saved per dataset
+    # version and reused by later runs (see aggregate_cube)
+    version = dataset_version(dataset_files) if dataset_files is not None else None
     
-    # Add gender diversity analysis and visualization
-    try:
-        print("Analyzing gender diversity...")
-        gender_by_year, gender_by_talk_type = analyze_gender_diversity(filtered_data)
-        create_gender_diversity_plot(gender_by_year, gender_by_talk_type)
-        print("Gender diversity visualization created successfully!")
-    except Exception as e:
-        print(f"Error analyzing gender diversity: {e}")
-        traceback.print_exc()
-    
-    # Figure: Keywords visualization 
-    try:
-        print("Creating keywords visualization...")
-        create_keywords_plot(filtered_data)
-    except Exception as e:
-        print(f"Error creating keywords visualization: {e}")
-        traceback.print_exc()
-        
-    # Figures: Country analysis
-    try:
-        print("Analyzing country distribution...")
-        country_counts = analyze_country_distribution(filtered_data)
-    except Exception as e:
-        print(f"Error analyzing country distribution: {e}")
-        traceback.print_exc()
-        
-    # Figures: Plenary vs parallel talks
-    try:
-        print("Analyzing plenary vs parallel talks...")
-        plenary_country, parallel_country = analyze_plenary_vs_parallel(filtered_data)
-        
-        # Create plenary country visualization
-        try:
-            print("Creating plenary country visualization...")
-            create_plenary_country_plot(plenary_country)
-        except Exception as e:
-            print(f"Error creating plenary country visualization: {e}")
-            traceback.print_exc()
-        
-        # Create parallel country visualization
-        try:
-            print("Creating parallel country visualization...")
-            create_parallel_country_plot(parallel_country)
-        except Exception as e:
-            print(f"Error creating parallel country visualization: {e}")
-            traceback.print_exc()
-        
-        # Create diversity metrics visualization
-        try:
-            print("Creating diversity metrics visualization...")
-            analyze_diversity_metrics(filtered_data)
-        except Exception as e:
-            print(f"Error creating diversity metrics visualization: {e}")
-            traceback.print_exc()
-        
-        # Create representation ratio visualization
-        try:
-            print("Creating representation ratio visualization...")
-            create_representation_ratio_plot(plenary_country, parallel_country)
-        except Exception as e:
-            print(f"Error creating representation ratio: {e}")
-            traceback.print_exc()
-
-        # Create theory/experiment balance visualization
-        try:
-            print("Creating theory/experiment balance visualization...")
-            create_theory_experiment_balance_plot(filtered_data)
-        except Exception as e:
-            print(f"Error creating theory/experiment balance visualization: {e}")
-            traceback.print_exc()
-            
-    except Exception as e:
-        print(f"Error analyzing plenary vs parallel talks: {e}")
-        traceback.print_exc()
-        
-    # Create regional diversity visualization
-    try:
-        print("Creating regional diversity visualization...")
-        create_regional_diversity_plot(country_counts, filtered_data)
-    except Exception as e:
-        print(f"Error creating regional diversity visualization: {e}")
-        traceback.print_exc()
-        
-    # Create institute visualizations
-    try:
-        print("Creating institute visualizations...")
-        analyze_institute_diversity(filtered_data)
-    except Exception as e:
-        print(f"Error creating institute visualizations: {e}")
-        traceback.print_exc()
-        
-    # Create institute bubble chart
-    try:
-        print("Creating institute bubble chart...")
-        create_institute_bubble_chart(filtered_data)
-    except Exception as e:
-        print(f"Error creating institute bubble chart: {e}")
-        traceback.print_exc()
+    # STEP 6: Generate all visualizations for the paper
+    with stage("STEP 6: Generating visualizations for the paper", items=count_talks(filtered_data)):
+        render_paper_figures(filtered_data, max_workers=max_workers, figures=figures, version=version)
     
     print("\n===== ANALYSIS COMPLETE =====")
     print("All visualizations have been saved to the 'figures' directory")
+    export_trace()
     
     return conference_data
 
@@ -2859,44 +2643,8 @@ def estimate_gender_from_name(first_name):
     Gender determination from names is inherently imprecise and culturally biased.
     This should only be used for aggregate analysis with appropriate caveats.
     """
-    # Strip any titles, periods, or extra spaces
-    if not first_name or first_name == "Unknown" or len(first_name) < 2:
-        return "Unknown"
-        
-    first_name = first_name.lower().strip()
-    
-    # Common female name endings in various languages
-    female_patterns = ['a', 'ie', 'ette', 'elle', 'ina', 'ia', 'lyn', 'en', 'ey', 'anne', 'enne']
-    # Names that end with these are typically feminine in many languages
-    
-    # Common male name endings in various languages
-    male_patterns = ['o', 'us', 'er', 'on', 'in', 'im', 'el', 'an', 'or', 'en', 'as']
-    # Names that end with these are typically masculine in many languages
-    
-    # Simple very common first names (this is just a small sample)
-    common_female_names = {'mary', 'jennifer', 'elizabeth', 'susan', 'margaret', 'sarah', 'lisa', 'emma', 'olivia',
-                          'sophia', 'mia', 'anna', 'maria', 'elena', 'julia', 'laura', 'natalia', 'alice', 'helen'}
-    
-    common_male_names = {'john', 'robert', 'michael', 'william', 'david', 'richard', 'joseph', 'thomas', 'james',
-                        'daniel', 'matthew', 'alexander', 'peter', 'paul', 'mark', 'andrew', 'george', 'henry'}
-    
-    # Check common name lists first
-    if first_name in common_female_names:
-        return "Female"
-    if first_name in common_male_names:
-        return "Male"
-    
-    # Check endings
-    for pattern in female_patterns:
-        if first_name.endswith(pattern):
-            return "Female"
-    
-    for pattern in male_patterns:
-        if first_name.endswith(pattern):
-            return "Male"
-    
-    # If we can't determine, return Unknown
-    return "Unknown"
+    # Name table and suffix trie are compiled once (see gender_estimation)
+    return get_gender_estimator().classify(first_name)
 
 def analyze_gender_diversity(conference_data):
     """
@@ -2908,40 +2656,22 @@ def analyze_gender_diversity(conference_data):
     
     # Extract years, including 2025
     years = sorted([year for year in conference_data.keys() if year.isdigit()])
+    talk_types = ['plenary_talks', 'parallel_talks', 'poster_talks']
+    
+    # Speaker gender of all talks, each distinct first name classified once
+    genders = estimate_genders({year: conference_data[year] for year in years}, talk_types)
     
     # Track gender by year and talk type
-    gender_by_year = {year: {'Male': 0, 'Female': 0, 'Unknown': 0} for year in years}
-    gender_by_talk_type = {'plenary_talks': {'Male': 0, 'Female': 0, 'Unknown': 0},
-                          'parallel_talks': {'Male': 0, 'Female': 0, 'Unknown': 0},
-                          'poster_talks': {'Male': 0, 'Female': 0, 'Unknown': 0}}
+    gender_by_year = gender_counts(genders, 'Year')
+    gender_by_talk_type = gender_counts(genders, 'Talk_Type')
     
-    for year in years:
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    # Get speaker/first author name
-                    speaker_name = talk.get('Speaker', '')
-                    if not speaker_name or speaker_name == 'Unknown':
-                        first_author = talk.get('Authors', ['Unknown'])[0]
-                        speaker_name = first_author
-                    
-                    # Extract first name - assume format is "Last, First" or "First Last"
-                    first_name = "Unknown"
-                    if ',' in speaker_name:
-                        parts = speaker_name.split(',')
-                        if len(parts) > 1:
-                            first_name = parts[1].strip().split()[0]
-                    else:
-                        parts = speaker_name.split()
-                        if len(parts) > 0:
-                            first_name = parts[0].strip()
-                    
-                    # Estimate gender
-                    gender = estimate_gender_from_name(first_name)
-                    
-                    # Update counters
-                    gender_by_year[year][gender] += 1
-                    gender_by_talk_type[talk_type][gender] += 1
+    # Report how many talks could be classified
+    for by in ['Year', 'Talk_Type']:
+        coverage = gender_coverage(genders, by)
+        print(f"Gender estimation coverage by {by.lower().replace('_', ' ')}:")
+        for key, row in coverage.iterrows():
+            print(f"  {key}: {int(row['Talks'])} talks, {row['Coverage']:.1f}% with first name, "
+                  f"{row['Unknown_Rate']:.1f}% unknown")
     
     return gender_by_year, gender_by_talk_type
 
@@ -3203,39 +2933,20 @@ def analyze_institute_trends(conference_data):
     
     return institute_counts
 
-def analyze_diversity_metrics(conference_data):
+def analyze_diversity_metrics(conference_data, cube=None):
     """Analyze diversity metrics over time"""
     print("Analyzing diversity metrics...")
     
     # Get sorted years, including 2025
     years = sorted([year for year in conference_data.keys() if year.isdigit()])
     
-    # Calculate diversity metrics for each year
-    unique_countries = []
-    hhi_values = []  # Herfindahl-Hirschman Index
-    
-    for year in years:
-        # Count countries
-        country_counts = Counter()
-        total_talks = 0
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    country = talk.get('Country', 'Unknown')
-                    if country != 'Unknown':
-                        country_counts[country] += 1
-                        total_talks += 1
-        
-        # Calculate metrics
-        unique_countries.append(len(country_counts))
-        
-        # Calculate HHI
-        if total_talks > 0:
-            hhi = sum((count/total_talks)**2 for count in country_counts.values())
-            hhi_values.append(hhi * 10000)  # Scale for better visualization
-        else:
-            hhi_values.append(0)
+    # Calculate diversity metrics for each year: unique countries and the
+    # Herfindahl-Hirschman Index (scaled by 10000 for better visualization)
+    if cube is None:
+        cube = build_aggregate_cube(conference_data)
+    unique_by_year, hhi_by_year = cube.hhi_by_year(years)
+    unique_countries = [unique_by_year[year] for year in years]
+    hhi_values = [hhi_by_year[year] for year in years]
     
     # Create plot
     fig, ax1 = plt.subplots(figsize=(12, 7))
@@ -3318,7 +3029,7 @@ def analyze_talk_type_distribution(conference_data):
     plt.savefig('figures/talk_type_distribution.pdf')
     plt.close()
 
-def analyze_keywords(conference_data):
+def analyze_keywords(conference_data, title_index=None):
     """Analyze keywords from talk titles"""
     print("Analyzing keywords...")
     
@@ -3348,33 +3059,18 @@ def analyze_keywords(conference_data):
     fig, axs = plt.subplots(2, 3, figsize=(18, 10), sharex=True)
     axs = axs.flatten()
     
+    # Talk titles of each year, indexed once for all keywords
+    if title_index is None:
+        title_index = KeywordIndex(conference_data)
+    
     # Track keyword frequencies over time
     for i, (group, keywords) in enumerate(keyword_groups.items()):
         ax = axs[i]
         
         # For each keyword in the group, track separately
         for j, keyword in enumerate(keywords[:5]):  # Limit to first 5 keywords to avoid overcrowding
-            keyword_trend = []
-            
-            for year in years:
-                # Get all talk titles for this year
-                titles = []
-                for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-                    if talk_type in conference_data[year]:
-                        titles.extend([talk.get('Title', '') for talk in conference_data[year][talk_type]])
-                
-                # Convert to lowercase for case-insensitive matching
-                titles = [title.lower() for title in titles if title]
-                total_talks = len(titles)
-                
-                # Count keyword occurrences
-                keyword_count = sum(1 for title in titles if keyword in title)
-                
-                # Store as percentage
-                if total_talks > 0:
-                    keyword_trend.append(keyword_count / total_talks * 100)
-                else:
-                    keyword_trend.append(0)
+            # Percentage of the year's talks with the keyword in the title
+            keyword_trend = [title_index.share(year, keyword) for year in years]
             
             # Use different marker, color, and linestyle for each keyword
             marker = all_markers[j % len(all_markers)]
@@ -3426,23 +3122,16 @@ def analyze_regional_diversity(conference_data):
     years = sorted(years)
     years = [str(year) for year in years]  # Convert back to strings
     
-    print(f"Regional diversity analysis years: {years}")  # Debug output
+    log.debug("Regional diversity analysis years: %s", years)
     
     # Track regional percentages over time
     regional_percentages = {region: [] for region in regions}
+    cube = build_aggregate_cube(conference_data)
     
     for year in years:
         # Count countries for each talk
-        country_counts = Counter()
-        total_talks = 0
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    country = talk.get('Country', 'Unknown')
-                    if country != 'Unknown':
-                        country_counts[country] += 1
-                        total_talks += 1
+        country_counts = cube.country_counts(year=year)
+        total_talks = sum(country_counts.values())
         
         # Calculate regional percentages
         for region, countries in regions.items():
@@ -3487,63 +3176,24 @@ def analyze_regional_diversity(conference_data):
     plt.savefig('figures/regional_diversity_by_year.pdf')
     plt.close()
 
-def create_theory_experiment_balance_plot(conference_data):
+def create_theory_experiment_balance_plot(conference_data, topics=None):
     """Create visualization showing the balance between theory and experiment presentations"""
     print("Creating theory-experiment balance visualization...")
     
-    # Define keywords that indicate theoretical or experimental work
-    theory_keywords = [
-        'theory', 'theoretical', 'model', 'models', 'simulation', 'simulations', 
-        'calculation', 'calculations', 'lattice', 'qcd', 'effective field theory',
-        'eft', 'hydrodynamic', 'hydro', 'transport', 'monte carlo', 'perturbative',
-        'non-perturbative', 'framework', 'approach', 'formalism', 'equation of state',
-        'eos', 'viscosity', 'predict', 'prediction', 'predicted', 'microscopic'
-    ]
-    
-    experiment_keywords = [
-        'experiment', 'experimental', 'measurement', 'measurements', 'data',
-        'results', 'observed', 'observation', 'detector', 'detectors', 'measured',
-        'alice', 'atlas', 'cms', 'lhcb', 'star', 'phenix', 'brahms', 'phobos',
-        'reconstruction', 'trigger', 'calibration', 'analysis', 'beam', 'collision'
-    ]
-    
     # Get sorted years, including 2025
     years = sorted([year for year in conference_data.keys() if year.isdigit()])
     
-    # Track theory vs experiment balance by year
-    theory_counts = []
-    experiment_counts = []
-    ambiguous_counts = []
+    # Number of theory and experiment keywords each talk mentions (whole words,
+    # titles and abstracts), from the shared topic matrix
+    if topics is None:
+        topics = TopicMatrix(conference_data)
+    theory_score = topics.scores(THEORY_KEYWORDS)
+    experiment_score = topics.scores(EXPERIMENT_KEYWORDS)
     
-    for year in years:
-        theory_count = 0
-        experiment_count = 0
-        ambiguous_count = 0
-        
-        # Analyze all talks for this year
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    title = talk.get('Title', '').lower()
-                    abstract = talk.get('Abstract', '').lower()
-                    
-                    # Check for theory keywords
-                    theory_score = sum(1 for keyword in theory_keywords if keyword in title or keyword in abstract)
-                    
-                    # Check for experiment keywords
-                    experiment_score = sum(1 for keyword in experiment_keywords if keyword in title or keyword in abstract)
-                    
-                    # Classify based on keyword counts
-                    if theory_score > experiment_score:
-                        theory_count += 1
-                    elif experiment_score > theory_score:
-                        experiment_count += 1
-                    else:
-                        ambiguous_count += 1
-        
-        theory_counts.append(theory_count)
-        experiment_counts.append(experiment_count)
-        ambiguous_counts.append(ambiguous_count)
+    # Classify each talk based on keyword counts, then count per year
+    theory_counts = topics.per_year(theory_score > experiment_score, years).astype(int)
+    experiment_counts = topics.per_year(experiment_score > theory_score, years).astype(int)
+    ambiguous_counts = topics.per_year(theory_score == experiment_score, years).astype(int)
     
     # Calculate percentages
     total_by_year = np.array(theory_counts) + np.array(experiment_counts) + np.array(ambiguous_counts)
@@ -3609,7 +3259,7 @@ def create_theory_experiment_balance_plot(conference_data):
     plt.savefig('figures/theory_experiment_counts.pdf')
     plt.close()
 
-def analyze_physics_evolution(conference_data):
+def analyze_physics_evolution(conference_data, topics=None):
     """Analyze the evolution of physics topics over time"""
     print("Analyzing physics topic evolution...")
     
@@ -3618,50 +3268,25 @@ def analyze_physics_evolution(conference_data):
     years = sorted(years)
     years = [str(year) for year in years]  # Convert back to strings
     
-    print(f"Physics evolution analysis years: {years}")  # Debug output
-    
-    # Define physics categories to track
-    physics_categories = {
-        'QGP Properties': ['qgp', 'temperature', 'viscosity', 'eos', 'equation of state'],
-        'Heavy Flavor': ['charm', 'bottom', 'quarkonia', 'quarkonium', 'j/psi', 'upsilon'],
-        'Jets': ['jet', 'energy loss', 'quenching', 'high-pt', 'high pt'],
-        'Flow': ['flow', 'harmonic', 'collective', 'azimuthal', 'anisotropy'],
-        'Small Systems': ['small system', 'pp', 'p-p', 'p-pb', 'p-a'],
-        'EM Probes': ['photon', 'dilepton', 'electromagnetic'],
-        'Future Facilities': ['future', 'upgrade', 'sphenix', 'eic', 'electron-ion', 'fair', 'nica'],
-        'Machine Learning': ['machine learning', 'deep learning', 'neural', 'ai', 'artificial intelligence']
-    }
+    log.debug("Physics evolution analysis years: %s", years)
     
-    # Track category frequencies over time
-    category_by_year = {category: [] for category in physics_categories}
+    # Percentage of talks (with a title or abstract) mentioning any keyword of
+    # each category, from the shared topic matrix
+    if topics is None:
+        topics = TopicMatrix(conference_data)
+    total_talks = topics.talks_per_year(years, with_text=True)
+    shares = np.divide(100.0, total_talks, out=np.zeros(len(years)), where=total_talks > 0)
     
-    for year in years:
-        # Get all talk titles and abstracts for this year
-        titles = []
-        abstracts = []
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                titles.extend([talk.get('Title', '').lower() for talk in conference_data[year][talk_type]])
-                abstracts.extend([talk.get('Abstract', '').lower() for talk in conference_data[year][talk_type]])
-        
-        # Combine titles and abstracts for analysis
-        text_data = ' '.join(titles + abstracts)
-        
-        # Calculate category frequencies
-        for category, keywords in physics_categories.items():
-            # Count occurrences of category keywords
-            category_count = sum(text_data.count(keyword) for keyword in keywords)
-            
-            # Normalize by total text length
-            normalized_count = category_count / len(text_data) if len(text_data) > 0 else 0
-            category_by_year[category].append(normalized_count * 10000)  # Scale for visualization
+    category_by_year = {
+        category: list(topics.per_year(topics.mentions(keywords), years) * shares)
+        for category, keywords in PHYSICS_CATEGORIES.items()
+    }
     
     # Create plot
     plt.figure(figsize=(14, 8))
     
     # Define colors and markers
-    colors = plt.cm.tab10(np.linspace(0, 1, len(physics_categories)))
+    colors = plt.cm.tab10(np.linspace(0, 1, len(PHYSICS_CATEGORIES)))
     markers = ['o', 's', '^', 'D', 'p', '*', 'X', 'h']
     
     # Plot each category
@@ -3671,7 +3296,7 @@ def analyze_physics_evolution(conference_data):
     
     plt.title('Evolution of Physics Topics Over Time')
     plt.xlabel('Conference Year')
-    plt.ylabel('Relative Frequency (normalized)')
+    plt.ylabel('% of Talks')
     plt.legend(loc='best', frameon=True, fancybox=True, shadow=True)
     plt.grid(True, linestyle='--', alpha=0.7)
     
@@ -3679,7 +3304,7 @@ def analyze_physics_evolution(conference_data):
     plt.savefig('figures/physics_evolution.pdf')
     plt.close()
 
-def create_detector_focus_plot(conference_data):
+def create_detector_focus_plot(conference_data, topics=None):
     """Analyze mentions of specific detectors/experiments over time"""
     print("Analyzing detector/experiment focus...")
     
@@ -3688,46 +3313,22 @@ def create_detector_focus_plot(conference_data):
     years = sorted(years)
     years = [str(year) for year in years]  # Convert back to strings
     
-    print(f"Detector focus analysis years: {years}")  # Debug output
-    
-    # Define detectors/experiments to track
-    detectors = {
-        'ALICE': ['alice'],
-        'ATLAS': ['atlas'],
-        'CMS': ['cms'],
-        'STAR': ['star'],
-        'PHENIX': ['phenix'],
-        'sPHENIX': ['sphenix'],
-        'HADES': ['hades'],
-        'CBM': ['cbm'],
-        'NA61': ['na61', 'shine'],
-        'LHCb': ['lhcb'],
-        'NICA': ['nica'],
-        'EIC': ['eic', 'electron-ion']
-    }
-    
-    # Track detector mentions over time
-    detector_by_year = {detector: [] for detector in detectors}
+    log.debug("Detector focus analysis years: %s", years)
     
-    for year in years:
-        # Get all talk titles and abstracts for this year
-        text_data = ""
-        
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    text_data += (talk.get('Title', '') + " " + talk.get('Abstract', '')).lower()
-        
-        # Calculate detector frequencies
-        for detector, keywords in detectors.items():
-            detector_count = sum(text_data.count(keyword) for keyword in keywords)
-            detector_by_year[detector].append(detector_count)
+    # Number of talks mentioning each detector/experiment (whole words, titles
+    # and abstracts), from the shared topic matrix
+    if topics is None:
+        topics = TopicMatrix(conference_data)
+    detector_by_year = {
+        detector: list(topics.per_year(topics.mentions(keywords), years).astype(int))
+        for detector, keywords in DETECTORS.items()
+    }
     
     # Create plot
     plt.figure(figsize=(14, 8))
     
     # Define colors and markers
-    colors = plt.cm.tab20(np.linspace(0, 1, len(detectors)))
+    colors = plt.cm.tab20(np.linspace(0, 1, len(DETECTORS)))
     markers = ['o', 's', '^', 'D', 'p', '*', 'X', 'h', 'P', '>', '<', 'v']
     
     # Plot each detector
@@ -3737,7 +3338,7 @@ def create_detector_focus_plot(conference_data):
     
     plt.title('Detector/Experiment Focus Over Time')
     plt.xlabel('Conference Year')
-    plt.ylabel('Number of Mentions')
+    plt.ylabel('Number of Talks')
     plt.legend(loc='best', frameon=True, fancybox=True, shadow=True)
     plt.grid(True, linestyle='--', alpha=0.7)
     
@@ -3756,6 +3357,16 @@ def create_keyword_QA_plots(conference_data):
             years.append(str(year))
     years.sort(key=int)  # Sort numerically
     
+    # Extract the keywords of every talk once; all panels use them
+    talk_keywords_by_year = {}
+    for year in years:
+        talk_keywords_by_year[year] = []
+        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
+            if talk_type in conference_data[year]:
+                talk_keywords_by_year[year].extend(
+                    extract_keywords_from_talk(talk) for talk in conference_data[year][talk_type]
+                )
+    
     # Create figure with multiple panels
     fig, axs = plt.subplots(2, 2, figsize=(16, 12))
     axs = axs.flatten()
@@ -3766,22 +3377,11 @@ def create_keyword_QA_plots(conference_data):
     total_talks = []
     
     for year in years:
-        # Get all talks for this year
-        year_talks = []
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                year_talks.extend(conference_data[year][talk_type])
-        
-        total_talks.append(len(year_talks))
+        year_keywords = talk_keywords_by_year[year]
+        total_talks.append(len(year_keywords))
         
         # Count talks with keywords
-        talks_with_kw = 0
-        for talk in year_talks:
-            keywords = extract_keywords_from_talk(talk)
-            if keywords:
-                talks_with_kw += 1
-        
-        talks_with_keywords.append(talks_with_kw)
+        talks_with_keywords.append(sum(1 for keywords in year_keywords if keywords))
     
     # Calculate percentage
     keyword_percentages = [100 * kw / total if total > 0 else 0 
@@ -3803,16 +3403,12 @@ def create_keyword_QA_plots(conference_data):
     avg_keywords = []
     
     for year in years:
-        # Get all talks for this year
-        year_talks = []
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                year_talks.extend(conference_data[year][talk_type])
+        year_keywords = talk_keywords_by_year[year]
         
         # Calculate average number of keywords
-        if year_talks:
-            total_keywords = sum(len(extract_keywords_from_talk(talk)) for talk in year_talks)
-            avg = total_keywords / len(year_talks)
+        if year_keywords:
+            total_keywords = sum(len(keywords) for keywords in year_keywords)
+            avg = total_keywords / len(year_keywords)
         else:
             avg = 0
         
@@ -3834,11 +3430,8 @@ def create_keyword_QA_plots(conference_data):
     all_keywords = Counter()
     
     for year in years:
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    keywords = extract_keywords_from_talk(talk)
-                    all_keywords.update(keywords)
+        for keywords in talk_keywords_by_year[year]:
+            all_keywords.update(keywords)
     
     # Get top keywords
     top_kw = all_keywords.most_common(10)
@@ -3859,11 +3452,8 @@ def create_keyword_QA_plots(conference_data):
     for year in years:
         # Get all keywords for this year
         year_keywords = Counter()
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            if talk_type in conference_data[year]:
-                for talk in conference_data[year][talk_type]:
-                    keywords = extract_keywords_from_talk(talk)
-                    year_keywords.update(keywords)
+        for keywords in talk_keywords_by_year[year]:
+            year_keywords.update(keywords)
         
         unique_keywords.append(len(year_keywords))
     
@@ -3881,5 +3471,13 @@ def create_keyword_QA_plots(conference_data):
 
 # Add proper entry point at the end of the file
 if __name__ == "__main__":
-    analyze_conference_data()
+    parser = argparse.ArgumentParser(description="Analyze the processed conference data and draw the paper figures")
+    parser.add_argument('--figures', nargs='+', metavar='NAME',
+                        help="Paper figures to draw (default: all); abstracts are only loaded for "
+                             "'theory/experiment balance'")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes rendering figures (default: one per CPU, 1 = serial)")
+    args = parser.parse_args()
+    configure_logging()
+    analyze_conference_data(max_workers=args.workers, figures=args.figures)
 
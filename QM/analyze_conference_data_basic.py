@@ -16,6 +16,7 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from matplotlib.colors import LinearSegmentedColormap
 from collections import defaultdict
+from participant_files import PARTICIPANTS_DIR, PARTICIPANTS_FILE, iter_participants, load_participant_counts
 
 # Only keep the font settings needed for plots
 plt.rcParams.update({
@@ -100,9 +101,24 @@ def load_participant_data():
     Returns:
     - Dictionary mapping years to participant counts
     """
+    participants_by_year = load_participant_counts()
+    if participants_by_year is not None:
+        return participants_by_year
     participants_by_year = {}
     
-    # First try to load from JSON file
+    # Without the count sidecar, count the newline-delimited participant list
+    ndjson_path = os.path.join(PARTICIPANTS_DIR, PARTICIPANTS_FILE)
+    if os.path.exists(ndjson_path):
+        try:
+            for participant in iter_participants(ndjson_path):
+                year = str(participant.get('year', ''))
+                participants_by_year[year] = participants_by_year.get(year, 0) + 1
+            return participants_by_year
+        except Exception as e:
+            print(f"Error loading participant data from {ndjson_path}: {e}")
+            participants_by_year = {}
+    
+    # Participant lists written by older versions of fetch_participants.py
     json_path = "data/participants/all_participants.json"
     if os.path.exists(json_path):
         try:
@@ -0,0 +1,408 @@
+"""
+Benchmark suite for the hot paths of the ingest and analysis pipelines.
+
+Every benchmark runs on synthetic data (see synthetic_conference) at each
+requested size, repeat times, and the setup (data generation, cache
+clearing, copies) is not timed. Timed paths:
+- categorize_session, extract_country and normalize_institute_name over
+  the contributions of a synthetic export
+- participant matching (fix_unknown_institutes_from_participants)
+- save_processed_data and load_processed_data, in a temporary directory
+- the analysis aggregates: talk table, aggregate cube, keyword index,
+  topic matrix and gender estimation
+
+Results are printed and can be written as JSON (--json). With --compare,
+the medians are checked against an earlier JSON result and the script fails
+(exit status 1) if a benchmark got slower than the tolerance allows, or if
+any benchmark raised an error.
+
+Usage (from QM/):
+    python benchmarks/hot_paths.py
+    python benchmarks/hot_paths.py --sizes 1000 10000 100000 1000000 --json results.json
+    python benchmarks/hot_paths.py --only extract_country categorize_session --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QM_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, QM_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic_conference import YEARS, generate_conference_data, generate_contributions, generate_participants  # noqa: E402
+
+RESULT_FORMAT_VERSION = 1
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+
+# Participants generated per talk for the matching benchmark
+PARTICIPANTS_PER_TALK = 0.5
+
+ANALYSIS_TALK_TYPES = ['plenary_talks', 'parallel_talks', 'poster_talks']
+
+
+class Benchmark:
+    """
+    One timed hot path.
+
+    Parameters:
+    - name: Name in the results
+    - setup: Function (fixtures) -> state, run untimed before every repeat
+    - run: Function (state) -> None, the timed part
+    """
+
+    def __init__(self, name, setup, run):
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+
+class Fixtures:
+    """Synthetic data of one size, generated on first use and shared by the benchmarks"""
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.seed = seed
+        self._contributions = None
+        self._conference_data = None
+        self._participants = None
+        self._tempdir = None
+
+    def workdir(self):
+        """A new empty directory, removed by close()"""
+        if self._tempdir is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix='qm-bench-')
+        return tempfile.mkdtemp(dir=self._tempdir.name)
+
+    def close(self):
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+    @property
+    def contributions(self):
+        if self._contributions is None:
+            self._contributions = []
+            per_year = -(-self.size // len(YEARS))
+            for year in YEARS:
+                count = min(per_year, self.size - len(self._contributions))
+                self._contributions.extend((year, contribution)
+                                           for contribution in generate_contributions(count, year, self.seed))
+        return self._contributions
+
+    @property
+    def conference_data(self):
+        if self._conference_data is None:
+            self._conference_data = generate_conference_data(self.size, seed=self.seed)
+        return self._conference_data
+
+    @property
+    def participants(self):
+        if self._participants is None:
+            self._participants = generate_participants(max(1, int(self.size * PARTICIPANTS_PER_TALK)), seed=self.seed)
+        return self._participants
+
+    def analysis_data(self):
+        """Conference data restricted to the talk types the analyses use"""
+        return {year: {talk_type: data[talk_type] for talk_type in ANALYSIS_TALK_TYPES}
+                for year, data in self.conference_data.items()}
+
+
+# Benchmarks
+
+def _setup_categorize_session(fixtures):
+    import generate_conference_data as generate
+    sessions = [(contribution['session'], contribution['title'], year)
+                for year, contribution in fixtures.contributions]
+    return generate.categorize_session, sessions
+
+
+def _run_categorize_session(state):
+    categorize_session, sessions = state
+    for session, title, year in sessions:
+        categorize_session(session, title, year)
+
+
+def _setup_extract_country(fixtures):
+    import generate_conference_data as generate
+    institute_country_db, _ = generate.load_institute_country_database()
+    affiliations = [contribution['speakers'][0]['affiliation'] for _, contribution in fixtures.contributions]
+    # Compile the matcher outside the timed part, as a caller does once per run
+    matcher = generate.country_matcher(institute_country_db)
+    return generate.extract_country, affiliations, institute_country_db, matcher
+
+
+def _run_extract_country(state):
+    extract_country, affiliations, institute_country_db, matcher = state
+    for affiliation in affiliations:
+        extract_country(affiliation, institute_country_db, matcher)
+
+
+def _setup_normalize_institute_name(fixtures):
+    import institute_names
+    # Cold cache: each distinct affiliation is normalised once per repeat
+    institute_names.normalize_institute_name.cache_clear()
+    affiliations = [contribution['speakers'][0]['affiliation'] for _, contribution in fixtures.contributions]
+    return institute_names.normalize_institute_name, affiliations
+
+
+def _run_normalize_institute_name(state):
+    normalize_institute_name, affiliations = state
+    for affiliation in affiliations:
+        normalize_institute_name(affiliation)
+
+
+def _setup_participant_matching(fixtures):
+    import generate_conference_data as generate
+    # The fix modifies the talks, so every repeat gets its own copy
+    conference_data = {
+        year: {talk_type: [dict(talk) for talk in data[talk_type]] for talk_type in ANALYSIS_TALK_TYPES}
+        for year, data in fixtures.conference_data.items()
+    }
+    return generate.fix_unknown_institutes_from_participants, conference_data, fixtures.participants
+
+
+def _run_participant_matching(state):
+    fix_unknown_institutes_from_participants, conference_data, participants = state
+    fix_unknown_institutes_from_participants(conference_data, participants)
+
+
+def _setup_save_processed_data(fixtures):
+    import generate_conference_data as generate
+    workdir = fixtures.workdir()
+    return generate.save_processed_data, fixtures.conference_data, os.path.join(workdir, 'data', 'processed')
+
+
+def _run_save_processed_data(state):
+    save_processed_data, conference_data, output_dir = state
+    save_processed_data(conference_data, output_dir)
+    _check_saved(conference_data, output_dir)
+
+
+def _check_saved(conference_data, output_dir):
+    # save_processed_data reports errors instead of raising them
+    for year in conference_data:
+        if not os.path.exists(os.path.join(output_dir, year, 'statistics.json')):
+            raise RuntimeError(f'save_processed_data wrote no data for {year}')
+
+
+def _setup_load_processed_data(fixtures):
+    import analyze_conference_data as analyze
+    import generate_conference_data as generate
+    workdir = fixtures.workdir()
+    with _working_directory(workdir):
+        generate.save_processed_data(fixtures.conference_data, 'data/processed')
+        _check_saved(fixtures.conference_data, 'data/processed')
+        # Without the columnar store the analysis reads the combined JSON file
+        with open('data/processed_conference_data.json', 'w', encoding='utf-8') as f:
+            json.dump(fixtures.conference_data, f)
+    return analyze.load_processed_data, workdir
+
+
+def _run_load_processed_data(state):
+    load_processed_data, workdir = state
+    with _working_directory(workdir):
+        if not load_processed_data():
+            raise RuntimeError('load_processed_data returned no data')
+
+
+def _setup_talk_table(fixtures):
+    from talk_table import TalkTable
+    return TalkTable, fixtures.analysis_data()
+
+
+def _setup_aggregate_cube(fixtures):
+    from aggregate_cube import AggregateCube
+    from talk_table import TalkTable
+    return AggregateCube.from_talk_table, TalkTable(fixtures.analysis_data())
+
+
+def _setup_keyword_index(fixtures):
+    import talk_tokens
+    from keyword_index import KeywordIndex
+    talk_tokens._token_cache.clear()
+    return (lambda data: KeywordIndex(data, fields=('Title', 'Abstract'))), fixtures.analysis_data()
+
+
+def _setup_topic_matrix(fixtures):
+    import talk_tokens
+    from topic_classifier import TopicMatrix
+    talk_tokens._token_cache.clear()
+    return TopicMatrix, fixtures.analysis_data()
+
+
+def _setup_gender_estimation(fixtures):
+    from gender_estimation import GenderEstimator, estimate_genders
+    # A fresh estimator, so first names are not memoised from the last repeat
+    return (lambda data: estimate_genders(data, estimator=GenderEstimator())), fixtures.analysis_data()
+
+
+def _run_build(state):
+    build, data = state
+    build(data)
+
+
+BENCHMARKS = [
+    Benchmark('categorize_session', _setup_categorize_session, _run_categorize_session),
+    Benchmark('extract_country', _setup_extract_country, _run_extract_country),
+    Benchmark('normalize_institute_name', _setup_normalize_institute_name, _run_normalize_institute_name),
+    Benchmark('participant_matching', _setup_participant_matching, _run_participant_matching),
+    Benchmark('save_processed_data', _setup_save_processed_data, _run_save_processed_data),
+    Benchmark('load_processed_data', _setup_load_processed_data, _run_load_processed_data),
+    Benchmark('talk_table', _setup_talk_table, _run_build),
+    Benchmark('aggregate_cube', _setup_aggregate_cube, _run_build),
+    Benchmark('keyword_index', _setup_keyword_index, _run_build),
+    Benchmark('topic_matrix', _setup_topic_matrix, _run_build),
+    Benchmark('gender_estimation', _setup_gender_estimation, _run_build),
+]
+
+
+# Running and reporting
+
+@contextlib.contextmanager
+def _working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def run_benchmark(benchmark, fixtures, repeat):
+    """Time one benchmark at one size; returns a result dictionary"""
+    times = []
+    error = None
+    try:
+        for _ in range(repeat):
+            # The pipeline functions report progress (and caught errors) themselves
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                state = benchmark.setup(fixtures)
+                start = time.perf_counter()
+                benchmark.run(state)
+                times.append(time.perf_counter() - start)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    median = statistics.median(times) if times else None
+    return {
+        'benchmark': benchmark.name,
+        'size': fixtures.size,
+        'repeat': len(times),
+        'min_s': min(times) if times else None,
+        'median_s': median,
+        'us_per_item': median / fixtures.size * 1e6 if times else None,
+        'error': error,
+    }
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=QM_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _code_version():
+    from processing_manifest import hash_files
+    return hash_files(sorted(os.path.join(QM_DIR, name) for name in os.listdir(QM_DIR) if name.endswith('.py')))
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Compare medians with a baseline result file's.
+
+    Returns:
+    - List of (benchmark, size, ratio) for the benchmarks that got slower
+      than 1 + tolerance times the baseline
+    """
+    baseline_medians = {(r['benchmark'], r['size']): r['median_s'] for r in baseline.get('results', [])
+                        if r.get('median_s')}
+    regressions = []
+    for result in results:
+        previous = baseline_medians.get((result['benchmark'], result['size']))
+        if previous and result['median_s'] is not None:
+            ratio = result['median_s'] / previous
+            result['baseline_ratio'] = ratio
+            if ratio > 1 + tolerance:
+                regressions.append((result['benchmark'], result['size'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the QM pipelines on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Numbers of contributions (default: %(default)s)')
+    parser.add_argument('--only', nargs='+', metavar='BENCHMARK', choices=[b.name for b in BENCHMARKS],
+                        help='Run only these benchmarks')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Timed runs per benchmark and size')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    parser.add_argument('--compare', metavar='FILE', help='Fail on regressions against an earlier --json result')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown against --compare, as a fraction (default: %(default)s)')
+    args = parser.parse_args()
+
+    benchmarks = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+    results = []
+
+    print(f"{'benchmark':<26} {'size':>9} {'min':>10} {'median':>10} {'us/item':>9}  status")
+    # The pipeline reads its mapping files relative to QM/
+    with _working_directory(QM_DIR):
+        for size in args.sizes:
+            fixtures = Fixtures(size, args.seed)
+            for benchmark in benchmarks:
+                result = run_benchmark(benchmark, fixtures, max(1, args.repeat))
+                results.append(result)
+                if result['error']:
+                    timing = f"{'-':>10} {'-':>10} {'-':>9}"
+                else:
+                    timing = f"{result['min_s']:9.3f}s {result['median_s']:9.3f}s {result['us_per_item']:9.2f}"
+                print(f"{benchmark.name:<26} {size:>9} {timing}  {result['error'] or 'ok'}")
+            fixtures.close()
+
+        report = {
+            'format_version': RESULT_FORMAT_VERSION,
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'code_version': _code_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'results': results,
+        }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for name, size, ratio in regressions:
+            print(f"Regression: {name} at {size} contributions is {ratio:.2f}x the baseline")
+        report['compared_with'] = args.compare
+        report['regressions'] = [{'benchmark': name, 'size': size, 'ratio': ratio}
+                                 for name, size, ratio in regressions]
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    errors = sum(1 for result in results if result['error'])
+    return 1 if errors or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
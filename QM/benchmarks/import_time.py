@@ -0,0 +1,152 @@
+"""
+Import-time benchmark and guard for the QM scripts.
+
+Each module is imported in a fresh interpreter, started in an empty
+temporary directory, several times. The script reports the import time
+and fails (exit status 1) if a module
+- takes longer than the budget to import,
+- pulls in one of the heavy stacks (matplotlib, pandas, nltk, ...), or
+- creates files or directories on import.
+
+Usage (from QM/):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 10 --budget-ms 100 --json results.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+QM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'generate_conference_data',
+    'analyze_conference_data',
+    'affiliation_matcher',
+    'institute_names',
+    'participant_index',
+    'participant_files',
+    'person_table',
+    'ror_lookup',
+    'session_rules',
+    'indico_stream',
+    'indico_cache',
+    'indico_replay',
+    'talk_table',
+    'talk_record',
+    'aggregate_cube',
+    'keyword_index',
+    'talk_tokens',
+    'topic_classifier',
+    'gender_estimation',
+    'processed_store',
+    'processing_manifest',
+    'figure_scheduler',
+    'tracing',
+]
+
+# Packages that must only be imported when they are actually used
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'pandas', 'numpy', 'pyarrow', 'wordcloud', 'nltk', 'bs4',
+                 'requests']
+
+DEFAULT_BUDGET_MS = 150
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+
+def probe_import(module, workdir):
+    """Import module in a fresh interpreter; returns (seconds, heavy modules loaded)"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = QM_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report['seconds'], report['heavy']
+
+
+def benchmark_module(module, repeat):
+    """Benchmark one module; returns a result dictionary"""
+    times = []
+    heavy = set()
+    created = []
+    error = None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            for _ in range(repeat):
+                seconds, loaded = probe_import(module, workdir)
+                times.append(seconds)
+                heavy.update(loaded)
+        except RuntimeError as e:
+            error = str(e)
+        created = sorted(os.listdir(workdir))
+
+    return {
+        'module': module,
+        'min_ms': min(times) * 1000 if times else None,
+        'median_ms': statistics.median(times) * 1000 if times else None,
+        'heavy_modules': sorted(heavy),
+        'created_files': created,
+        'error': error
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure and guard import time of the QM scripts')
+    parser.add_argument('modules', nargs='*', default=MODULES, help='Modules to import (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Imports per module')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Maximum median import time per module')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    args = parser.parse_args()
+
+    results = []
+    failures = 0
+    print(f"{'module':<28} {'min':>8} {'median':>8}  status")
+    for module in args.modules:
+        result = benchmark_module(module, max(1, args.repeat))
+        problems = []
+        if result['error']:
+            problems.append(f"error: {result['error']}")
+        else:
+            if result['median_ms'] > args.budget_ms:
+                problems.append(f"over budget ({args.budget_ms:.0f} ms)")
+            if result['heavy_modules']:
+                problems.append(f"imports {', '.join(result['heavy_modules'])}")
+            if result['created_files']:
+                problems.append(f"creates {', '.join(result['created_files'])}")
+        result['ok'] = not problems
+        failures += bool(problems)
+        results.append(result)
+
+        timing = (f"{result['min_ms']:7.1f}ms {result['median_ms']:7.1f}ms"
+                  if result['median_ms'] is not None else f"{'-':>8} {'-':>8}")
+        print(f"{module:<28} {timing}  {'; '.join(problems) or 'ok'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'budget_ms': args.budget_ms, 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
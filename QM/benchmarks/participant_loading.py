@@ -0,0 +1,149 @@
+"""
+load_participant_data: column-wise loader against the row-by-row loader it
+replaced.
+
+The participant CSV (data/participants/all_participants.csv) is repeated
+--scale times into a temporary file. Both loaders read it; the script
+checks that they return the same lookup (keys in the same order, same
+values) and reports the best of --repeat runs of each.
+
+Usage (from QM/):
+    python benchmarks/participant_loading.py
+    python benchmarks/participant_loading.py --scale 100 --repeat 5 --json loading.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QM_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, QM_DIR)
+
+PARTICIPANT_FILE = os.path.join(QM_DIR, 'data', 'participants', 'all_participants.csv')
+DEFAULT_SCALE = 100
+DEFAULT_REPEAT = 3
+
+
+def load_participant_data_rows(participant_file):
+    """The row-by-row loader load_participant_data used before (without its messages)"""
+    participant_lookup = {}
+    with open(participant_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            name = row['name']
+            affiliation = row['affiliation']
+            country = row['country']
+            year = row['year']
+
+            if not country and '(' in affiliation:
+                match = re.search(r'\((..)\)$', affiliation)
+                if match:
+                    country = match.group(1)
+
+            if country:
+                country_map = {
+                    'US': 'United States', 'USA': 'United States', 'UK': 'United Kingdom',
+                    'AT': 'Austria', 'PL': 'Poland', 'DE': 'Germany', 'FR': 'France',
+                    'IT': 'Italy', 'JP': 'Japan', 'CN': 'China', 'IN': 'India',
+                    'CH': 'Switzerland', 'NL': 'Netherlands', 'RU': 'Russia',
+                    'BR': 'Brazil', 'ES': 'Spain'
+                }
+                country = country_map.get(country, country)
+
+            if not country:
+                inst_lower = affiliation.lower()
+                inst_country_map = {
+                    'columbia university': 'United States', 'wayne state': 'United States',
+                    'ohio university': 'United States', 'university of tennessee': 'United States',
+                    'stony brook': 'United States', 'brookhaven': 'United States',
+                    'agh university': 'Poland', 'nuclear physics polish': 'Poland',
+                    'austrian academy': 'Austria'
+                }
+                for inst, inst_country in inst_country_map.items():
+                    if inst in inst_lower:
+                        country = inst_country
+                        break
+
+            participant_data = {
+                'affiliation': affiliation,
+                'country': country if country else 'Unknown',
+                'year': year
+            }
+            participant_lookup[name] = participant_data
+            if ',' not in name and ' ' in name:
+                parts = name.split()
+                if len(parts) > 1:
+                    participant_lookup[f"{parts[-1]}, {' '.join(parts[:-1])}"] = participant_data
+    return participant_lookup
+
+
+def write_scaled_file(source, target, scale):
+    """Write the rows of source scale times (one header); returns the number of rows"""
+    with open(source, 'r', encoding='utf-8') as f:
+        header = f.readline()
+        body = f.read()
+    if body and not body.endswith('\n'):
+        body += '\n'
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for _ in range(scale):
+            f.write(body)
+    return body.count('\n') * scale
+
+
+def best_time(function, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the participant loaders on a scaled participant file')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE, help='Times the participant file is repeated')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per loader (best is reported)')
+    parser.add_argument('--participants', default=PARTICIPANT_FILE, help='Participant CSV to scale')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    args = parser.parse_args()
+
+    from generate_conference_data import load_participant_data
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scaled_file = os.path.join(tmp, 'all_participants.csv')
+        rows = write_scaled_file(args.participants, scaled_file, args.scale)
+
+        # Warm up pandas and the file cache
+        best_time(lambda: load_participant_data(scaled_file), 1)
+
+        rows_seconds, expected = best_time(lambda: load_participant_data_rows(scaled_file), args.repeat)
+        columns_seconds, result = best_time(lambda: load_participant_data(scaled_file), args.repeat)
+
+    if list(result.items()) != list(expected.items()):
+        print('load_participant_data returned a different lookup than the row-by-row loader')
+        return 1
+
+    print(f"{rows} participant rows ({args.scale}x), {len(result)} lookup entries")
+    print(f"{'row-by-row':<12} {rows_seconds:8.3f}s")
+    print(f"{'column-wise':<12} {columns_seconds:8.3f}s  ({rows_seconds / columns_seconds:.1f}x)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'rows': rows, 'entries': len(result),
+                       'row_by_row_seconds': rows_seconds, 'column_wise_seconds': columns_seconds}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
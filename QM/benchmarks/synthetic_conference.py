@@ -0,0 +1,314 @@
+"""
+Synthetic Indico-style conference data for the benchmarks.
+
+The generator produces contributions shaped like the Indico exports the
+pipeline reads (title, session, type, description, speakers with the
+ContributionParticipation payload), and processed talks shaped like the rows
+of data/processed (Session, Type, Title, Speaker, Institute, Country,
+Abstract, Raw_Speaker_Data). Session names, affiliations (with and without
+a trailing "(XX)" country code), titles and abstracts are drawn from
+vocabularies modelled on the real QM data, so the matchers and classifiers
+see the same kind of strings as in production. Output is deterministic for
+a given seed and scales from a handful to millions of contributions.
+
+    event = generate_event(10000, year='2019')
+    conference_data = generate_conference_data(100000)
+    participants = generate_participants(5000)
+"""
+
+import hashlib
+import random
+
+# Conference years the synthetic talks are spread over
+YEARS = ['2014', '2015', '2017', '2018', '2019', '2022', '2023', '2025']
+
+# Session names by session type, as they appear in the exports
+SESSION_NAMES = {
+    'plenary': ['Plenary Session I', 'Plenary Session XI', 'Plenary session 5', 'Plenary: Heavy flavor',
+                'Plenary Session - Opening of the conference'],
+    'parallel': ['Parallel Session - Jet modifications II', 'Parallel Session - Collective dynamics III',
+                 'Parallel Session - Heavy flavor III', 'Parallel Session -  Small systems I',
+                 'Parallel Session - Initial state  I', 'Parallel session 23', 'Parallel sessions 26',
+                 'Jets and high pT', 'Open heavy flavors', 'Correlations and fluctuations',
+                 'Electromagnetic probes', 'Quarkonia', 'QCD at high temperature', 'Chirality',
+                 'New theoretical developments', 'Discussion session'],
+    'poster': ['Poster Session', 'Poster session - Heavy flavor', 'Poster Session: Collective dynamics', ''],
+    'other': ['Early Career Researcher Day', 'Flash talks', 'Student Day (Sunday)', 'Closing', 'Welcome',
+              'Award ceremony'],
+}
+
+# Share of contributions per session type
+SESSION_WEIGHTS = {'plenary': 0.05, 'parallel': 0.35, 'poster': 0.55, 'other': 0.05}
+
+# Contribution types in the export, by session type
+CONTRIBUTION_TYPES = {
+    'plenary': ['Plenary', 'Invited talk'],
+    'parallel': ['Parallel', 'Contributed talk', 'Talk'],
+    'poster': ['Poster'],
+    'other': ['Flash', 'Other', ''],
+}
+
+# Institutes with their two-letter country code
+INSTITUTES = [
+    ('Central China Normal University', 'CN'), ('Central China Normal University  CCNU', 'CN'),
+    ('Fudan University', 'CN'), ('Tsinghua University', 'CN'),
+    ('University of Science and Technology of China', 'CN'),
+    ('Stony Brook University', 'US'), ('Brookhaven National Laboratory', 'US'),
+    ('Lawrence Berkeley National Laboratory', 'US'), ('Massachusetts Inst. of Technology', 'US'),
+    ('University of Houston', 'US'), ('Wayne State University', 'US'), ('Vanderbilt University', 'US'),
+    ('Rice University', 'US'), ('Duke University', 'US'), ('Los Alamos National Laboratory', 'US'),
+    ('University of California Berkeley', 'US'), ('Oak Ridge National Laboratory', 'US'),
+    ('CERN', 'CH'), ('GSI - Helmholtzzentrum fur Schwerionenforschung GmbH', 'DE'),
+    ('Technische Universitaet Muenchen', 'DE'), ('Johann-Wolfgang-Goethe Univ.', 'DE'),
+    ('Goethe University Frankfurt', 'DE'), ('Frankfurt Institute for Advanced Studies', 'DE'),
+    ('Universität Bielefeld', 'DE'), ('University of Tübingen', 'DE'),
+    ('Indian Institute of Technology  Indore', 'IN'), ('IIT- Indian Institute of Technology', 'IN'),
+    ('Indian Institute of Technology Madras', 'IN'), ('Variable Energy Cyclotron Centre', 'IN'),
+    ('University of Tokyo', 'JP'), ('University of Tsukuba', 'JP'), ('Osaka University', 'JP'),
+    ('Sophia University', 'JP'), ('Pusan National University', 'KR'), ('Yonsei University', 'KR'),
+    ('Universita e INFN Trieste', 'IT'), ('Universita e INFN Torino', 'IT'),
+    ('Université Paris-Saclay', 'FR'), ('SUBATECH', 'FR'), ('Lund University', 'SE'),
+    ('Warsaw University of Technology', 'PL'), ('AGH University of Krakow', 'PL'),
+    ('University of Jyväskylä', 'FI'), ('Weizmann Institute of Science', 'IL'),
+    ('McGill University', 'CA'), ('Universidade de Sao Paulo', 'BR'), ('Joint Institute for Nuclear Research', 'RU'),
+    ('Utrecht University', 'NL'), ('University of Birmingham', 'GB'), ('Niels Bohr Institute', 'DK'),
+]
+
+# Country names used in "Institute, Country" affiliations and in the Country column
+COUNTRY_BY_CODE = {
+    'CN': 'China', 'US': 'USA', 'CH': 'Switzerland', 'DE': 'Germany', 'IN': 'India', 'JP': 'Japan',
+    'KR': 'Korea', 'IT': 'Italy', 'FR': 'France', 'SE': 'Sweden', 'PL': 'Poland', 'FI': 'Finland',
+    'IL': 'Israel', 'CA': 'Canada', 'BR': 'Brazil', 'RU': 'Russia', 'NL': 'Netherlands', 'GB': 'UK',
+    'DK': 'Denmark',
+}
+
+FIRST_NAMES = ['Shaifali', 'Dmitry', 'Anna', 'Peter', 'Wei', 'Yuki', 'Maria', 'Jan', 'Elena', 'Raghunath',
+               'Laura', 'Hiroshi', 'Julia', 'Matthew', 'Xin', 'Jana', 'Carlos', 'Ilya', 'Natalia', 'Ahmed',
+               'Sophie', 'Jiangyong', 'Ekaterina', 'Michael', 'Sarah', 'Kai', 'Lijuan', 'Tomasz', 'Helen', 'Ruben',
+               'Olga', 'Federico', 'Mikko', 'Ivan', 'Chun', 'Barbara', 'Daniel', 'Zhenyu', 'Alexandra', 'Marco']
+
+LAST_NAMES = ['Mehta', 'Shemyakin', 'Andronic', 'Braun-Munzinger', 'Wang', 'Nakamura', 'Schmidt', 'Kowalski',
+              'Rossi', 'Sahoo', 'Chen', 'Li', 'Zhang', 'Tanaka', 'Novak', 'Garcia', 'Petrov', 'Ivanova', 'Hassan',
+              'Dubois', 'Jia', 'Smirnova', 'Nguyen', 'Kim', 'Park', 'Singh', 'Muller', 'Jensen', 'Lindqvist',
+              'Bianchi', 'Eskola', 'Sorensen', 'Xu', 'Yang', 'Torres', 'Silva', 'Kozlov', 'Lee', 'Cohen', 'Fischer']
+
+# Title pieces: "<observable> in <system> collisions at <energy> with <experiment>" and variations
+OBSERVABLES = ['Jet quenching', 'Charm hadronization', 'Quarkonium suppression', 'Anisotropic flow',
+               'Direct photon production', 'Dilepton spectra', 'Net-proton fluctuations', 'Global polarization',
+               'Strangeness enhancement', 'Heavy-flavor energy loss', 'Two-particle correlations',
+               'Equation of state constraints', 'Chiral magnetic effect searches', 'Light nuclei production',
+               'Machine learning for jet tagging', 'Bayesian inference of QGP viscosity']
+SYSTEMS = ['Pb-Pb', 'Au+Au', 'p-Pb', 'pp', 'Xe-Xe', 'd+Au', 'O-O', 'small', 'heavy-ion', 'isobar']
+ENERGIES = ['$\\sqrt{s_{NN}}$ = 5.02 TeV', '200 GeV', 'the LHC', 'RHIC energies', 'high baryon density',
+            'the Beam Energy Scan']
+EXPERIMENTS = ['ALICE', 'ATLAS', 'CMS', 'LHCb', 'STAR', 'PHENIX', 'sPHENIX', 'HADES', 'NA61/SHINE', 'CBM']
+TITLE_TEMPLATES = [
+    '{observable} in {system} collisions at {energy}',
+    '{observable} in {system} collisions with {experiment}',
+    'Measurement of {observable_lower} with the {experiment} detector',
+    'New results on {observable_lower} from {experiment}',
+    'Theory overview: {observable_lower}',
+    'Hydrodynamic modelling of {observable_lower} in {system} systems',
+]
+
+ABSTRACT_SENTENCES = [
+    'We present new measurements of {observable_lower} in {system} collisions at {energy}.',
+    'The data were recorded by the {experiment} experiment during the latest LHC and RHIC runs.',
+    'Results are compared with state-of-the-art transport and hydrodynamic model calculations.',
+    'The nuclear modification factor $R_{{AA}}$ is studied as a function of $p_{{T}}$ and centrality.',
+    'A Bayesian analysis constrains the shear viscosity to entropy density ratio $\\eta/s$ of the QGP.',
+    'The measurement extends the kinematic reach to transverse momenta of 10~GeV/$c$ and beyond.',
+    'Implications for the equation of state and the search for the QCD critical point are discussed.',
+    'Systematic uncertainties are evaluated with a data-driven method.',
+    'Predictions for future facilities such as the EIC, FAIR and NICA are presented.',
+    'These results provide new constraints on the initial state and the energy loss of hard probes.',
+]
+
+
+def _weighted_choices(rng, weights, count):
+    keys = list(weights)
+    return rng.choices(keys, weights=[weights[key] for key in keys], k=count)
+
+
+def _text_fields(rng):
+    observable = rng.choice(OBSERVABLES)
+    fields = {
+        'observable': observable,
+        'observable_lower': observable[0].lower() + observable[1:],
+        'system': rng.choice(SYSTEMS),
+        'energy': rng.choice(ENERGIES),
+        'experiment': rng.choice(EXPERIMENTS),
+    }
+    return fields
+
+
+def _title(rng, fields):
+    return rng.choice(TITLE_TEMPLATES).format(**fields)
+
+
+def _abstract(rng, fields):
+    sentences = rng.sample(ABSTRACT_SENTENCES, rng.randint(3, 7))
+    return ' '.join(sentence.format(**fields) for sentence in sentences)
+
+
+def _affiliation(rng):
+    """Affiliation string and the country the pipeline should derive from it"""
+    institute, code = rng.choice(INSTITUTES)
+    form = rng.random()
+    if form < 0.45:
+        return f"{institute} ({code})", code
+    if form < 0.85:
+        return institute, COUNTRY_BY_CODE[code]
+    if form < 0.93:
+        return f"{institute}, {COUNTRY_BY_CODE[code]}", COUNTRY_BY_CODE[code]
+    return '', 'Unknown'
+
+
+def _last_name(rng):
+    # Double-barrelled names widen the pool to about 65k distinct people
+    if rng.random() < 0.3:
+        return f"{rng.choice(LAST_NAMES)}-{rng.choice(LAST_NAMES)}"
+    return rng.choice(LAST_NAMES)
+
+
+def _speaker(rng, affiliation):
+    """ContributionParticipation payload as found in the exports and in Raw_Speaker_Data"""
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = _last_name(rng)
+    person_id = rng.randrange(1000000, 10000000)
+    return {
+        '_type': 'ContributionParticipation',
+        '_fossil': 'contributionParticipationMetadata',
+        'first_name': first_name,
+        'last_name': last_name,
+        'fullName': f"{last_name}, {first_name}",
+        'id': str(person_id),
+        'affiliation': affiliation,
+        'emailHash': hashlib.md5(f"{first_name}.{last_name}.{person_id}".encode()).hexdigest(),
+        'db_id': person_id,
+        'person_id': person_id + rng.randrange(-50000, 50000),
+    }
+
+
+def generate_contributions(count, year='2019', seed=0):
+    """
+    Yield count Indico export contributions.
+
+    Parameters:
+    - count: Number of contributions
+    - year: Conference year (only used to vary the random stream)
+    - seed: Random seed
+
+    Each contribution also carries the session type it was drawn from under
+    '_session_type', which a real export does not have.
+    """
+    rng = random.Random(f"{seed}-{year}")
+    for index, session_type in enumerate(_weighted_choices(rng, SESSION_WEIGHTS, count)):
+        fields = _text_fields(rng)
+        affiliation, _ = _affiliation(rng)
+        speakers = [_speaker(rng, affiliation)]
+        if rng.random() < 0.2:
+            speakers.append(_speaker(rng, _affiliation(rng)[0]))
+
+        yield {
+            '_type': 'Contribution',
+            'id': str(index + 1),
+            'friendly_id': index + 1,
+            'title': _title(rng, fields),
+            'session': rng.choice(SESSION_NAMES[session_type]),
+            'track': '',
+            'type': rng.choice(CONTRIBUTION_TYPES[session_type]),
+            'description': _abstract(rng, fields),
+            'speakers': speakers,
+            'primaryauthors': speakers[:1],
+            'coauthors': [],
+            '_session_type': session_type,
+        }
+
+
+def generate_event(count, year='2019', seed=0):
+    """Indico event export ({"results": [event]}) with count contributions"""
+    contributions = list(generate_contributions(count, year, seed))
+    for contribution in contributions:
+        del contribution['_session_type']
+    return {
+        'count': 1,
+        'additionalInfo': {},
+        '_type': 'HTTPAPIResult',
+        'results': [{
+            '_type': 'Conference',
+            'id': str(100000 + int(year)),
+            'title': f"Quark Matter {year}",
+            'contributions': contributions,
+        }],
+    }
+
+
+def _year_counts(count, years):
+    base, extra = divmod(count, len(years))
+    return {year: base + (1 if position < extra else 0) for position, year in enumerate(years)}
+
+
+def generate_conference_data(count, years=YEARS, seed=0):
+    """
+    Processed conference data (as returned by load_processed_data) with count
+    talks spread evenly over years.
+
+    Returns:
+    - Dictionary of year -> {'all_talks', 'plenary_talks', 'parallel_talks',
+      'poster_talks', 'other_talks', 'total_main', 'unknown_affiliations'}
+    """
+    conference_data = {}
+    for year, year_count in _year_counts(count, list(years)).items():
+        rng = random.Random(f"{seed}-{year}-talks")
+        data = {'all_talks': [], 'plenary_talks': [], 'parallel_talks': [], 'poster_talks': [], 'other_talks': []}
+
+        for session_type in _weighted_choices(rng, SESSION_WEIGHTS, year_count):
+            fields = _text_fields(rng)
+            affiliation, country = _affiliation(rng)
+            speaker = _speaker(rng, affiliation)
+            talk = {
+                'Session': rng.choice(SESSION_NAMES[session_type]),
+                'Type': session_type,
+                'Title': _title(rng, fields),
+                'Speaker': speaker['fullName'],
+                'Institute': affiliation or 'Unknown',
+                'Country': country,
+                'Abstract': _abstract(rng, fields),
+                'Raw_Speaker_Data': speaker,
+            }
+            data['all_talks'].append(talk)
+            data[f'{session_type}_talks'].append(talk)
+
+        data['total_main'] = len(data['plenary_talks']) + len(data['parallel_talks']) + len(data['poster_talks'])
+        data['unknown_affiliations'] = {
+            talk_type: sum(1 for talk in data[f'{talk_type}_talks'] if talk['Institute'] == 'Unknown')
+            for talk_type in ('plenary', 'parallel', 'poster')
+        }
+        conference_data[year] = data
+
+    return conference_data
+
+
+def generate_participants(count, years=YEARS, seed=0):
+    """
+    Participant lookup (name -> {'affiliation', 'country', 'year'}) as
+    returned by load_participant_data, drawn from the same name pool as the
+    speakers so that most talks find a participant.
+    """
+    rng = random.Random(f"{seed}-participants")
+    participants = {}
+    for _ in range(count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = _last_name(rng)
+        # A share of the records carries a middle initial or the "First Last" order
+        form = rng.random()
+        if form < 0.6:
+            name = f"{last_name}, {first_name}"
+        elif form < 0.8:
+            name = f"{first_name} {last_name}"
+        else:
+            name = f"{last_name}, {first_name} {rng.choice('ABCDEFGHJKLMNPRSTW')}."
+        affiliation, country = _affiliation(rng)
+        participants[name] = {'affiliation': affiliation, 'country': country, 'year': rng.choice(list(years))}
+    return participants
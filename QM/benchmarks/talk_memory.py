@@ -0,0 +1,158 @@
+"""
+Memory of processed talks: plain dictionaries against TalkRecord.
+
+A synthetic Indico export is written to a temporary file and, in a fresh
+interpreter per representation, streamed and processed the way
+fetch_and_process_contributions does it (session classification, speaker
+and country extraction, abstract), keeping every talk in all_talks and its
+per-type list. The script reports the memory held by the talks (resident
+memory after processing minus before) and the peak resident memory of each
+run.
+
+Usage (from QM/):
+    python benchmarks/talk_memory.py
+    python benchmarks/talk_memory.py --size 100000 --json memory.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+QM_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, QM_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+REPRESENTATIONS = ['dict', 'TalkRecord']
+DEFAULT_SIZE = 100000
+
+
+def _current_rss_mb():
+    """Resident memory of this process in MB (Linux), else the peak"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _process(export_file, representation, year):
+    """Process the export like fetch_and_process_contributions; returns the talk lists"""
+    from generate_conference_data import classify_contribution, extract_speaker_info
+    from indico_stream import iter_event_contributions
+    from talk_record import TalkRecord
+
+    talks_by_type = {'plenary': [], 'parallel': [], 'poster': [], 'other': []}
+    all_talks = []
+    with open(export_file, 'r', encoding='utf-8') as f:
+        for contribution in iter_event_contributions(f):
+            title = contribution.get('title', '')
+            session = contribution.get('session', '')
+            session_type = classify_contribution(title, session, contribution.get('type', ''), year)
+            speakers = contribution.get('speakers', []) or contribution.get('person_links', [])
+            name, affiliation, country = extract_speaker_info(speakers)
+            fields = {
+                'Session': session,
+                'Type': session_type,
+                'Title': title,
+                'Speaker': name,
+                'Institute': affiliation,
+                'Country': country,
+                'Abstract': contribution.get('description') or '',
+                'Raw_Speaker_Data': speakers[0] if speakers else None,
+            }
+            talk = fields if representation == 'dict' else TalkRecord(**fields)
+            all_talks.append(talk)
+            if session_type in talks_by_type:
+                talks_by_type[session_type].append(talk)
+    return all_talks, talks_by_type
+
+
+def run_child(export_file, representation, year):
+    """Measure one representation in this process and print the result as JSON"""
+    import contextlib
+    import io
+
+    import generate_conference_data  # noqa: F401  (imports and lookup tables are not counted)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm up the country lookup tables on a few contributions
+        _process_head(export_file, year)
+    gc.collect()
+    before = _current_rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        all_talks, _ = _process(export_file, representation, year)
+    gc.collect()
+    after = _current_rss_mb()
+    print(json.dumps({
+        'representation': representation,
+        'talks': len(all_talks),
+        'retained_mb': after - before,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'bytes_per_talk': (after - before) * (1 << 20) / max(1, len(all_talks)),
+    }))
+
+
+def _process_head(export_file, year, count=50):
+    from generate_conference_data import extract_speaker_info
+    from indico_stream import iter_event_contributions
+    with open(export_file, 'r', encoding='utf-8') as f:
+        for index, contribution in enumerate(iter_event_contributions(f)):
+            if index >= count:
+                break
+            extract_speaker_info(contribution.get('speakers', []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the memory of dictionary and TalkRecord talks')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help='Number of contributions')
+    parser.add_argument('--year', default='2019', help='Conference year the contributions are processed as')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    parser.add_argument('--child', nargs=2, metavar=('EXPORT', 'REPRESENTATION'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        os.chdir(QM_DIR)
+        run_child(args.child[0], args.child[1], args.year)
+        return 0
+
+    from synthetic_conference import generate_event
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        export_file = os.path.join(tmp, 'export.json')
+        with open(export_file, 'w', encoding='utf-8') as f:
+            json.dump(generate_event(args.size, year=args.year, seed=args.seed), f)
+
+        print(f"{'representation':<14} {'talks':>9} {'retained':>10} {'peak RSS':>10} {'bytes/talk':>11}")
+        for representation in REPRESENTATIONS:
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', export_file,
+                                    representation, '--year', args.year],
+                                   capture_output=True, text=True)
+            if child.returncode != 0:
+                print(f"{representation:<14} failed:\n{child.stderr}")
+                return 1
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{representation:<14} {result['talks']:>9} {result['retained_mb']:8.1f}MB "
+                  f"{result['peak_rss_mb']:8.1f}MB {result['bytes_per_talk']:11.0f}")
+
+    baseline = results[0]['retained_mb']
+    if baseline > 0:
+        for result in results[1:]:
+            print(f"{result['representation']} talks use {result['retained_mb'] / baseline:.0%} "
+                  f"of the memory of {results[0]['representation']} talks")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'size': args.size, 'year': args.year, 'seed': args.seed, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
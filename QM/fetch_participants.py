@@ -4,14 +4,15 @@ Script to process participant information from manually saved text files.
 This is step 1 in the data preparation workflow - run this FIRST.
 """
 
+import argparse
 import os
 import re
-import json
 import csv
 from tabulate import tabulate
 import glob
-import requests
-import time
+
+from participant_files import PARTICIPANT_FIELDS, parse_participant_file, parse_participant_files, write_participants
+from ror_lookup import RorResolver, get_ror_index, get_ror_resolver, set_ror_resolver
 
 # Constants
 OUTPUT_DIR = "data/participants"
@@ -58,113 +59,42 @@ def parse_participant_data_file(data_file, year_to_id):
     Returns:
     - Year, Indico ID, and list of participants with their details
     """
-    # Extract year from filename (man_YYYY.data)
-    year_match = re.search(r'man_(\d{4})\.data', data_file)
-    if not year_match:
-        print(f"Warning: Could not extract year from filename {data_file}")
-        return None, None, []
-    
-    year = year_match.group(1)
-    indico_id = year_to_id.get(year, "unknown")
-    
-    participants = []
-    
-    try:
-        with open(data_file, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-        
-        # Skip empty lines
-        lines = [line.strip() for line in lines if line.strip()]
-        
-        if not lines:
-            print(f"Warning: No data found in {data_file}")
-            return year, indico_id, []
-        
-        # Determine format from first line
-        header = lines[0].split('\t')
-        has_headers = not header[0].isdigit() and not re.match(r'^\d+$', header[0])
-        
-        start_idx = 1 if has_headers else 0
-        
-        for i in range(start_idx, len(lines)):
-            line = lines[i]
-            parts = line.split('\t')
-            
-            # Skip if not enough data
-            if len(parts) < 2:
-                continue
-            
-            name = ""
-            affiliation = ""
-            country = ""
-            
-            # Extract data based on the format
-            if len(parts) >= 3:
-                # Format: First Name, Last Name, Affiliation
-                first_name = parts[0].strip()
-                last_name = parts[1].strip()
-                name = f"{first_name} {last_name}"
-                affiliation = parts[2].strip() if len(parts) > 2 else ""
-            elif len(parts) == 2:
-                # Format: Name, Affiliation
-                name = parts[0].strip()
-                affiliation = parts[1].strip()
-            
-            # Try to extract country code from affiliation
-            country_match = re.search(r'\(([A-Z]{2,3})\)$', affiliation)
-            if country_match:
-                country = country_match.group(1)
-            
-            participants.append({
-                'name': name,
-                'affiliation': affiliation,
-                'country': country,
-                'year': year,
-                'indico_id': indico_id
-            })
-        
+    year, indico_id, participants = parse_participant_file(data_file, year_to_id)
+    if participants:
         print(f"Processed {len(participants)} participants from {data_file}")
-        return year, indico_id, participants
-    
-    except Exception as e:
-        print(f"Error processing {data_file}: {e}")
-        return year, indico_id, []
+    return year, indico_id, participants
 
-def process_all_data_files():
+def process_all_data_files(max_workers=None):
     """
-    Process all data files in the data directory.
+    Process all data files in the data directory, in parallel if there is
+    enough data (see participant_files.parse_participant_files).
+    
+    Parameters:
+    - max_workers: Number of worker processes (None: chosen from the input size)
     
     Returns:
     - Dictionary mapping event identifiers to lists of participants
     """
     year_to_id = load_indico_ids_from_file()
-    all_participants = {}
     
     data_files = glob.glob(os.path.join(DATA_DIR, "man_*.data"))
     
     print(f"Found {len(data_files)} data files to process")
     
-    for data_file in data_files:
-        year, indico_id, participants = parse_participant_data_file(data_file, year_to_id)
-        if year and participants:
-            event_key = f"{year}-{indico_id}"
-            all_participants[event_key] = participants
-    
-    return all_participants
+    return parse_participant_files(data_files, year_to_id, max_workers=max_workers)
 
 def create_combined_file(all_participants):
     """
-    Create a combined JSON file with all participants.
+    Create the combined participant file (newline-delimited JSON) and the
+    per-year count sidecar next to it.
     
     Parameters:
     - all_participants: Dictionary mapping event identifiers to lists of participants
     """
-    output_file = os.path.join(OUTPUT_DIR, "all_participants.json")
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_participants, f, indent=2, ensure_ascii=False)
+    output_file, counts_file = write_participants(all_participants, OUTPUT_DIR)
     
     print(f"Combined participant data saved to: {output_file}")
+    print(f"Participant counts saved to: {counts_file}")
 
 def create_csv_files(all_participants):
     """
@@ -180,8 +110,7 @@ def create_csv_files(all_participants):
         output_file = os.path.join(OUTPUT_DIR, f"{event_key}_participants.csv")
         
         with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['name', 'affiliation', 'country', 'year', 'indico_id']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=PARTICIPANT_FIELDS)
             writer.writeheader()
             for participant in participants:
                 writer.writerow(participant)
@@ -241,37 +170,14 @@ def print_participant_summary(all_participants):
 
 def lookup_institute_country(institute_name):
     """
-    Look up an institution's country using the ROR API
-    https://ror.org/about/
+    Look up an institution's country using ROR (https://ror.org/about/):
+    the offline index and the answer cache first, the API otherwise
+    (see ror_lookup)
     """
-    base_url = "https://api.ror.org/organizations"
-    
-    try:
-        # Query ROR API
-        params = {"query": institute_name}
-        response = requests.get(base_url, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data['items']:
-                # Get the first (best) match
-                best_match = data['items'][0]
-                return best_match['country']['country_name']
-        
-        # Add delay to respect rate limits
-        time.sleep(1)
-        
-    except Exception as e:
-        print(f"Error looking up {institute_name}: {e}")
-    
-    return 'Unknown'
+    return get_ror_resolver().country(institute_name)
 
-def extract_country_code(affiliation):
-    """Extract country from affiliation string"""
-    if not affiliation:
-        return 'Unknown'
-    
-    # First check for country code in parentheses
+def _affiliation_country_code(affiliation):
+    """Country named by a trailing two-letter code in parentheses, or None"""
     match = re.search(r'\((..)\)$', affiliation)
     if match:
         code_map = {
@@ -282,26 +188,79 @@ def extract_country_code(affiliation):
         }
         country_code = match.group(1)
         return code_map.get(country_code, country_code)
+    return None
+
+def extract_country_code(affiliation):
+    """Extract country from affiliation string"""
+    if not affiliation:
+        return 'Unknown'
+    
+    # First check for country code in parentheses, then try ROR
+    return _affiliation_country_code(affiliation) or lookup_institute_country(affiliation)
+
+def resolve_participant_countries(all_participants):
+    """
+    Fill in the country of participants that have none from their affiliation.
+    
+    Affiliations without a country code are resolved through ROR in one
+    batch, each distinct affiliation once.
+    
+    Parameters:
+    - all_participants: Dictionary mapping event identifiers to lists of participants
     
-    # If no country code, try ROR API
-    return lookup_institute_country(affiliation)
+    Returns:
+    - Number of participants whose country was filled in
+    """
+    missing = [p for participants in all_participants.values() for p in participants
+               if not p.get('country') and p.get('affiliation')]
+    to_resolve = [p['affiliation'] for p in missing if not _affiliation_country_code(p['affiliation'])]
+    
+    resolver = get_ror_resolver()
+    print(f"Resolving countries of {len(missing)} participants "
+          f"({len(set(to_resolve))} distinct affiliations to look up)...")
+    countries = resolver.countries(to_resolve)
+    
+    filled = 0
+    for participant in missing:
+        affiliation = participant['affiliation']
+        country = _affiliation_country_code(affiliation) or countries.get(affiliation, 'Unknown')
+        if country != 'Unknown':
+            participant['country'] = country
+            filled += 1
+    
+    print(f"Filled in {filled} countries (lookups: {resolver.stats})")
+    return filled
 
 def main():
     """
     Main function to process and organize participant data.
     """
+    parser = argparse.ArgumentParser(description="Process participant information")
+    parser.add_argument('--resolve-countries', action='store_true',
+                        help="Look up missing countries from affiliations with ROR")
+    parser.add_argument('--ror-dump', help="ROR data dump (.zip or .json) to build the offline index from")
+    parser.add_argument('--offline', action='store_true',
+                        help="Resolve countries only from the offline index and the cache")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes parsing the data files (default: chosen from the input size)")
+    args = parser.parse_args()
+    
     print("STEP 1: PROCESSING PARTICIPANT DATA")
     print("===================================")
     print("This script processes participant data from manually saved text files.")
     print("The data will be used to enhance speaker identification in the next step.")
     
     # Process all data files
-    all_participants = process_all_data_files()
+    all_participants = process_all_data_files(args.workers)
     
     if not all_participants:
         print("No participant data processed. Exiting.")
         return
     
+    if args.resolve_countries:
+        set_ror_resolver(RorResolver(index=get_ror_index(args.ror_dump), offline=args.offline))
+        resolve_participant_countries(all_participants)
+    
     # Create JSON and CSV files
     create_combined_file(all_participants)
     create_csv_files(all_participants)
@@ -0,0 +1,157 @@
+"""
+Render independent figures in parallel.
+
+The paper figures only read the conference data and write their own files,
+so they can be drawn in separate processes. render_figures sends each figure
+builder to a process pool whose workers use the non-interactive Agg backend,
+times every figure and reports failures per figure, so one broken plot does
+not stop the others.
+
+Data shared by the figures (the filtered conference data and aggregates
+computed from it) is handed to every worker once, at start-up, instead of
+being pickled with every task. Tasks name the shared values they need.
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from tracing import configure_logging, get_tracer, peak_rss_mb
+
+# Shared values of the current worker (or of the main process when running serially)
+_shared = {}
+
+
+class FigureTask:
+    """
+    One figure builder and the shared values it is called with.
+
+    Parameters:
+    - name: Label used in progress and timing output
+    - function: Module-level function that draws and saves the figure
+    - args: Names of shared values passed as positional arguments
+    """
+
+    def __init__(self, name, function, args=()):
+        self.name = name
+        self.function = function
+        self.args = tuple(args)
+
+    def __repr__(self):
+        return f"FigureTask({self.name!r})"
+
+
+def _init_worker(shared):
+    """Process pool initializer: select the Agg backend, set up logging and keep the shared values"""
+    import matplotlib
+    matplotlib.use('Agg')
+    configure_logging()
+    _shared.clear()
+    _shared.update(shared)
+
+
+def _run_task(task):
+    """
+    Run one figure task; returns (name, seconds, error text or None, usage),
+    usage being (wall-clock start, cpu seconds, peak RSS in MB, pid) of the
+    process that drew it
+    """
+    started = time.time()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    try:
+        task.function(*[_shared[name] for name in task.args])
+        error = None
+    except Exception as e:
+        error = f"{e}\n{traceback.format_exc()}"
+    finally:
+        # Never let open figures pile up in a long-lived worker
+        try:
+            import matplotlib.pyplot as plt
+            plt.close('all')
+        except Exception:
+            pass
+    usage = (started, time.process_time() - cpu, peak_rss_mb(), os.getpid())
+    return task.name, time.perf_counter() - start, error, usage
+
+
+def render_figures(tasks, shared, max_workers=None):
+    """
+    Render figures, in parallel when more than one worker is available.
+
+    Parameters:
+    - tasks: List of FigureTask
+    - shared: Dictionary of values the tasks refer to by name
+    - max_workers: Number of worker processes (default: one per CPU, at most
+      one per task); 1 renders everything in this process
+
+    Returns:
+    - Dictionary mapping task name to (seconds, error text or None), in task order
+    """
+    runnable = []
+    results = {}
+    for task in tasks:
+        unavailable = [name for name in task.args if name not in shared]
+        if unavailable:
+            results[task.name] = (0.0, f"skipped, missing {', '.join(unavailable)}")
+        else:
+            runnable.append(task)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(runnable)))
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        _run_serially(runnable, shared, results)
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(shared,)) as executor:
+                futures = [executor.submit(_run_task, task) for task in runnable]
+                for future in as_completed(futures):
+                    name, seconds, error, usage = future.result()
+                    results[name] = (seconds, error)
+                    _report(name, seconds, error, usage)
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Process pool failed ({e}); rendering remaining figures serially")
+            _run_serially([task for task in runnable if task.name not in results], shared, results)
+
+    elapsed = time.perf_counter() - start
+    _print_timing_summary(tasks, results, elapsed, max_workers)
+    return {task.name: results[task.name] for task in tasks if task.name in results}
+
+
+def _run_serially(tasks, shared, results):
+    _shared.clear()
+    _shared.update(shared)
+    try:
+        for task in tasks:
+            name, seconds, error, usage = _run_task(task)
+            results[name] = (seconds, error)
+            _report(name, seconds, error, usage)
+    finally:
+        _shared.clear()
+
+
+def _report(name, seconds, error, usage):
+    started, cpu, peak, pid = usage
+    get_tracer().record_span(name, started, seconds, cpu=cpu, peak_rss_mb=peak, category='figure', pid=pid,
+                             error=error.splitlines()[0] if error else None)
+    if error:
+        print(f"Error creating {name} ({seconds:.1f}s): {error}")
+    else:
+        print(f"Created {name} in {seconds:.1f}s")
+
+
+def _print_timing_summary(tasks, results, elapsed, workers):
+    print(f"\nFigure timings ({workers} worker{'s' if workers != 1 else ''}, {elapsed:.1f}s wall):")
+    total = 0.0
+    for task in tasks:
+        seconds, error = results.get(task.name, (0.0, 'not run'))
+        total += seconds
+        status = 'ok' if not error else error.splitlines()[0]
+        print(f"  {task.name:<32} {seconds:6.1f}s  {status}")
+    print(f"  {'total figure time':<32} {total:6.1f}s")
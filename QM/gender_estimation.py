@@ -0,0 +1,243 @@
+"""
+Batch first-name gender estimation for the gender diversity figures.
+
+estimate_genders takes the speaker column of all talks at once: each
+distinct first name is classified once (name table, then a suffix trie) and
+the labels are broadcast back to the talks. gender_coverage gives the
+per-year and per-talk-type coverage (talks with a usable first name) and
+unknown rates.
+
+Note: inferring gender from first names is a simplified approach with
+significant limitations and cultural bias; it is only meant for aggregate
+analysis with appropriate caveats.
+"""
+
+import csv
+import os
+
+from lazy_imports import lazy_module
+from talk_table import TALK_TYPES
+
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
+
+GENDERS = ['Male', 'Female', 'Unknown']
+
+# Optional CSV (columns Name, Gender) with further first names; it extends
+# and overrides the built-in table
+NAME_TABLE_FILE = 'first_name_genders.csv'
+
+# Simple very common first names (this is just a small sample)
+COMMON_FEMALE_NAMES = ['mary', 'jennifer', 'elizabeth', 'susan', 'margaret', 'sarah', 'lisa', 'emma', 'olivia',
+                       'sophia', 'mia', 'anna', 'maria', 'elena', 'julia', 'laura', 'natalia', 'alice', 'helen']
+
+COMMON_MALE_NAMES = ['john', 'robert', 'michael', 'william', 'david', 'richard', 'joseph', 'thomas', 'james',
+                     'daniel', 'matthew', 'alexander', 'peter', 'paul', 'mark', 'andrew', 'george', 'henry']
+
+# Common female name endings in various languages; checked before the male ones
+FEMALE_SUFFIXES = ['a', 'ie', 'ette', 'elle', 'ina', 'ia', 'lyn', 'en', 'ey', 'anne', 'enne']
+
+# Common male name endings in various languages
+MALE_SUFFIXES = ['o', 'us', 'er', 'on', 'in', 'im', 'el', 'an', 'or', 'en', 'as']
+
+
+def load_name_table(filename=NAME_TABLE_FILE):
+    """
+    Read a first name -> gender table from a CSV file with Name and Gender
+    columns; returns an empty dictionary if the file does not exist.
+    """
+    table = {}
+    if not os.path.exists(filename):
+        return table
+    with open(filename, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = (row.get('Name') or '').strip().lower()
+            gender = (row.get('Gender') or '').strip().capitalize()
+            if name and gender in GENDERS:
+                table[name] = gender
+    return table
+
+
+def default_name_table():
+    """The built-in first name table"""
+    table = {name: 'Female' for name in COMMON_FEMALE_NAMES}
+    table.update((name, 'Male') for name in COMMON_MALE_NAMES)
+    return table
+
+
+class SuffixTrie:
+    """
+    Trie of reversed name endings.
+
+    A name gets the label of the first suffix group (in the order given)
+    that has an ending of the name, like checking the groups' endswith()
+    lists one after the other.
+
+    Parameters:
+    - groups: List of (label, suffixes) pairs in priority order
+    """
+
+    def __init__(self, groups):
+        self._root = {}
+        self._labels = [label for label, _ in groups]
+        for priority, (_, suffixes) in enumerate(groups):
+            for suffix in suffixes:
+                node = self._root
+                for char in reversed(suffix):
+                    node = node.setdefault(char, [{}, None])
+                    node, end = node[0], node
+                if end[1] is None or priority < end[1]:
+                    end[1] = priority
+
+    def match(self, name, default='Unknown'):
+        """Label of the best suffix group with an ending of name"""
+        best = None
+        node = self._root
+        for char in reversed(name):
+            entry = node.get(char)
+            if entry is None:
+                break
+            node, priority = entry
+            if priority is not None and (best is None or priority < best):
+                best = priority
+        return default if best is None else self._labels[best]
+
+
+class GenderEstimator:
+    """
+    First name -> gender classifier with a name table and a suffix trie.
+    Results are memoised per first name.
+
+    Parameters:
+    - name_table: First name (lowercase) -> 'Male'/'Female'; default: the
+      built-in names plus NAME_TABLE_FILE if it exists
+    """
+
+    def __init__(self, name_table=None):
+        if name_table is None:
+            name_table = default_name_table()
+            name_table.update(load_name_table())
+        self.name_table = dict(name_table)
+        self.suffixes = SuffixTrie([('Female', FEMALE_SUFFIXES), ('Male', MALE_SUFFIXES)])
+        self._memo = {}
+
+    def classify(self, first_name):
+        """'Male', 'Female' or 'Unknown' for one first name"""
+        gender = self._memo.get(first_name)
+        if gender is None:
+            if not isinstance(first_name, str) or first_name == 'Unknown' or len(first_name) < 2:
+                gender = 'Unknown'
+            else:
+                name = first_name.lower().strip()
+                gender = self.name_table.get(name) or self.suffixes.match(name)
+            self._memo[first_name] = gender
+        return gender
+
+    def classify_many(self, first_names):
+        """Array of genders for a sequence of first names; each distinct name is classified once"""
+        codes, uniques = pd.factorize(pd.Series(first_names, dtype=object), use_na_sentinel=False)
+        labels = np.array([self.classify(name) for name in uniques], dtype=object)
+        return labels[codes]
+
+
+_default_estimator = None
+
+
+def get_gender_estimator():
+    """The shared GenderEstimator with the default name table"""
+    global _default_estimator
+    if _default_estimator is None:
+        _default_estimator = GenderEstimator()
+    return _default_estimator
+
+
+def speaker_first_name(speaker_name):
+    """
+    First name of a speaker, for "Last, First" or "First Last" formats;
+    'Unknown' if there is none.
+    """
+    if not isinstance(speaker_name, str):
+        return 'Unknown'
+    if ',' in speaker_name:
+        words = speaker_name.split(',', 2)[1].split()
+    else:
+        words = speaker_name.split()
+    return words[0] if words else 'Unknown'
+
+
+def _talk_speaker(talk):
+    """Speaker of a talk, falling back to its first author"""
+    speaker = talk.get('Speaker', '')
+    if isinstance(speaker, str) and speaker and speaker != 'Unknown':
+        return speaker
+    authors = talk.get('Authors')
+    if isinstance(authors, (list, tuple)):
+        return authors[0] if authors else 'Unknown'
+    if isinstance(authors, str) and authors:
+        return authors
+    return 'Unknown'
+
+
+def estimate_genders(conference_data, talk_types=TALK_TYPES, estimator=None):
+    """
+    Estimated speaker gender of every talk.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk type -> list of talks
+    - talk_types: Talk types to include
+    - estimator: GenderEstimator to use (default: get_gender_estimator())
+
+    Returns:
+    - DataFrame with Year, Talk_Type, First_Name and Gender columns, one row per talk
+    """
+    estimator = estimator or get_gender_estimator()
+
+    years, types, speakers = [], [], []
+    for year in conference_data:
+        for talk_type in talk_types:
+            talks = conference_data[year].get(talk_type) or []
+            years.extend([year] * len(talks))
+            types.extend([talk_type] * len(talks))
+            speakers.extend(_talk_speaker(talk) for talk in talks)
+
+    # First names of the distinct speakers, broadcast back to the talks
+    speaker_codes, unique_speakers = pd.factorize(pd.Series(speakers, dtype=object), use_na_sentinel=False)
+    unique_first_names = np.array([speaker_first_name(name) for name in unique_speakers], dtype=object)
+    first_names = unique_first_names[speaker_codes]
+
+    return pd.DataFrame({
+        'Year': pd.Categorical(years, categories=list(conference_data.keys())),
+        'Talk_Type': pd.Categorical(types, categories=list(talk_types)),
+        'First_Name': first_names,
+        'Gender': pd.Categorical(estimator.classify_many(first_names), categories=GENDERS),
+    })
+
+
+def gender_counts(genders, by):
+    """Nested dictionary {value of column by: {gender: talks}} from an estimate_genders frame"""
+    table = pd.crosstab(genders[by], genders['Gender'], dropna=False)
+    table = table.reindex(columns=GENDERS, fill_value=0)
+    return {key: {gender: int(count) for gender, count in row.items()} for key, row in table.iterrows()}
+
+
+def gender_coverage(genders, by):
+    """
+    Coverage and unknown rate of an estimate_genders frame per value of
+    column by ('Year' or 'Talk_Type').
+
+    Returns:
+    - DataFrame with Talks, Coverage (% of talks with a usable first name)
+      and Unknown_Rate (% of talks classified 'Unknown') columns
+    """
+    usable = genders['First_Name'].map(lambda name: isinstance(name, str) and name != 'Unknown' and len(name) >= 2)
+    grouped = pd.DataFrame({
+        by: genders[by],
+        'usable': usable.astype(float),
+        'unknown': (genders['Gender'] == 'Unknown').astype(float),
+    }).groupby(by, observed=False)
+
+    return pd.DataFrame({
+        'Talks': grouped.size(),
+        'Coverage': grouped['usable'].mean().fillna(0) * 100,
+        'Unknown_Rate': grouped['unknown'].mean().fillna(0) * 100,
+    })
@@ -1,51 +1,29 @@
-import requests
 import json
 import re
 import os
 from datetime import datetime
 from collections import Counter
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-import numpy as np
-import matplotlib.gridspec as gridspec
-from matplotlib.colors import LinearSegmentedColormap
-from wordcloud import WordCloud
-import pandas as pd
 import csv
-from bs4 import BeautifulSoup
-import seaborn as sns
 import sys
 import time
+from lazy_imports import lazy_module
+from affiliation_matcher import CountryMatcher
+from institute_names import normalize_institute_name
+from indico_cache import get_export_url, get_export_digest, load_event_header, iter_cached_contributions, prefetch_event_exports
+from participant_index import ParticipantIndex
+from person_table import PERSON_KEY_COLUMN, split_speaker_payloads
+from processed_store import save_talk_store
+from processing_manifest import (load_manifest, save_manifest, event_inputs, is_up_to_date, changed_inputs,
+                                 record_event, mapping_db_hash, code_version)
+from session_rules import get_contribution_classifier, get_session_classifier
+from talk_table import count_talks
+from talk_record import TalkRecord, talk_record_to_json
+from tracing import configure_logging, export_trace, log, stage, timed, timed_iter
 
-# Increase all font sizes by 30% - handling both numeric and string font sizes
-default_font_size = plt.rcParams.get('font.size', 10)
-if isinstance(default_font_size, str):
-    try:
-        default_font_size = float(default_font_size)
-    except ValueError:
-        default_font_size = 10
-
-# Set the base font size with 30% increase
-new_font_size = default_font_size * 1.3
-
-# Update all font-related parameters
-plt.rcParams.update({
-    'font.size': new_font_size,
-    'axes.titlesize': 'large',  # Use relative size names instead of multiplication
-    'axes.labelsize': 'medium',
-    'xtick.labelsize': 'medium',
-    'ytick.labelsize': 'medium',
-    'legend.fontsize': 'medium',
-    'figure.titlesize': 'x-large'
-})
-
-# Set font that supports CJK characters
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'DejaVu Sans', 'Microsoft YaHei']
-plt.rcParams['axes.unicode_minus'] = False
-
-# Create directories if they don't exist
-os.makedirs('data', exist_ok=True)
-os.makedirs('figs', exist_ok=True)
+# Heavy packages are imported on first use (see lazy_imports)
+requests = lazy_module('requests')
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
 
 # Define country names and keywords for detection
 COUNTRY_NAMES = {
@@ -180,36 +158,8 @@ FLASH_TALK_COUNTS = {
     '2023': 10   # From session https://indico.cern.ch/event/1139644/sessions/488508/
 }
 
-# At the beginning of the file, add:
-INSTITUTE_COUNTRY_MAPPINGS = {}
-
-def normalize_institute_name(name):
-    """Normalize institute name for better matching"""
-    if not name:
-        return ""
-    
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Remove special characters and extra whitespace
-    name = re.sub(r'[^\w\s]', ' ', name)
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    # Remove common words that don't help with matching
-    for word in ['university', 'institute', 'national', 'laboratory', 'department', 
-                'center', 'centre', 'research', 'of', 'for', 'and', 'the', 'in']:
-        name = re.sub(r'\b' + word + r'\b', '', name)
-    
-    # Remove country codes in parentheses
-    name = re.sub(r'\([a-z]{2}\)', '', name)
-    
-    # Remove numbers
-    name = re.sub(r'\d+', '', name)
-    
-    # Remove extra spaces created during the process
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    return name
+# Loaded from data/unknown_institute_mappings.csv on first use (see get_institute_country_mappings)
+INSTITUTE_COUNTRY_MAPPINGS = None
 
 def load_institute_country_database():
     """Load institute-to-country mappings from external database file with enhanced matching"""
@@ -345,8 +295,25 @@ def update_institute_country_database(unknown_institutes):
     print(f"Wrote {len(unknown_institutes)} unknown institutes to '{unknown_file}'")
     print("Please add country information to these institutes and merge into the main database")
 
-def extract_country(affiliation, institute_country_db):
-    """Extract country from affiliation using various methods including database lookup"""
+def country_matcher(institute_country_db):
+    """
+    Compile the database, built-in institutions, institute mappings and
+    country keywords into one CountryMatcher; earlier tables take priority
+    over later ones. Build it once and pass it to extract_country.
+    """
+    return CountryMatcher(institute_country_db, COUNTRY_KEYWORDS,
+                          [INSTITUTION_COUNTRY, get_institute_country_mappings()])
+
+def extract_country(affiliation, institute_country_db, matcher=None):
+    """
+    Extract country from affiliation using various methods including database lookup
+    
+    Parameters:
+    - affiliation: Affiliation text
+    - institute_country_db: Institute -> country mapping
+    - matcher: country_matcher(institute_country_db), compiled once by the
+      caller (built for this call if None)
+    """
     if not affiliation:
         return 'Unknown'
     
@@ -370,46 +337,42 @@ def extract_country(affiliation, institute_country_db):
         }
         return country_code_map.get(country_code, country_code)
     
+    if matcher is None:
+        matcher = country_matcher(institute_country_db)
+    
     # Check if the affiliation directly contains a country name at the end
     # This handles cases like "University of Jyvaskyla, Finland"
-    if ',' in affiliation:
-        last_part = affiliation.split(',')[-1].strip()
-        # Check if this last part is a known country name
-        for country, keywords in COUNTRY_KEYWORDS.items():
-            if last_part.upper() in [k.upper() for k in keywords]:
-                return country
-    
-    # Check against institute-country database
-    for inst, country in institute_country_db.items():
-        if inst.upper() in affiliation.upper():
-            return country
+    country = matcher.match_last_part(affiliation)
+    if country:
+        return country
     
-    # Try to find country keywords
-    affiliation_upper = affiliation.upper()
-    for country, keywords in COUNTRY_KEYWORDS.items():
-        if any(keyword.upper() in affiliation_upper for keyword in keywords):
-            return country
+    # Check against institute-country database, then country keywords, in one pass
+    country = matcher.match(affiliation)
+    if country:
+        return country
     
     # If no country is found, return the last part of the affiliation
     parts = [p.strip() for p in affiliation.split(',')]
     return parts[-1] if parts else 'Unknown'
 
 def validate_indico_url(indico_id, year):
-    """Validate Indico URL and check if it's the correct conference"""
-    url = f"https://indico.cern.ch/export/event/{indico_id}.json?detail=contributions&pretty=yes"
+    """
+    Validate Indico URL and check if it's the correct conference.
+    
+    The returned data is the export without its contributions; use
+    iter_cached_contributions to stream those.
+    """
+    url = get_export_url(indico_id)
     
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        data = response.json()
+        data, cache_status = load_event_header(indico_id)
         if not data or 'results' not in data or not data['results']:
             return False, "No data found", None
             
         event_title = data['results'][0].get('title', '').lower()
-        print(f"\nChecking URL: {url}")
-        print(f"Response status code: {response.status_code}")
-        print(f"Event title: {data['results'][0].get('title', '')}")
+        log.info("Checking URL: %s", url)
+        log.debug("Export cache status: %s", cache_status)
+        log.info("Event title: %s", data['results'][0].get('title', ''))
         
         # Special case for QM2022
         if year == '2022' and indico_id == '895086':
@@ -438,96 +401,18 @@ def validate_indico_url(indico_id, year):
     except ValueError as e:
         return False, f"Error parsing JSON: {str(e)}", None
 
+@timed('classify')
 def categorize_session(session_name, title, year):
-    """Categorize a session as plenary, parallel, or poster"""
-    # Convert inputs to strings and handle None values
-    session_lower = str(session_name or '').lower()
-    title_lower = str(title or '').lower()
-    
-    # Special handling for 2011
-    if year == '2011':
-        if isinstance(session_name, dict):
-            session_lower = str(session_name.get('title', '')).lower()
-        if 'plenary' in session_lower:
-            return "plenary"
-        if any(x in session_lower for x in ['parallel', 'track']):
-            return "parallel"
-        if 'poster' in session_lower:
-            return "poster"
-    
-    # Regular categorization for other years
-    if 'poster' in session_lower or 'poster' in title_lower:
-        return "poster"
-    
-    # Check for other non-talk sessions
-    if any(x in session_lower or x in title_lower for x in [
-        'flash', 'student day', 'teacher', 'award', 'medal',
-        'opening', 'closing', 'welcome'
-    ]):
-        return "other"
-    
-    # Only exclude discussions from plenary, but keep them for parallel
-    if 'discussion' in title_lower and 'plenary' in session_lower:
-        return "other"
-    
-    # Year-specific patterns
-    if year == '2023':
-        if 'plenary session' in session_lower:
-            return "plenary"
-        if any(x in session_lower for x in [
-            'jets', 'heavy flavor', 'collective dynamics', 'new theory',
-            'small systems', 'initial state', 'qcd at finite t',
-            'light flavor', 'em probes', 'critical point', 'chirality',
-            'spin/eic physics', 'future experiments', 'astrophysics', 'upc',
-            'discussion'  # Include discussions in parallel sessions
-        ]):
-            return "parallel"
-            
-    elif year == '2014':
-        if 'plenary' in session_lower:
-            return "plenary"
-        if any(x in session_lower for x in [
-            'heavy flavor', 'jets', 'correlations and fluctuations',
-            'collective dynamics', 'qcd phase diagram', 'electromagnetic probes',
-            'initial state physics', 'new theoretical developments',
-            'thermodynamics and hadron chemistry', 'approach to equilibrium',
-            'discussion'  # Include discussions in parallel sessions
-        ]):
-            return "parallel"
-            
-    elif year == '2015':
-        if 'plenary session' in session_lower:
-            return "plenary"
-        if any(x in session_lower.replace('-', ' ') for x in [
-            'jets and high pt', 'correlations and fluctuations',
-            'qgp in small systems', 'initial state physics',
-            'open heavy flavors', 'collective dynamics',
-            'quarkonia', 'electromagnetic probes',
-            'discussion'  # Include discussions in parallel sessions
-        ]):
-            return "parallel"
-            
-    elif year == '2018':
-        if 'plenary' in session_lower:
-            return "plenary"
-        if any(x in session_lower for x in [
-            'jet modifications', 'collective dynamics', 'collectivity in small systems',
-            'quarkonia', 'initial state physics', 'correlations and fluctuations',
-            'open heavy flavour', 'chirality', 'phase diagram', 'qcd at high temperature',
-            'electromagnetic and weak probes', 'new theoretical developments',
-            'thermodynamics and hadron chemistry', 'high baryon density',
-            'discussion'  # Include discussions in parallel sessions
-        ]):
-            return "parallel"
-            
-    else:
-        # General patterns for other years
-        if 'plenary' in session_lower:
-            return "plenary"
-        if 'parallel' in session_lower or 'discussion' in session_lower:
-            return "parallel"
-    
-    return "unknown"
+    """Categorize a session as plenary, parallel, or poster (rules in session_rules.SESSION_RULES)"""
+    return get_session_classifier(year).classify(session_name, title)
+
+@timed('classify')
+def classify_contribution(title, session, contrib_type, year):
+    """
+    Session type of a contribution: the Sunday, Early Career and 2011 type
+    checks, then the rules of categorize_session (see session_rules)
+    """
+    return get_contribution_classifier(year).classify(session, title, contrib_type)
 
 def should_exclude_contribution(title, session, year):
     """Check if a contribution should be excluded from statistics"""
@@ -562,6 +447,7 @@ def should_exclude_contribution(title, session, year):
     return any(keyword in title_lower or keyword in session_lower 
               for keyword in exclude_keywords)
 
+@timed('resolve country')
 def extract_speaker_info(speakers):
     """
     Extract speaker name, affiliation, and country from speaker data.
@@ -710,8 +596,8 @@ def fetch_and_process_contributions(indico_id, year):
         if not results:
             return None
             
-        event_data = results[0]
-        contributions = event_data.get('contributions', [])
+        # Stream contributions from the cached export so only one is decoded at a time
+        contributions = timed_iter(iter_cached_contributions(indico_id), 'decode')
         
         all_talks = []
         plenary_talks = []
@@ -722,19 +608,13 @@ def fetch_and_process_contributions(indico_id, year):
         unknown_plenary = []
         unknown_parallel = []
         
-        # Common keywords for all years
-        sunday_keywords = ['sunday', 'Sunday']
-        
         # Manual corrections for 2011
         manual_corrections_2011 = {
             'Satow, Daisuke': {'Institute': 'RIKEN', 'Country': 'Japan'}
         }
         
         if year == '2011':
-            print(f"\nProcessing contributions for QM2011...")
-            
-            # Define other sessions for 2011
-            other_sessions = ['Famous plot session']
+            log.debug("Processing contributions for QM2011...")
             
             for i, contribution in enumerate(contributions, 1):
                 title = contribution.get('title', '')
@@ -760,27 +640,8 @@ def fetch_and_process_contributions(indico_id, year):
                     affiliation = correction['Institute']
                     country = correction['Country']
                 
-                # Common check for Sunday sessions first
-                if any(sunday in str(title) for sunday in sunday_keywords) or \
-                   any(sunday in str(track) for sunday in sunday_keywords):
-                    session_type = 'other'
-                # Then 2011-specific categorization
-                elif track in other_sessions:
-                    session_type = 'other'
-                elif contrib_type == 'Poster':
-                    session_type = 'poster'
-                elif contrib_type == 'Plenary':
-                    session_type = 'plenary'
-                elif contrib_type == 'Parallel':
-                    session_type = 'parallel'
-                elif contrib_type == 'Flash':
-                    session_type = 'flash'
-                elif 'plenary' in str(track).lower():
-                    session_type = 'unknown_plenary'
-                elif track:
-                    session_type = 'unknown_parallel'
-                else:
-                    session_type = 'unknown_parallel'
+                # Sunday sessions, then the 2011 contribution types (see session_rules)
+                session_type = classify_contribution(title, track, contrib_type, year)
                 
                 # Extract abstract information
                 abstract = ""
@@ -791,16 +652,16 @@ def fetch_and_process_contributions(indico_id, year):
                 elif 'summary' in contribution and contribution['summary']:
                     abstract = contribution['summary']
                 
-                talk_data = {
-                    'Session': track,
-                    'Type': session_type,
-                    'Title': title,
-                    'Speaker': name,
-                    'Institute': affiliation,
-                    'Country': country,
-                    'Abstract': abstract,  # Add the abstract field
-                    'Raw_Speaker_Data': speakers[0] if speakers else None
-                }
+                talk_data = TalkRecord(
+                    Session=track,
+                    Type=session_type,
+                    Title=title,
+                    Speaker=name,
+                    Institute=affiliation,
+                    Country=country,
+                    Abstract=abstract,
+                    Raw_Speaker_Data=speakers[0] if speakers else None
+                )
                 
                 all_talks.append(talk_data)
                 if session_type == "plenary":
@@ -819,25 +680,13 @@ def fetch_and_process_contributions(indico_id, year):
                     unknown_parallel.append(talk_data)
         
         elif year == '2025':
-            # Define session categories
-            other_sessions = ['Early Career Researcher Day']
-            
             for i, contribution in enumerate(contributions, 1):
                 title = contribution.get('title', '')
                 session = contribution.get('session', '')
-                contrib_type = str(contribution.get('type', '')).lower()
-                session_str = str(session)
+                contrib_type = contribution.get('type', '')
                 
-                # Add Sunday check before other categorization
-                if any(sunday in str(title) for sunday in sunday_keywords) or \
-                   any(sunday in str(session) for sunday in sunday_keywords):
-                    session_type = 'other'
-                elif 'poster' in session_str.lower() or 'poster' in contrib_type:
-                    session_type = 'poster'
-                elif any(os in session_str for os in other_sessions):
-                    session_type = 'other'
-                else:
-                    session_type = categorize_session(session, title, year)
+                # Sunday, poster and Early Career sessions before the session rules
+                session_type = classify_contribution(title, session, contrib_type, year)
                 
                 # Extract speaker information
                 speakers = (contribution.get('speakers', []) or 
@@ -855,16 +704,16 @@ def fetch_and_process_contributions(indico_id, year):
                 elif 'summary' in contribution and contribution['summary']:
                     abstract = contribution['summary']
                 
-                talk_data = {
-                    'Session': session,
-                    'Type': session_type,
-                    'Title': title,
-                    'Speaker': name,
-                    'Institute': affiliation,
-                    'Country': country,
-                    'Abstract': abstract,  # Add the abstract field
-                    'Raw_Speaker_Data': speakers[0] if speakers else None
-                }
+                talk_data = TalkRecord(
+                    Session=session,
+                    Type=session_type,
+                    Title=title,
+                    Speaker=name,
+                    Institute=affiliation,
+                    Country=country,
+                    Abstract=abstract,
+                    Raw_Speaker_Data=speakers[0] if speakers else None
+                )
                 
                 all_talks.append(talk_data)
                 if session_type == "plenary":
@@ -882,12 +731,7 @@ def fetch_and_process_contributions(indico_id, year):
                 # Add Sunday check before normal categorization
                 title = contribution.get('title', '')
                 session = contribution.get('session', '')
-                
-                if any(sunday in str(title) for sunday in sunday_keywords) or \
-                   any(sunday in str(session) for sunday in sunday_keywords):
-                    session_type = 'other'
-                else:
-                    session_type = categorize_session(session, title, year)
+                session_type = classify_contribution(title, session, contribution.get('type', ''), year)
                 
                 # Extract speaker information
                 speakers = (contribution.get('speakers', []) or 
@@ -905,16 +749,16 @@ def fetch_and_process_contributions(indico_id, year):
                 elif 'summary' in contribution and contribution['summary']:
                     abstract = contribution['summary']
                 
-                talk_data = {
-                    'Session': session,
-                    'Type': session_type,
-                    'Title': title,
-                    'Speaker': name,
-                    'Institute': affiliation,
-                    'Country': country,
-                    'Abstract': abstract,  # Add the abstract field
-                    'Raw_Speaker_Data': speakers[0] if speakers else None
-                }
+                talk_data = TalkRecord(
+                    Session=session,
+                    Type=session_type,
+                    Title=title,
+                    Speaker=name,
+                    Institute=affiliation,
+                    Country=country,
+                    Abstract=abstract,
+                    Raw_Speaker_Data=speakers[0] if speakers else None
+                )
                 
                 # Apply any manual corrections
                 talk_data = apply_manual_corrections(talk_data, year)
@@ -937,46 +781,23 @@ def fetch_and_process_contributions(indico_id, year):
         total_unknown_aff = unknown_plenary_aff + unknown_parallel_aff + unknown_poster_aff + unknown_flash_aff
         
         if year == '2011':
-            print(f"\nFinished processing QM2011:")
-            print(f"Total (main categories): {total_main}")
-            print(f"\nDetailed breakdown:")
-            print(f"Plenary: {len(plenary_talks)} (Unknown aff: {unknown_plenary_aff})")
-            print(f"Parallel: {len(parallel_talks)} (Unknown aff: {unknown_parallel_aff})")
-            print(f"Poster: {len(poster_talks)} (Unknown aff: {unknown_poster_aff})")
-            print(f"Flash: {len(flash_talks)} (Unknown aff: {unknown_flash_aff})")
-            print(f"\nTotal unknown affiliations: {total_unknown_aff}")
-            
-            # Print details of unknown affiliations
-            print("\nDetails of unknown affiliations:")
+            log.info("Finished processing QM2011: %d talks in the main categories", total_main)
+            log.info("Plenary: %d (Unknown aff: %d)", len(plenary_talks), unknown_plenary_aff)
+            log.info("Parallel: %d (Unknown aff: %d)", len(parallel_talks), unknown_parallel_aff)
+            log.info("Poster: %d (Unknown aff: %d)", len(poster_talks), unknown_poster_aff)
+            log.info("Flash: %d (Unknown aff: %d)", len(flash_talks), unknown_flash_aff)
+            log.info("Total unknown affiliations: %d", total_unknown_aff)
             
-            if unknown_plenary_aff > 0:
-                print("\nPlenary talks with unknown affiliations:")
-                for talk in plenary_talks:
-                    if not talk['Institute']:
-                        print(f"- {talk['Title']} (Speaker: {talk['Speaker']})")
-            
-            if unknown_parallel_aff > 0:
-                print("\nParallel talks with unknown affiliations:")
-                for talk in parallel_talks:
-                    if not talk['Institute']:
-                        print(f"- {talk['Title']} (Speaker: {talk['Speaker']})")
-            
-            if unknown_poster_aff > 0:
-                print("\nPoster talks with unknown affiliations:")
-                for talk in poster_talks:
-                    if not talk['Institute']:
-                        print(f"- {talk['Title']} (Speaker: {talk['Speaker']})")
-            
-            if unknown_flash_aff > 0:
-                print("\nFlash talks with unknown affiliations:")
-                for talk in flash_talks:
+            # Details of unknown affiliations, one line per talk
+            for label, talks in (('Plenary', plenary_talks), ('Parallel', parallel_talks),
+                                 ('Poster', poster_talks), ('Flash', flash_talks)):
+                for talk in talks:
                     if not talk['Institute']:
-                        print(f"- {talk['Title']} (Speaker: {talk['Speaker']})")
+                        log.debug("%s talk with unknown affiliation: %s (Speaker: %s)",
+                                  label, talk['Title'], talk['Speaker'])
             
-            print(f"\nOther categories (not in total):")
-            print(f"Other: {len(other_talks)}")
-            print(f"Unknown Plenary: {len(unknown_plenary)}")
-            print(f"Unknown Parallel: {len(unknown_parallel)}")
+            log.info("Other categories (not in total): Other %d, Unknown Plenary %d, Unknown Parallel %d",
+                     len(other_talks), len(unknown_plenary), len(unknown_parallel))
         
         return {
             'all_talks': all_talks,
@@ -998,7 +819,7 @@ def fetch_and_process_contributions(indico_id, year):
         }
         
     except Exception as e:
-        print(f"Error processing QM{year}: {str(e)}")
+        log.error("Error processing QM%s: %s", year, e)
         return None
 
 
@@ -1053,7 +874,7 @@ def extract_affiliation_info(talk_data):
         # If no country code found, try matching with known institutions
         if country == 'Unknown':
             inst_lower = institute.lower()
-            for known_inst, known_country in INSTITUTE_COUNTRY_MAPPINGS.items():
+            for known_inst, known_country in get_institute_country_mappings().items():
                 if known_inst.lower() in inst_lower:
                     country = known_country
                     break
@@ -1104,7 +925,7 @@ def extract_participants_from_contributions(indico_id, year, output_file='data/p
     Returns:
     - Dictionary mapping participant names to their affiliations
     """
-    url = f"https://indico.cern.ch/export/event/{indico_id}.json?detail=contributions&pretty=yes"
+    url = get_export_url(indico_id)
     print(f"\nExtracting participant data from contributions API: {url}")
     
     participants = {}
@@ -1113,28 +934,12 @@ def extract_participants_from_contributions(indico_id, year, output_file='data/p
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
-        # Fetch data from Indico API
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Check for error responses
-        if 'error' in data:
-            print(f"API error: {data['error']}")
-            return {}
-        
-        # Process participant data based on Indico's JSON structure
-        results = data.get('results', [])
-        if not results:
-            print("No data found in the API response.")
-            return {}
-        
-        event_data = results[0]
-        contributions = event_data.get('contributions', [])
+        # Stream contributions from the export cache shared with validate_indico_url;
+        # the rest of the document ends up in header
+        header = {}
         
         # Collect all unique participants from contributions
-        for contribution in contributions:
+        for contribution in iter_cached_contributions(indico_id, header):
             # Extract speakers
             speakers = (
                 contribution.get('speakers', []) or 
@@ -1177,6 +982,15 @@ def extract_participants_from_contributions(indico_id, year, output_file='data/p
                         'OriginalName': name
                     }
         
+        # Check for error responses
+        if 'error' in header:
+            print(f"API error: {header['error']}")
+            return {}
+        
+        if not header.get('results'):
+            print("No data found in the API response.")
+            return {}
+        
         # Write to CSV file
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write("Name,Institute,Country,Year\n")
@@ -1202,96 +1016,155 @@ def extract_participants_from_contributions(indico_id, year, output_file='data/p
         print(f"Unexpected error: {str(e)}")
         return {}
 
-def load_participant_data():
-    """Load processed participant data from all_participants.csv file"""
-    participant_file = 'data/participants/all_participants.csv'
+# Country codes found in participant affiliations, e.g. "Wayne State University (US)"
+PARTICIPANT_COUNTRY_CODES = {
+    'US': 'United States',
+    'USA': 'United States',
+    'UK': 'United Kingdom',
+    'AT': 'Austria',
+    'PL': 'Poland',
+    'DE': 'Germany',
+    'FR': 'France',
+    'IT': 'Italy',
+    'JP': 'Japan',
+    'CN': 'China',
+    'IN': 'India',
+    'CH': 'Switzerland',
+    'NL': 'Netherlands',
+    'RU': 'Russia',
+    'BR': 'Brazil',
+    'ES': 'Spain'
+}
+
+# Countries of participants without a country code, by institution (first match wins)
+PARTICIPANT_INSTITUTION_COUNTRIES = {
+    'columbia university': 'United States',
+    'wayne state': 'United States',
+    'ohio university': 'United States',
+    'university of tennessee': 'United States',
+    'stony brook': 'United States',
+    'brookhaven': 'United States',
+    'agh university': 'Poland',
+    'nuclear physics polish': 'Poland',
+    'austrian academy': 'Austria'
+}
+
+def affiliation_countries(affiliations):
+    """
+    Country names implied by affiliations, computed column-wise: the
+    two-letter code at the end ("... (US)"), else a known institution.
+    
+    Parameters:
+    - affiliations: Series of affiliations
     
+    Returns:
+    - Series of country names ('' where none is found); codes without a
+      name in PARTICIPANT_COUNTRY_CODES are kept as they are
+    """
+    codes = affiliations.str.extract(r'\((..)\)$', expand=False).fillna('').astype(object)
+    countries = codes.map(PARTICIPANT_COUNTRY_CODES).fillna(codes)
+    
+    missing = countries == ''
+    if missing.any():
+        affiliations_lower = affiliations[missing].str.lower()
+        found = pd.Series('', index=affiliations_lower.index, dtype=object)
+        for institution, country in PARTICIPANT_INSTITUTION_COUNTRIES.items():
+            found = found.mask((found == '') & affiliations_lower.str.contains(institution, regex=False), country)
+        countries = countries.mask(missing, found)
+    return countries
+
+def participant_countries(countries, affiliations):
+    """
+    Country names of participants.
+    
+    Given country codes are mapped to names; participants without one get
+    the country of their affiliation. Affiliations repeat across years and
+    events, so each distinct affiliation is evaluated once.
+    
+    Parameters:
+    - countries: Series of country codes as saved by fetch_participants ('' if none)
+    - affiliations: Series of affiliations
+    
+    Returns:
+    - Numpy array of country names, 'Unknown' where none is found
+    """
+    affiliation_codes, unique_affiliations = pd.factorize(affiliations)
+    derived = affiliation_countries(pd.Series(unique_affiliations, dtype=object)).to_numpy(dtype=object)
+    
+    given = countries.astype(object)
+    given = given.map(PARTICIPANT_COUNTRY_CODES).fillna(given).to_numpy(dtype=object)
+    result = np.where(given == '', derived[affiliation_codes], given)
+    result[result == ''] = 'Unknown'
+    return result
+
+def normalized_participant_names(names):
+    """
+    "Last, First" forms of names with several words and no comma, computed
+    once per distinct name.
+    
+    Returns:
+    - Numpy array with the normalized name, or None, per name
+    """
+    name_codes, unique_names = pd.factorize(names)
+    unique_names = pd.Series(unique_names, dtype=object)
+    parts = unique_names.str.split()
+    reversible = (~unique_names.str.contains(',', regex=False) & unique_names.str.contains(' ', regex=False)
+                  & (parts.str.len() > 1))
+    normalized = (parts.str[-1] + ', ' + parts.str[:-1].str.join(' ')).where(reversible, None)
+    return normalized.to_numpy(dtype=object)[name_codes]
+
+def load_participant_data(participant_file='data/participants/all_participants.csv'):
+    """
+    Load processed participant data from all_participants.csv file.
+    
+    Countries and normalized names are computed column-wise, once per
+    distinct affiliation and name, and the lookup is built in bulk
+    (benchmarks/participant_loading.py compares this with the row-by-row
+    loader it replaced).
+    
+    Parameters:
+    - participant_file: Combined participant CSV written by fetch_participants.py
+    
+    Returns:
+    - Dictionary mapping participant names (as given and as "Last, First")
+      to {'affiliation', 'country', 'year'}; later rows of the same name win
+    """
     try:
         # First check if file exists
         if not os.path.exists(participant_file):
             print(f"\nWarning: Participant data file not found at {participant_file}")
             print("Please run 'python QM/fetch_participants.py' first to generate the data.")
             return {}
-            
-        # Create a lookup dictionary for faster access
+        
+        df = pd.read_csv(participant_file, usecols=['name', 'affiliation', 'country', 'year'],
+                         dtype=object, keep_default_na=False)
+        total_records = len(df)
+        years_processed = set(df['year'].unique())
+        
+        names = df['name'].to_numpy(dtype=object)
+        affiliations = df['affiliation'].to_numpy(dtype=object)
+        years = df['year'].to_numpy(dtype=object)
+        countries = participant_countries(df['country'], df['affiliation'])
+        normalized_names = normalized_participant_names(df['name'])
+        
+        # Each name is followed by its normalized form, in file order, so the
+        # lookup keeps the key order (and last-wins rows) of inserting row by row
+        keys = np.empty(2 * total_records, dtype=object)
+        keys[0::2] = names
+        keys[1::2] = normalized_names
+        rows = np.repeat(np.arange(total_records), 2)
+        keep = keys != None  # noqa: E711 (element-wise)
+        row_by_name = dict(zip(keys[keep].tolist(), rows[keep].tolist()))
+        
+        # One record per row that a name still points to
+        records = {}
         participant_lookup = {}
-        years_processed = set()
-        total_records = 0
-        
-        with open(participant_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total_records += 1
-                name = row['name']
-                affiliation = row['affiliation']
-                country = row['country']
-                year = row['year']
-                
-                # Extract country from affiliation if not provided
-                if not country and '(' in affiliation:
-                    match = re.search(r'\((..)\)$', affiliation)
-                    if match:
-                        country = match.group(1)
-                
-                # Clean up country codes
-                if country:
-                    country_map = {
-                        'US': 'United States',
-                        'USA': 'United States',
-                        'UK': 'United Kingdom',
-                        'AT': 'Austria',
-                        'PL': 'Poland',
-                        'DE': 'Germany',
-                        'FR': 'France',
-                        'IT': 'Italy',
-                        'JP': 'Japan',
-                        'CN': 'China',
-                        'IN': 'India',
-                        'CH': 'Switzerland',
-                        'NL': 'Netherlands',
-                        'RU': 'Russia',
-                        'BR': 'Brazil',
-                        'ES': 'Spain'
-                    }
-                    country = country_map.get(country, country)
-                
-                # Detect country from known institutions if still unknown
-                if not country:
-                    inst_lower = affiliation.lower()
-                    inst_country_map = {
-                        'columbia university': 'United States',
-                        'wayne state': 'United States',
-                        'ohio university': 'United States',
-                        'university of tennessee': 'United States',
-                        'stony brook': 'United States',
-                        'brookhaven': 'United States',
-                        'agh university': 'Poland',
-                        'nuclear physics polish': 'Poland',
-                        'austrian academy': 'Austria'
-                    }
-                    
-                    for inst, inst_country in inst_country_map.items():
-                        if inst in inst_lower:
-                            country = inst_country
-                            break
-                
-                years_processed.add(year)
-                
-                # Store both original and normalized versions of the name
-                participant_data = {
-                    'affiliation': affiliation,
-                    'country': country if country else 'Unknown',
-                    'year': year
-                }
-                
-                participant_lookup[name] = participant_data
-                
-                # Also store last_name, first_name format if possible
-                if ',' not in name and ' ' in name:
-                    parts = name.split()
-                    if len(parts) > 1:
-                        normalized_name = f"{parts[-1]}, {' '.join(parts[:-1])}"
-                        participant_lookup[normalized_name] = participant_data
+        for name, row in row_by_name.items():
+            record = records.get(row)
+            if record is None:
+                record = records[row] = {'affiliation': affiliations[row], 'country': countries[row],
+                                         'year': years[row]}
+            participant_lookup[name] = record
         
         print(f"\nLoaded {len(participant_lookup)} participant records from {total_records} entries")
         print(f"Years covered: {sorted(years_processed)}")
@@ -1300,10 +1173,9 @@ def load_participant_data():
         unknown_count = sum(1 for p in participant_lookup.values() if p['country'] == 'Unknown')
         if unknown_count > 0:
             print(f"\nWarning: {unknown_count} participants still have unknown countries")
-            print("\nSample of entries with unknown countries:")
             for name, data in participant_lookup.items():
                 if data['country'] == 'Unknown':
-                    print(f"  {name}: {data['affiliation']}")
+                    log.debug("Sample entry with unknown country: %s: %s", name, data['affiliation'])
                     if len(data['affiliation']) > 0:  # Only show a few examples
                         break
         
@@ -1325,11 +1197,18 @@ def fix_unknown_institutes_from_participants(conference_data, participant_lookup
     
     Returns:
     - Tuple of (institute_fixes, country_fixes)
+    
+    Each talk matched to a participant records how in 'Participant_Match'
+    (see participant_index for the possible values).
     """
     print("\nFixing unknown institutes using participant data...")
     
     institute_fixes = 0
     country_fixes = 0
+    match_counts = Counter()
+    
+    # Index the participant names once instead of scanning them for every talk
+    participant_index = ParticipantIndex(participant_lookup)
     
     for year, data in conference_data.items():
         # Process all talk types
@@ -1342,18 +1221,13 @@ def fix_unknown_institutes_from_participants(conference_data, participant_lookup
                 if not speaker:
                     continue
                 
-                # Try exact match first
-                participant = participant_lookup.get(speaker)
-                
-                # If no exact match, try fuzzy matching
-                if not participant:
-                    speaker_lower = speaker.lower()
-                    for p_name, p_data in participant_lookup.items():
-                        if speaker_lower in p_name.lower() or p_name.lower() in speaker_lower:
-                            participant = p_data
-                            break
+                # Exact match first, then either name containing the other
+                participant, match_quality = participant_index.find(speaker)
                 
                 if participant:
+                    talk['Participant_Match'] = match_quality
+                    match_counts[match_quality] += 1
+                    
                     # Fix institute if unknown
                     if not talk.get('Institute') or talk['Institute'] == 'Unknown':
                         talk['Institute'] = participant['affiliation']
@@ -1365,33 +1239,52 @@ def fix_unknown_institutes_from_participants(conference_data, participant_lookup
                         country_fixes += 1
     
     print(f"Applied {institute_fixes} institute fixes and {country_fixes} country fixes")
+    if match_counts:
+        print("Participant matches by quality: " +
+              ", ".join(f"{quality}: {count}" for quality, count in match_counts.most_common()))
     return institute_fixes, country_fixes
 
+def _talks_frame(talks):
+    """DataFrame of talk rows; Person_Key stays an integer column with missing values"""
+    df = pd.DataFrame(talks)
+    if PERSON_KEY_COLUMN in df.columns:
+        df[PERSON_KEY_COLUMN] = df[PERSON_KEY_COLUMN].astype('Int64')
+    return df
+
 def save_processed_data(conference_data, output_dir='data/processed'):
-    """Save processed conference data to CSV files"""
+    """
+    Save processed conference data to CSV files and, if pyarrow is available, the columnar talk store.
+    
+    Speakers (Raw_Speaker_Data) are written once to persons.csv; the talks
+    reference them by Person_Key and keep the speaker's affiliation in
+    Speaker_Affiliation (see person_table).
+    """
     try:
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
+        persons, talk_tables = split_speaker_payloads(conference_data)
+        
         # Convert data to DataFrames and save by year and type
         for year, data in conference_data.items():
             year_dir = os.path.join(output_dir, year)
             os.makedirs(year_dir, exist_ok=True)
+            tables = talk_tables.get(year, {})
             
             # Save different types of talks
             for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks', 'flash_talks', 'other_talks']:
-                if talk_type in data and data[talk_type]:
-                    df = pd.DataFrame(data[talk_type])
+                if tables.get(talk_type):
+                    df = _talks_frame(tables[talk_type])
                     output_file = os.path.join(year_dir, f'{talk_type}.csv')
                     df.to_csv(output_file, index=False)
-                    print(f"Saved {len(df)} {talk_type} to {output_file}")
+                    log.debug("Saved %d %s to %s", len(df), talk_type, output_file)
             
             # Save all talks combined
-            if 'all_talks' in data and data['all_talks']:
-                df = pd.DataFrame(data['all_talks'])
+            if tables.get('all_talks'):
+                df = _talks_frame(tables['all_talks'])
                 output_file = os.path.join(year_dir, 'all_talks.csv')
                 df.to_csv(output_file, index=False)
-                print(f"Saved {len(df)} total talks to {output_file}")
+                log.info("Saved %d total talks to %s", len(df), output_file)
             
             # Save statistics
             stats = {
@@ -1403,6 +1296,13 @@ def save_processed_data(conference_data, output_dir='data/processed'):
                 json.dump(stats, f, indent=2)
             print(f"Saved statistics to {stats_file}")
         
+        persons_file = os.path.join(output_dir, 'persons.csv')
+        persons.save(persons_file)
+        print(f"Saved {len(persons)} speakers to {persons_file}")
+        
+        # Columnar copy of the talks (one partition per year and talk type)
+        save_talk_store(talk_tables, os.path.join(output_dir, 'talks'))
+        
         print("\nAll data saved successfully")
         
     except Exception as e:
@@ -1410,8 +1310,37 @@ def save_processed_data(conference_data, output_dir='data/processed'):
         import traceback
         traceback.print_exc()
 
-def fetch_and_analyze_conferences():
-    """Main function to fetch and analyze conference data."""
+def prefetch_conferences(conferences, max_workers=4):
+    """
+    Download the Indico exports of all conferences concurrently into the export cache.
+    
+    Parameters:
+    - conferences: List of (year, indico_id) tuples
+    - max_workers: Number of parallel downloads (also capped per host by indico_cache)
+    """
+    if max_workers <= 1 or len(conferences) <= 1:
+        return
+    
+    print(f"\nPrefetching {len(conferences)} Indico exports with {max_workers} workers...")
+    start = time.time()
+    results = prefetch_event_exports([indico_id for _, indico_id in conferences], max_workers=max_workers)
+    
+    for year, indico_id in conferences:
+        result = results.get(str(indico_id))
+        if isinstance(result, Exception):
+            log.warning("  QM%s (%s): failed - %s", year, indico_id, result)
+        else:
+            log.info("  QM%s (%s): %s", year, indico_id, result[1])
+    print(f"Prefetch finished in {time.time() - start:.1f}s")
+
+def fetch_and_analyze_conferences(max_workers=4):
+    """
+    Main function to fetch and analyze conference data.
+    
+    Parameters:
+    - max_workers: Number of events downloaded in parallel before processing;
+      1 disables the concurrent prefetch
+    """
     try:
         # Load participant data first
         print("\nLoading participant data...")
@@ -1428,17 +1357,25 @@ def fetch_and_analyze_conferences():
         # Sort conferences by year
         conferences.sort(key=lambda x: x[0])
         
+        # Download all events in parallel, then process them in year order from the cache
+        with stage("fetch", items=len(conferences)):
+            prefetch_conferences(conferences, max_workers=max_workers)
+        
         # Process each conference
         conference_data = {}
         
         for year, indico_id in conferences:
-            print(f"\nProcessing QM{year} (Indico ID: {indico_id})...")
-            data = fetch_and_process_contributions(indico_id, year)
-            if data:
-                conference_data[year] = data
+            log.info("Processing QM%s (Indico ID: %s)...", year, indico_id)
+            with stage(f"process QM{year}", indico_id=indico_id) as step:
+                data = fetch_and_process_contributions(indico_id, year)
+                if data:
+                    conference_data[year] = data
+                    step.items = len(data.get('all_talks', []))
         
         # Save processed data
-        save_processed_data(conference_data)
+        with stage("save", items=count_talks(conference_data)):
+            save_processed_data(conference_data)
+        export_trace()
         
         return conference_data
         
@@ -1488,7 +1425,7 @@ def fix_common_affiliation_problems(conference_data):
 
 def print_unknown_institute_examples(conference_data, num_examples=3):
     """Print examples of talks with unknown institutes"""
-    print("\n===== EXAMPLES OF TALKS WITH UNKNOWN INSTITUTES =====")
+    log.info("Examples of talks with unknown institutes:")
     
     # Print examples for each year
     for year, data in sorted(conference_data.items()):
@@ -1497,47 +1434,71 @@ def print_unknown_institute_examples(conference_data, num_examples=3):
         unknown_parallel = [t for t in data.get('parallel_talks', []) if t.get('Institute', '') == 'Unknown']
         
         if unknown_plenary or unknown_parallel:
-            print(f"\nYear: {year}")
-            
-            if unknown_plenary:
-                print(f"  Plenary talks with unknown institutes: {len(unknown_plenary)}")
-                for i, talk in enumerate(unknown_plenary[:num_examples]):
-                    print(f"    Example {i+1}: {talk.get('Speaker', 'No name')} - {talk.get('Title', 'No title')[:50]}...")
+            log.info("QM%s: %d plenary and %d parallel talks with unknown institutes",
+                     year, len(unknown_plenary), len(unknown_parallel))
             
-            if unknown_parallel:
-                print(f"  Parallel talks with unknown institutes: {len(unknown_parallel)}")
-                for i, talk in enumerate(unknown_parallel[:num_examples]):
-                    print(f"    Example {i+1}: {talk.get('Speaker', 'No name')} - {talk.get('Title', 'No title')[:50]}...")
+            for label, talks in (('Plenary', unknown_plenary), ('Parallel', unknown_parallel)):
+                for i, talk in enumerate(talks[:num_examples]):
+                    log.debug("    %s example %d: %s - %s...", label, i + 1,
+                              talk.get('Speaker', 'No name'), talk.get('Title', 'No title')[:50])
 
 
-def should_reprocess_data(max_age_days=1):
+def load_previous_processed_data():
+    """Load the conference data written by the last run, or an empty dictionary"""
+    processed_file = 'data/processed_conference_data.json'
+    try:
+        with open(processed_file, 'r') as f:
+            conference_data = json.load(f)
+        print(f"Loaded previously processed data for {len(conference_data)} conferences.")
+        return conference_data
+    except FileNotFoundError:
+        print(f"Processed data file '{processed_file}' not found. Will process all years.")
+    except Exception as e:
+        print(f"Error loading processed data: {e}")
+        print("Will process all years.")
+    return {}
+
+def get_processing_inputs(indico_id, mapping_hash, code_hash):
     """
-    Check if we should reprocess the data based on the age of the processed data file.
+    Fingerprint the inputs of one conference (export digest, mapping files, code).
+    
+    Returns:
+    - Inputs dictionary for the processing manifest, or None if the export
+      could not be fetched
+    """
+    try:
+        return event_inputs(get_export_digest(indico_id), mapping_hash, code_hash)
+    except Exception as e:
+        log.warning("Could not fingerprint Indico event %s: %s", indico_id, e)
+        return None
+
+def should_reprocess_data(year, inputs, manifest, previous_data):
+    """
+    Check if a conference year has to be fetched and classified again.
     
     Parameters:
-    - max_age_days: Maximum age in days for the processed data file
+    - year: Conference year
+    - inputs: Current inputs of the year (see get_processing_inputs), or None
+    - manifest: Processing manifest (see processing_manifest)
+    - previous_data: Conference data written by the last run
     
     Returns:
-    - True if data should be reprocessed, False otherwise
+    - True if the year should be reprocessed, False if the previous result is still valid
     """
-    processed_file = 'data/processed_conference_data.json'
-    
-    # If file doesn't exist, we need to process
-    if not os.path.exists(processed_file):
-        print(f"Processed data file '{processed_file}' not found. Will process data.")
+    if year not in previous_data:
+        log.info("QM%s: no processed data yet. Will process.", year)
         return True
     
-    # Check file age
-    file_time = os.path.getmtime(processed_file)
-    current_time = time.time()
-    file_age_days = (current_time - file_time) / (60 * 60 * 24)  # Convert seconds to days
+    if inputs is None:
+        log.info("QM%s: inputs unknown. Will reprocess.", year)
+        return True
     
-    if file_age_days <= max_age_days:
-        print(f"Processed data file is {file_age_days:.1f} days old (max: {max_age_days} days). Using existing data.")
+    if is_up_to_date(manifest, year, inputs):
+        log.info("QM%s: inputs unchanged. Using existing data.", year)
         return False
-    else:
-        print(f"Processed data file is {file_age_days:.1f} days old (max: {max_age_days} days). Will reprocess data.")
-        return True
+    
+    log.info("QM%s: %s changed. Will reprocess.", year, ', '.join(changed_inputs(manifest, year, inputs)))
+    return True
 
 def print_summary_table(conference_data, title="Conference Summary"):
     """
@@ -1570,128 +1531,6 @@ def print_summary_table(conference_data, title="Conference Summary"):
         print(f"{year} {location:<25} {total:<6} {plenary:<8} {parallel:<8} {poster:<6} {flash:<5} {unknown_plenary:<8} {unknown_parallel}")
 
 # Update the main section to call this function before and after updating speaker info
-if __name__ == "__main__":
-    try:
-        # Import time module at the top of the file
-        import time
-        
-        # Check if we should reprocess the data
-        if not should_reprocess_data(max_age_days=1):
-            # Load existing processed data
-            try:
-                with open('data/processed_conference_data.json', 'r') as f:
-                    conference_data = json.load(f)
-                print(f"Loaded processed data for {len(conference_data)} conferences.")
-                
-                # Print initial summary table
-                print_summary_table(conference_data, "Initial Conference Summary")
-                
-                # Load participant data
-                print("\nLoading participant data...")
-                participant_data = load_participant_data()
-                
-                # Update speaker information from participant data
-                if participant_data:
-                    fix_unknown_institutes_from_participants(conference_data, participant_data)
-                    
-                    # Print updated summary table
-                    print_summary_table(conference_data, "Conference Summary After Updates")
-                    
-                    # Save the updated data
-                    with open('data/processed_conference_data.json', 'w') as f:
-                        json.dump(conference_data, f, indent=2)
-                    print("Saved updated conference data.")
-                
-                # Print examples of talks with unknown institutes
-                print_unknown_institute_examples(conference_data)
-                
-                sys.exit(0)  # Exit successfully
-            except Exception as e:
-                print(f"Error loading processed data: {e}")
-                print("Will process data from scratch.")
-        
-        # If we get here, we need to process the data
-        with open('listofQMindigo', 'r') as f:
-            conferences = [line.strip().split()[:2] for line in f if not line.strip().startswith('#')]
-            
-        conference_data = {}
-        
-        # Sort conferences by year
-        conferences.sort(key=lambda x: x[0])
-        
-        # Process each conference
-        for year, indico_id in conferences:
-            print(f"\nProcessing QM{year} (Indico ID: {indico_id})...")
-            data = fetch_and_process_contributions(indico_id, year)
-            if data:
-                conference_data[year] = data
-        
-        # Print initial summary table
-        print_summary_table(conference_data, "Initial Conference Summary")
-        
-        # Load participant data
-        print("\nLoading participant data...")
-        participant_data = load_participant_data()
-        
-        # Update speaker information from participant data
-        if participant_data:
-            fix_unknown_institutes_from_participants(conference_data, participant_data)
-            
-            # Print updated summary table
-            print_summary_table(conference_data, "Conference Summary After Updates")
-        
-        # Print examples of talks with unknown institutes
-        print_unknown_institute_examples(conference_data)
-        
-        # Save the processed data
-        save_processed_data(conference_data)
-        with open('data/processed_conference_data.json', 'w') as f:
-            json.dump(conference_data, f, indent=2)
-        print("Saved processed conference data.")
-        
-        # Count remaining unknown institutes and countries
-        total_talks = 0
-        unknown_institutes = 0
-        unknown_countries = 0
-        
-        for year, data in conference_data.items():
-            for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-                if talk_type not in data:
-                    continue
-                    
-                talks = data[talk_type]
-                total_talks += len(talks)
-                
-                for talk in talks:
-                    if talk.get('Institute', '') == 'Unknown':
-                        unknown_institutes += 1
-                    if talk.get('Country', '') == 'Unknown':
-                        unknown_countries += 1
-        
-        print("\n===== FINAL STATISTICS =====")
-        print(f"Total talks processed: {total_talks}")
-        print(f"Remaining unknown institutes: {unknown_institutes} ({unknown_institutes/total_talks*100:.1f}%)")
-        print(f"Remaining unknown countries: {unknown_countries} ({unknown_countries/total_talks*100:.1f}%)")
-        
-        # Print breakdown by talk type
-        print("\nBreakdown by talk type:")
-        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
-            type_total = 0
-            type_unknown_inst = 0
-            
-            for year, data in conference_data.items():
-                if talk_type in data:
-                    talks = data[talk_type]
-                    type_total += len(talks)
-                    type_unknown_inst += sum(1 for t in talks if t.get('Institute', '') == 'Unknown')
-            
-            if type_total > 0:
-                print(f"  {talk_type.replace('_', ' ').title()}: {type_unknown_inst}/{type_total} unknown institutes ({type_unknown_inst/type_total*100:.1f}%)")
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-
 def generate_final_statistics_report(conference_data, output_file='final_statistics_report.txt'):
     """
     Generate a final report of statistics including speakers without institute or country.
@@ -1878,31 +1717,6 @@ def debug_conference_data(data, label="Conference Data"):
     
     print("=" * 50)
 
-# In the fetch_and_analyze_conferences function, add debugging:
-
-# Debug the conference_data before trying to print summary
-debug_conference_data(conference_data, "Before Summary")
-
-# Try a very simple summary that doesn't assume any structure
-print("\nSimple Conference Summary:")
-print("Type of conference_data:", type(conference_data))
-
-if isinstance(conference_data, dict):
-    for year, data in sorted(conference_data.items()):
-        print(f"Year: {year}, Type of data: {type(data)}")
-        if isinstance(data, dict):
-            print(f"  Keys: {list(data.keys())}")
-        else:
-            print(f"  Value: {data}")
-elif isinstance(conference_data, list):
-    print(f"List length: {len(conference_data)}")
-    for i, item in enumerate(conference_data[:5]):  # Show first 5 items
-        print(f"Item {i}: {type(item)}")
-        if isinstance(item, tuple) and len(item) >= 2:
-            print(f"  Year: {item[0]}, Indico ID: {item[1]}")
-else:
-    print(f"Unexpected type: {type(conference_data)}")
-
 def filter_relevant_talk_types(conference_data):
     """
     Filter conference data to only include plenary, parallel, and poster talks.
@@ -1936,11 +1750,11 @@ def filter_relevant_talk_types(conference_data):
         
         # Remove other talk types if they exist
         if 'flash_talks' in data:
-            print(f"  Removed {len(data['flash_talks'])} flash talks from QM{year}")
+            log.debug("  Removed %d flash talks from QM%s", len(data['flash_talks']), year)
             del data['flash_talks']
         
         if 'other_talks' in data:
-            print(f"  Removed {len(data['other_talks'])} other talks from QM{year}")
+            log.debug("  Removed %d other talks from QM%s", len(data['other_talks']), year)
             del data['other_talks']
     
     return conference_data
@@ -2101,8 +1915,136 @@ def load_institute_mappings():
         print(f"Error handling institute mappings: {e}")
         return {k.lower(): v for k, v in NEW_MAPPINGS.items()}
 
-# Add at the start of the script
-INSTITUTE_COUNTRY_MAPPINGS = load_institute_mappings()
-
+def get_institute_country_mappings():
+    """Return the institute-to-country mappings, loading (and updating) the file on first use"""
+    global INSTITUTE_COUNTRY_MAPPINGS
+    if INSTITUTE_COUNTRY_MAPPINGS is None:
+        INSTITUTE_COUNTRY_MAPPINGS = load_institute_mappings()
+    return INSTITUTE_COUNTRY_MAPPINGS
 
+def main():
+    """Fetch, process and save the data of every conference in listofQMindigo"""
+    configure_logging()
+    try:
+        # Create directories if they don't exist
+        os.makedirs('data', exist_ok=True)
+        
+        with open('listofQMindigo', 'r') as f:
+            conferences = [line.strip().split()[:2] for line in f if not line.strip().startswith('#')]
+            
+        conference_data = {}
+        
+        # Sort conferences by year
+        conferences.sort(key=lambda x: x[0])
+        
+        # Download all events in parallel, then process them in year order from the cache
+        with stage("fetch", items=len(conferences)):
+            prefetch_conferences(conferences)
+        
+        # Only years whose export, mapping files or code changed are processed again
+        previous_data = load_previous_processed_data()
+        manifest = load_manifest()
+        get_institute_country_mappings()  # may add entries to the mappings file, so load before hashing
+        mapping_hash = mapping_db_hash()
+        code_hash = code_version()
+        reprocessed_years = []
+        
+        # Process each conference
+        for year, indico_id in conferences:
+            inputs = get_processing_inputs(indico_id, mapping_hash, code_hash)
+            if not should_reprocess_data(year, inputs, manifest, previous_data):
+                conference_data[year] = previous_data[year]
+                continue
+            
+            log.info("Processing QM%s (Indico ID: %s)...", year, indico_id)
+            with stage(f"process QM{year}", indico_id=indico_id) as step:
+                data = fetch_and_process_contributions(indico_id, year)
+                if data:
+                    step.items = len(data.get('all_talks', []))
+            if data:
+                conference_data[year] = data
+                reprocessed_years.append(year)
+                if inputs is not None:
+                    record_event(manifest, year, indico_id, inputs)
+            elif year in previous_data:
+                log.info("Keeping previously processed data for QM%s", year)
+                conference_data[year] = previous_data[year]
+        
+        print(f"\nReprocessed {len(reprocessed_years)} of {len(conferences)} conferences: "
+              f"{', '.join(reprocessed_years) or 'none'}")
+        
+        # Print initial summary table
+        print_summary_table(conference_data, "Initial Conference Summary")
+        
+        # Load participant data
+        print("\nLoading participant data...")
+        with stage("load participants") as step:
+            participant_data = load_participant_data()
+            step.items = len(participant_data or ())
+        
+        # Update speaker information from participant data
+        if participant_data:
+            with stage("match participants", items=count_talks(conference_data)):
+                fix_unknown_institutes_from_participants(conference_data, participant_data)
+            
+            # Print updated summary table
+            print_summary_table(conference_data, "Conference Summary After Updates")
+        
+        # Print examples of talks with unknown institutes
+        print_unknown_institute_examples(conference_data)
+        
+        # Save the processed data
+        with stage("save", items=count_talks(conference_data)):
+            save_processed_data(conference_data)
+            with open('data/processed_conference_data.json', 'w') as f:
+                json.dump(conference_data, f, indent=2, default=talk_record_to_json)
+            save_manifest(manifest)
+        print("Saved processed conference data.")
+        
+        # Count remaining unknown institutes and countries
+        total_talks = 0
+        unknown_institutes = 0
+        unknown_countries = 0
+        
+        for year, data in conference_data.items():
+            for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
+                if talk_type not in data:
+                    continue
+                    
+                talks = data[talk_type]
+                total_talks += len(talks)
+                
+                for talk in talks:
+                    if talk.get('Institute', '') == 'Unknown':
+                        unknown_institutes += 1
+                    if talk.get('Country', '') == 'Unknown':
+                        unknown_countries += 1
+        
+        print("\n===== FINAL STATISTICS =====")
+        print(f"Total talks processed: {total_talks}")
+        print(f"Remaining unknown institutes: {unknown_institutes} ({unknown_institutes/total_talks*100:.1f}%)")
+        print(f"Remaining unknown countries: {unknown_countries} ({unknown_countries/total_talks*100:.1f}%)")
+        
+        # Print breakdown by talk type
+        print("\nBreakdown by talk type:")
+        for talk_type in ['plenary_talks', 'parallel_talks', 'poster_talks']:
+            type_total = 0
+            type_unknown_inst = 0
+            
+            for year, data in conference_data.items():
+                if talk_type in data:
+                    talks = data[talk_type]
+                    type_total += len(talks)
+                    type_unknown_inst += sum(1 for t in talks if t.get('Institute', '') == 'Unknown')
+            
+            if type_total > 0:
+                print(f"  {talk_type.replace('_', ' ').title()}: {type_unknown_inst}/{type_total} unknown institutes ({type_unknown_inst/type_total*100:.1f}%)")
+        
+        export_trace()
+        
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+On-disk cache for Indico event exports.
+
+Every event export (detail=contributions) is stored once under its SHA-256
+digest in data/cache/indico/blobs, and a small index file per server and
+event records which blob belongs to which Indico ID together with the
+ETag/Last-Modified headers returned by that server. Within one run an event is fetched at most
+once; across runs the cached copy is revalidated with a conditional request
+and only downloaded again if Indico reports a change.
+
+All requests go through one connection-pooled session with retry and
+exponential backoff, and at most MAX_CONNECTIONS_PER_HOST requests run
+against the same host at a time, so several events can be prefetched in
+parallel with prefetch_event_exports. Bodies are streamed to disk, and
+iter_cached_contributions reads them back one contribution at a time.
+
+The server defaults to indico.cern.ch; set the INDICO_URL environment
+variable (or call set_indico_url) to fetch from elsewhere, e.g. the local
+stand-in of indico_replay.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from indico_stream import iter_event_contributions, read_export_header
+from lazy_imports import lazy_module
+
+# Imported on first request (see lazy_imports)
+requests = lazy_module('requests')
+
+CACHE_DIR = "data/cache/indico"
+DEFAULT_INDICO_URL = "https://indico.cern.ch"
+EXPORT_PATH = "/export/event/{indico_id}.json?detail=contributions&pretty=yes"
+
+# Connection and retry settings for the shared session
+MAX_CONNECTIONS_PER_HOST = 4
+RETRY_TOTAL = 4
+RETRY_BACKOFF_FACTOR = 1.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+REQUEST_TIMEOUT = 120
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# (cache directory, server URL, Indico ID) already fetched or revalidated during this run -> cache entry
+_SEEN_THIS_RUN = {}
+
+_indico_url = (os.environ.get('INDICO_URL') or DEFAULT_INDICO_URL).rstrip('/')
+
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+_event_locks = {}
+_registry_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared connection-pooled session with retry and backoff"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=frozenset(['GET']),
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(pool_connections=MAX_CONNECTIONS_PER_HOST,
+                                  pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                                  max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def _host_slot(url):
+    """Return the semaphore limiting concurrent requests to the host of url"""
+    host = urlsplit(url).netloc
+    with _registry_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_slots[host]
+
+
+def _event_lock(key):
+    """Return the lock serialising fetches of the same event"""
+    with _registry_lock:
+        if key not in _event_locks:
+            _event_locks[key] = threading.Lock()
+        return _event_locks[key]
+
+
+def http_get(url, headers=None, stream=False):
+    """GET url through the shared session, respecting the per-host concurrency cap"""
+    with _host_slot(url):
+        return get_session().get(url, headers=headers, stream=stream, timeout=REQUEST_TIMEOUT)
+
+
+def get_indico_url():
+    """Return the base URL of the Indico server exports are fetched from"""
+    return _indico_url
+
+
+def set_indico_url(url):
+    """
+    Fetch exports from the Indico server at url (e.g. "http://127.0.0.1:8765");
+    None restores the default. Returns the previous base URL.
+    """
+    global _indico_url
+    previous = _indico_url
+    _indico_url = (url or DEFAULT_INDICO_URL).rstrip('/')
+    return previous
+
+
+def get_export_url(indico_id):
+    """Return the contributions export URL for an Indico event"""
+    return _indico_url + EXPORT_PATH.format(indico_id=indico_id)
+
+
+def _server_dir(base_url):
+    """Directory name of a server's index entries: a short hash of its base URL"""
+    return hashlib.sha256(base_url.encode('utf-8')).hexdigest()[:16]
+
+
+def _index_path(indico_id, base_url, cache_dir=CACHE_DIR):
+    # Validators are only meaningful to the server that issued them
+    return os.path.join(cache_dir, 'events', _server_dir(base_url), f'{indico_id}.json')
+
+
+def _blob_path(digest, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, 'blobs', digest[:2], f'{digest}.json')
+
+
+def _read_index(indico_id, base_url, cache_dir=CACHE_DIR):
+    """Read the cache index entry for an event on a server, or None if there is none"""
+    index_file = _index_path(indico_id, base_url, cache_dir)
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    # An index entry without its blob is useless
+    if not os.path.exists(_blob_path(entry.get('sha256', ''), cache_dir)):
+        return None
+    return entry
+
+
+def _write_atomic(path, content):
+    """Write bytes to path via a temporary file so readers never see partial data"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _store_response(indico_id, base_url, url, response, cache_dir=CACHE_DIR):
+    """Stream a 200 response body into a content-addressed blob and update the index"""
+    blob_dir = os.path.join(cache_dir, 'blobs')
+    os.makedirs(blob_dir, exist_ok=True)
+    tmp_path = os.path.join(blob_dir, f"download.tmp{os.getpid()}-{threading.get_ident()}")
+
+    # Hash while writing so the body never has to be held in memory
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(tmp_path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            sha256.update(chunk)
+            size += len(chunk)
+            f.write(chunk)
+
+    digest = sha256.hexdigest()
+    blob_file = _blob_path(digest, cache_dir)
+    os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+    os.replace(tmp_path, blob_file)
+
+    entry = {
+        'indico_id': str(indico_id),
+        'url': url,
+        'sha256': digest,
+        'size': size,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': time.time()
+    }
+    _write_atomic(_index_path(indico_id, base_url, cache_dir), json.dumps(entry, indent=2).encode('utf-8'))
+    return entry
+
+
+def fetch_event_export(indico_id, force_refresh=False, cache_dir=CACHE_DIR):
+    """
+    Make sure the export of an Indico event is in the cache.
+
+    Parameters:
+    - indico_id: ID of the Indico event
+    - force_refresh: Ignore the cached validators and download the export again
+    - cache_dir: Root directory of the cache
+
+    Returns:
+    - Tuple of (path to the cached JSON body, status) where status is one of
+      'fetched', 'not-modified', 'cached' or 'stale'
+
+    Raises requests.exceptions.RequestException if the event cannot be fetched
+    and no cached copy exists.
+    """
+    indico_id = str(indico_id)
+    # The same event on another server (see set_indico_url) is fetched separately
+    base_url = get_indico_url()
+    key = (cache_dir, base_url, indico_id)
+
+    # Concurrent callers asking for the same event wait for the first download
+    with _event_lock(key):
+        return _fetch_event_export_locked(indico_id, key, force_refresh, cache_dir)
+
+
+def _fetch_event_export_locked(indico_id, key, force_refresh, cache_dir):
+    if key in _SEEN_THIS_RUN and not force_refresh:
+        entry = _SEEN_THIS_RUN[key]
+        return _blob_path(entry['sha256'], cache_dir), 'cached'
+
+    base_url = key[1]
+    url = base_url + EXPORT_PATH.format(indico_id=indico_id)
+    entry = None if force_refresh else _read_index(indico_id, base_url, cache_dir)
+
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        with http_get(url, headers=headers, stream=True) as response:
+            if response.status_code == 304 and entry:
+                status = 'not-modified'
+            else:
+                response.raise_for_status()
+                entry = _store_response(indico_id, base_url, url, response, cache_dir)
+                status = 'fetched'
+    except requests.exceptions.RequestException as e:
+        if not entry:
+            raise
+        # Keep working offline from the last good copy
+        print(f"Warning: could not revalidate Indico event {indico_id} ({e}), using cached copy")
+        status = 'stale'
+
+    _SEEN_THIS_RUN[key] = entry
+    return _blob_path(entry['sha256'], cache_dir), status
+
+
+def get_export_digest(indico_id, cache_dir=CACHE_DIR):
+    """
+    Return the SHA-256 digest of the current export of an Indico event.
+
+    The export is fetched or revalidated like in fetch_event_export, so the
+    digest changes exactly when Indico serves different content.
+    """
+    path, _ = fetch_event_export(indico_id, cache_dir=cache_dir)
+    # Blobs are content-addressed, so the file name is the digest
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def load_event_export(indico_id, force_refresh=False, cache_dir=CACHE_DIR):
+    """
+    Return the decoded JSON export of an Indico event, using the cache.
+
+    Parameters:
+    - indico_id: ID of the Indico event
+    - force_refresh: Ignore the cached validators and download the export again
+    - cache_dir: Root directory of the cache
+
+    Returns:
+    - Tuple of (decoded JSON data, status) with status as in fetch_event_export
+    """
+    path, status = fetch_event_export(indico_id, force_refresh=force_refresh, cache_dir=cache_dir)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f), status
+
+
+def load_event_header(indico_id, force_refresh=False, cache_dir=CACHE_DIR):
+    """
+    Return the export of an Indico event without its contributions, using the cache.
+
+    The contributions are skipped one at a time, so the full event is never
+    decoded at once. Returns a tuple of (header, status) with status as in
+    fetch_event_export.
+    """
+    path, status = fetch_event_export(indico_id, force_refresh=force_refresh, cache_dir=cache_dir)
+    with open(path, 'r', encoding='utf-8') as f:
+        return read_export_header(f), status
+
+
+def iter_cached_contributions(indico_id, header=None, cache_dir=CACHE_DIR):
+    """
+    Yield the contributions of an Indico event one at a time from the cache.
+
+    Parameters:
+    - indico_id: ID of the Indico event
+    - header: Optional dictionary filled with the rest of the export
+    - cache_dir: Root directory of the cache
+
+    Returns:
+    - Generator of contribution dictionaries
+    """
+    path, _ = fetch_event_export(indico_id, cache_dir=cache_dir)
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_event_contributions(f, header)
+
+
+def prefetch_event_exports(indico_ids, max_workers=MAX_CONNECTIONS_PER_HOST, cache_dir=CACHE_DIR):
+    """
+    Fetch several Indico event exports into the cache concurrently.
+
+    Parameters:
+    - indico_ids: Iterable of Indico event IDs
+    - max_workers: Size of the worker pool
+    - cache_dir: Root directory of the cache
+
+    Returns:
+    - Dictionary mapping each Indico ID to its (path, status) tuple, or to the
+      exception raised while fetching it
+    """
+    indico_ids = [str(indico_id) for indico_id in indico_ids]
+    results = {}
+
+    def fetch(indico_id):
+        try:
+            return fetch_event_export(indico_id, cache_dir=cache_dir)
+        except requests.exceptions.RequestException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for indico_id, result in zip(indico_ids, executor.map(fetch, indico_ids)):
+            results[indico_id] = result
+
+    return results
+
+
+def clear_run_cache():
+    """Forget which events were already fetched during this run"""
+    _SEEN_THIS_RUN.clear()
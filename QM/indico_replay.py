@@ -0,0 +1,441 @@
+"""
+Record/replay stand-in for the Indico export API.
+
+validate_indico_url, fetch_and_process_contributions and
+extract_participants_from_contributions fetch their exports from
+indico.cern.ch, which makes the fetch path impossible to profile or
+load-test offline. This module records the export responses once (body,
+status and validators) into data/cache/indico/recordings, and serves them
+from a local HTTP server that stands in for Indico:
+
+    python indico_replay.py record 895086 792436
+    python indico_replay.py serve --port 8765 --latency 0.2 --bandwidth 2000000 --error-rate 0.1
+    INDICO_URL=http://127.0.0.1:8765 python generate_conference_data.py
+
+The stand-in answers conditional requests (If-None-Match /
+If-Modified-Since) with 304 like Indico does, and can add latency, limit
+the bandwidth per response and inject errors (randomly, with a seed, or for
+the first requests of each path), so the concurrency, retry and caching
+behaviour of the ingest pipeline can be measured deterministically. With
+--record-from it fetches and records unknown paths from a real server on
+first request. Request statistics are served as JSON under /_stats.
+
+In Python, serving() runs the stand-in in a background thread and points
+indico_cache at it:
+
+    with serving(latency=0.1, fail_first=1) as server:
+        prefetch_event_exports(['895086', '792436'])
+    print(server.stats)
+"""
+
+import argparse
+import contextlib
+import email.utils
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from indico_cache import EXPORT_PATH, DEFAULT_INDICO_URL, DOWNLOAD_CHUNK_SIZE, REQUEST_TIMEOUT, set_indico_url
+from lazy_imports import lazy_module
+
+# Imported on first use (see lazy_imports)
+requests = lazy_module('requests')
+
+RECORDING_DIR = "data/cache/indico/recordings"
+DEFAULT_PORT = 8765
+
+# Response headers kept in a recording
+RECORDED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+STATS_PATH = '/_stats'
+
+
+def _recording_key(path):
+    return hashlib.sha256(path.encode('utf-8')).hexdigest()[:32]
+
+
+def _recording_paths(path, recording_dir):
+    key = _recording_key(path)
+    return os.path.join(recording_dir, f'{key}.json'), os.path.join(recording_dir, f'{key}.body')
+
+
+def save_recording(path, status, headers, body_chunks, recording_dir=RECORDING_DIR):
+    """
+    Store one response.
+
+    Parameters:
+    - path: Request path including the query string
+    - status: HTTP status code
+    - headers: Response headers (only RECORDED_HEADERS are kept)
+    - body_chunks: Iterable of body bytes
+    - recording_dir: Directory of the recordings
+
+    Returns:
+    - The recording's metadata dictionary
+    """
+    os.makedirs(recording_dir, exist_ok=True)
+    meta_file, body_file = _recording_paths(path, recording_dir)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    tmp_file = f"{body_file}.tmp{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_file, 'wb') as f:
+        for chunk in body_chunks:
+            sha256.update(chunk)
+            size += len(chunk)
+            f.write(chunk)
+    os.replace(tmp_file, body_file)
+
+    kept = {name: headers.get(name) for name in RECORDED_HEADERS if headers.get(name)}
+    # Validators make the cache revalidate; give every recording at least an ETag
+    kept.setdefault('ETag', f'"{sha256.hexdigest()}"')
+    meta = {'path': path, 'status': status, 'headers': kept, 'size': size, 'recorded_at': time.time()}
+
+    tmp_file = f"{meta_file}.tmp{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_file, meta_file)
+    return meta
+
+
+def load_recording(path, recording_dir=RECORDING_DIR):
+    """Return (metadata, body file) of the recording of path, or None if there is none"""
+    meta_file, body_file = _recording_paths(path, recording_dir)
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not os.path.exists(body_file):
+        return None
+    return meta, body_file
+
+
+def record_path(path, upstream=DEFAULT_INDICO_URL, recording_dir=RECORDING_DIR):
+    """
+    Fetch path from the upstream server and record the response.
+
+    Raises requests.exceptions.RequestException on network errors; error
+    statuses are recorded like any other response.
+    """
+    with requests.get(upstream.rstrip('/') + path, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        return save_recording(path, response.status_code, response.headers,
+                              response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE), recording_dir)
+
+
+def record_exports(indico_ids, upstream=DEFAULT_INDICO_URL, recording_dir=RECORDING_DIR):
+    """
+    Record the contribution exports of several Indico events.
+
+    Returns:
+    - Dictionary mapping each Indico ID to its recording metadata, or to the
+      exception raised while fetching it
+    """
+    results = {}
+    for indico_id in indico_ids:
+        path = EXPORT_PATH.format(indico_id=indico_id)
+        try:
+            results[str(indico_id)] = record_path(path, upstream, recording_dir)
+        except requests.exceptions.RequestException as e:
+            results[str(indico_id)] = e
+    return results
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.handle_get(self)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class IndicoStandIn(ThreadingHTTPServer):
+    """
+    Local HTTP server replaying recorded Indico responses.
+
+    Parameters:
+    - recording_dir: Directory of the recordings
+    - host, port: Address to listen on (port 0 picks a free port)
+    - latency: Seconds before each response starts
+    - jitter: Random extra latency, up to this many seconds
+    - bandwidth: Bytes per second per response (None: unlimited)
+    - error_rate: Probability of answering a request with error_status
+    - error_status: Status code of injected errors
+    - fail_first: Number of requests per path answered with error_status
+      before the path is served normally
+    - retry_after: Retry-After header (seconds) sent with injected errors
+    - upstream: Server to record unknown paths from (None: answer 404)
+    - seed: Seed of the latency jitter and error injection
+    - verbose: Log every request to stderr
+    """
+
+    daemon_threads = True
+
+    def __init__(self, recording_dir=RECORDING_DIR, host='127.0.0.1', port=DEFAULT_PORT, latency=0.0, jitter=0.0,
+                 bandwidth=None, error_rate=0.0, error_status=503, fail_first=0, retry_after=None, upstream=None,
+                 seed=0, verbose=False):
+        super().__init__((host, port), _StandInHandler)
+        self.recording_dir = recording_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.upstream = upstream
+        self.verbose = verbose
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._record_lock = threading.Lock()
+        self._failures_by_path = {}
+        self._active = 0
+        self._thread = None
+        self.stats = {
+            'requests': 0,
+            'served': 0,
+            'not_modified': 0,
+            'injected_errors': 0,
+            'missing': 0,
+            'recorded': 0,
+            'bytes_sent': 0,
+            'max_concurrent': 0,
+            'requests_by_path': {},
+        }
+
+    @property
+    def url(self):
+        """Base URL of the server, for INDICO_URL or set_indico_url"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _should_fail(self, path):
+        with self._lock:
+            failures = self._failures_by_path.get(path, 0)
+            if failures < self.fail_first:
+                self._failures_by_path[path] = failures + 1
+                return True
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def _delay(self):
+        with self._lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def _send_json(self, handler, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _find_recording(self, path):
+        found = load_recording(path, self.recording_dir)
+        if found is None and self.upstream:
+            # Record on first request; concurrent requests for the path wait for it
+            with self._record_lock:
+                found = load_recording(path, self.recording_dir)
+                if found is None:
+                    record_path(path, self.upstream, self.recording_dir)
+                    self._count('recorded')
+                    found = load_recording(path, self.recording_dir)
+        return found
+
+    def _not_modified(self, handler, headers):
+        etag = headers.get('ETag')
+        if_none_match = handler.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag is not None and etag in [tag.strip() for tag in if_none_match.split(',')]
+
+        last_modified = headers.get('Last-Modified')
+        if_modified_since = handler.headers.get('If-Modified-Since')
+        if last_modified and if_modified_since:
+            try:
+                return (email.utils.parsedate_to_datetime(last_modified)
+                        <= email.utils.parsedate_to_datetime(if_modified_since))
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_body(self, handler, body_file):
+        chunk_size = DOWNLOAD_CHUNK_SIZE
+        if self.bandwidth:
+            # Small chunks keep the throttled rate smooth
+            chunk_size = max(1, min(chunk_size, int(self.bandwidth / 20)))
+        with open(body_file, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                handler.wfile.write(chunk)
+                self._count('bytes_sent', len(chunk))
+                if self.bandwidth:
+                    time.sleep(len(chunk) / self.bandwidth)
+
+    def handle_get(self, handler):
+        """Answer one GET request"""
+        path = handler.path
+        if path == STATS_PATH:
+            with self._lock:
+                stats = json.loads(json.dumps(self.stats))
+            self._send_json(handler, 200, stats)
+            return
+
+        with self._lock:
+            self.stats['requests'] += 1
+            by_path = self.stats['requests_by_path']
+            by_path[path] = by_path.get(path, 0) + 1
+            self._active += 1
+            self.stats['max_concurrent'] = max(self.stats['max_concurrent'], self._active)
+
+        try:
+            self._delay()
+
+            if self._should_fail(path):
+                self._count('injected_errors')
+                headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else None
+                self._send_json(handler, self.error_status, {'error': 'injected by the Indico stand-in'}, headers)
+                return
+
+            try:
+                found = self._find_recording(path)
+            except requests.exceptions.RequestException as e:
+                self._send_json(handler, 502, {'error': f'could not record {path}: {e}'})
+                return
+            if found is None:
+                self._count('missing')
+                self._send_json(handler, 404, {'error': f'no recording for {path}'})
+                return
+
+            meta, body_file = found
+            headers = meta.get('headers', {})
+            if meta.get('status') == 200 and self._not_modified(handler, headers):
+                self._count('not_modified')
+                handler.send_response(304)
+                for name in ('ETag', 'Last-Modified'):
+                    if headers.get(name):
+                        handler.send_header(name, headers[name])
+                handler.send_header('Content-Length', '0')
+                handler.end_headers()
+                return
+
+            handler.send_response(meta.get('status', 200))
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.send_header('Content-Length', str(os.path.getsize(body_file)))
+            handler.end_headers()
+            self._send_body(handler, body_file)
+            self._count('served')
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. timeout); nothing left to answer
+            pass
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def start(self):
+        """Serve in a background thread; returns self"""
+        self._thread = threading.Thread(target=self.serve_forever, name='indico-stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+@contextlib.contextmanager
+def serving(recording_dir=RECORDING_DIR, **options):
+    """
+    Run an IndicoStandIn (options as in its constructor, port defaults to a
+    free one) in the background and fetch exports from it while the context
+    is active. Yields the server.
+    """
+    options.setdefault('port', 0)
+    server = IndicoStandIn(recording_dir, **options).start()
+    previous = set_indico_url(server.url)
+    try:
+        yield server
+    finally:
+        set_indico_url(previous)
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record Indico exports and replay them from a local stand-in server')
+    parser.add_argument('--recording-dir', default=RECORDING_DIR, help='Directory of the recordings')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='Record the exports of Indico events')
+    record.add_argument('indico_ids', nargs='*', help='Indico event IDs (default: all in listofQMindigo)')
+    record.add_argument('--upstream', default=DEFAULT_INDICO_URL, help='Server to record from')
+
+    serve = commands.add_parser('serve', help='Serve the recordings')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds before each response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='Random extra latency, up to this many seconds')
+    serve.add_argument('--bandwidth', type=float, default=None, help='Bytes per second per response')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='Probability of an injected error')
+    serve.add_argument('--error-status', type=int, default=503, help='Status code of injected errors')
+    serve.add_argument('--fail-first', type=int, default=0, help='Fail the first N requests of every path')
+    serve.add_argument('--retry-after', type=int, default=None, help='Retry-After seconds sent with errors')
+    serve.add_argument('--record-from', metavar='URL', help='Record unknown paths from this server on first request')
+    serve.add_argument('--seed', type=int, default=0, help='Seed of jitter and error injection')
+    serve.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        indico_ids = args.indico_ids
+        if not indico_ids:
+            with open('listofQMindigo', 'r') as f:
+                indico_ids = [line.split()[1] for line in f
+                              if line.strip() and not line.strip().startswith('#') and len(line.split()) > 1]
+        failures = 0
+        for indico_id, result in record_exports(indico_ids, args.upstream, args.recording_dir).items():
+            if isinstance(result, Exception):
+                failures += 1
+                print(f"{indico_id}: failed - {result}")
+            else:
+                print(f"{indico_id}: status {result['status']}, {result['size']} bytes")
+        return 1 if failures else 0
+
+    server = IndicoStandIn(args.recording_dir, host=args.host, port=args.port, latency=args.latency,
+                           jitter=args.jitter, bandwidth=args.bandwidth, error_rate=args.error_rate,
+                           error_status=args.error_status, fail_first=args.fail_first,
+                           retry_after=args.retry_after, upstream=args.record_from, seed=args.seed,
+                           verbose=args.verbose)
+    print(f"Serving {args.recording_dir} at {server.url} (set INDICO_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Incremental reader for Indico contribution exports.
+
+An export looks like {"results": [{..event fields.., "contributions": [...]}], ...}.
+Instead of decoding the whole document, the reader walks it with a small pull
+parser on top of json.JSONDecoder.raw_decode and yields the contributions of
+the first result one at a time, so memory is bounded by a single contribution.
+Works on any text file object: a cached export on disk or a decoded HTTP body.
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+# Characters that can follow a complete number
+_NUMBER_END = frozenset(_WHITESPACE + ',]}')
+
+
+class _JsonStream:
+    """Pull parser over a text file object, decoding one JSON value at a time"""
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read more data; returns False at end of input"""
+        if self.eof:
+            return False
+
+        # Drop the consumed prefix so the buffer only holds the current value
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        # Read at least as much as is buffered so re-decoding stays linear
+        chunk = self.fp.read(max(self.chunk_size, len(self.buffer)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        """Consume the next non-whitespace character, which must be char"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' in JSON input")
+        self.pos += 1
+
+    def read_value(self):
+        """Decode and return the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value continues in the next chunk
+                if not self._fill():
+                    raise
+                continue
+
+            # A number may continue in the next chunk ("1." | "5"): unless it is
+            # followed by a delimiter, read more and decode it again
+            if (type(value) in (int, float) and not self.eof
+                    and (end == len(self.buffer) or self.buffer[end] not in _NUMBER_END)
+                    and self._fill()):
+                continue
+
+            self.pos = end
+            return value
+
+    def iter_object_keys(self):
+        """Yield the keys of the object that starts here; the caller consumes each value"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found '{separator}' in JSON input")
+
+    def iter_array_items(self):
+        """Yield the index of each item of the array that starts here; the caller consumes each item"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+
+        index = 0
+        while True:
+            yield index
+            index += 1
+
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' but found '{separator}' in JSON input")
+
+
+def _walk_export(fp, header, on_contribution):
+    """
+    Walk an Indico export, filling header with everything except the contributions
+    and calling on_contribution for each contribution of the first result.
+    """
+    stream = _JsonStream(fp)
+
+    for key in stream.iter_object_keys():
+        if key != 'results' or stream.peek() != '[':
+            header[key] = stream.read_value()
+            continue
+
+        header['results'] = []
+        for index in stream.iter_array_items():
+            if index > 0 or stream.peek() != '{':
+                # Only the first result carries the event we process
+                header['results'].append(stream.read_value())
+                continue
+
+            event = {}
+            header['results'].append(event)
+            for event_key in stream.iter_object_keys():
+                if event_key != 'contributions' or stream.peek() != '[':
+                    event[event_key] = stream.read_value()
+                    continue
+
+                for _ in stream.iter_array_items():
+                    yield on_contribution(stream.read_value())
+
+
+def iter_event_contributions(fp, header=None):
+    """
+    Yield the contributions of an Indico export one at a time.
+
+    Parameters:
+    - fp: Text file object positioned at the start of the export
+    - header: Optional dictionary that receives the rest of the document
+      (top-level fields and the event fields without 'contributions');
+      it is complete once the generator is exhausted
+
+    Returns:
+    - Generator of contribution dictionaries
+    """
+    if header is None:
+        header = {}
+    return _walk_export(fp, header, lambda contribution: contribution)
+
+
+def iter_json_array(fp):
+    """
+    Yield the items of a JSON document that is one top-level array (e.g. a
+    data dump of records) one at a time.
+    """
+    stream = _JsonStream(fp)
+    for _ in stream.iter_array_items():
+        yield stream.read_value()
+
+
+def read_export_header(fp):
+    """
+    Return an Indico export with the contributions of the first result left out.
+
+    Contributions are decoded and discarded one by one, so this never holds
+    more than one of them in memory.
+    """
+    header = {}
+    for _ in _walk_export(fp, header, lambda contribution: None):
+        pass
+    return header
@@ -0,0 +1,90 @@
+"""
+Institute name normalisation shared by the generate and analyze scripts.
+
+Two normalisations are in use:
+- normalize_institute_name: a lowercase matching key (punctuation, filler
+  words and numbers removed), used to look institutes up in the
+  institute-country database
+- canonical_institute_name: a display label that folds well-known labs to
+  their short name and capitalises everything else, used to group talks by
+  institute in the plots
+
+The patterns are compiled once at import, and both functions are memoised
+with a bounded LRU cache keyed on the raw string, since the same affiliation
+strings come up for talk after talk.
+"""
+
+import re
+from functools import lru_cache
+
+from affiliation_matcher import AhoCorasick
+
+INSTITUTE_CACHE_SIZE = 16384
+
+# Words that don't help with matching institutes against each other
+MATCHING_STOP_WORDS = ['university', 'institute', 'national', 'laboratory', 'department',
+                       'center', 'centre', 'research', 'of', 'for', 'and', 'the', 'in']
+
+# Substring -> label; the first key found in the name wins
+INSTITUTE_LABELS = {
+    'cern': 'CERN',
+    'brookhaven': 'BNL',
+    'bnl': 'BNL',
+    'lawrence berkeley': 'LBNL',
+    'lbnl': 'LBNL',
+    'berkeley lab': 'LBNL',
+    'mit': 'MIT',
+    'berkeley': 'UC Berkeley',
+    'los alamos': 'LANL',
+    'lanl': 'LANL',
+    'oak ridge': 'ORNL',
+    'ornl': 'ORNL',
+    'argonne': 'ANL',
+    'anl': 'ANL',
+    'jyväskylä': 'University of Jyväskylä',
+    'jyvaskyla': 'University of Jyväskylä',
+    'university of jyväskylä': 'University of Jyväskylä',
+    'university of jyvaskyla': 'University of Jyväskylä',
+    'unam': 'UNAM',
+    'gsi': 'GSI',
+    'infn': 'INFN',
+    'dubna': 'JINR',
+    'jinr': 'JINR'
+}
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+# After punctuation is gone words are plain \w runs, so one alternation
+# removes exactly what the old word-by-word substitutions removed
+_STOP_WORDS = re.compile(r'\b(?:' + '|'.join(map(re.escape, MATCHING_STOP_WORDS)) + r')\b')
+_DIGITS = re.compile(r'\d+')
+_WHITESPACE = re.compile(r'\s+')
+
+_LABEL_MATCHER = AhoCorasick(
+    (key, priority, label) for priority, (key, label) in enumerate(INSTITUTE_LABELS.items())
+)
+
+
+@lru_cache(maxsize=INSTITUTE_CACHE_SIZE)
+def normalize_institute_name(name):
+    """Normalize institute name for better matching"""
+    if not name:
+        return ""
+
+    name = _PUNCTUATION.sub(' ', name.lower())
+    # Filler words go before digits, so "of1" stays "of" as it always did
+    name = _STOP_WORDS.sub('', name)
+    name = _DIGITS.sub('', name)
+    return _WHITESPACE.sub(' ', name).strip()
+
+
+@lru_cache(maxsize=INSTITUTE_CACHE_SIZE)
+def canonical_institute_name(name):
+    """Normalize institute names for consistent identification"""
+    name = name.strip().lower()
+
+    found = _LABEL_MATCHER.search(name)
+    if found:
+        return found[1]
+
+    # Return the original name with first letters capitalized for readability
+    return ' '.join(word.capitalize() for word in name.split())
@@ -0,0 +1,107 @@
+"""
+Inverted keyword index for the topic and keyword trend analyses.
+
+KeywordIndex maps every normalised token of the talks of a year to the
+talks containing it. Multi-word keywords get their own posting list the
+first time they are asked for, so a query is a dictionary lookup:
+
+    index = KeywordIndex(filtered_data)
+    index.count('2019', 'heavy flavor')        # talks mentioning it in 2019
+    index.share('2019', 'jet')                 # % of the year's talks
+    index.count_any('2019', ['charm', 'bottom'])
+
+Keywords are normalised like the text: lowercased, split at anything that
+is not a letter or digit (so 'high-pt' and 'high pt' are the same query) and
+with a plural 's' removed from words longer than three letters ('jets'
+matches 'jet').
+"""
+
+from talk_table import TALK_TYPES
+from talk_tokens import field_tokens, tokenize
+
+# Separates fields in the stored token text, so phrases never span two fields
+_FIELD_SEPARATOR = ' | '
+
+
+class KeywordIndex:
+    """
+    Per-year inverted index from normalised tokens and phrases to talks.
+
+    Talk ids are positions within the year, counting the talks of talk_types
+    in order.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk type -> list of talks
+    - fields: Talk fields to index (a talk matches if any of them contains the keyword)
+    - talk_types: Talk types to include
+    """
+
+    def __init__(self, conference_data, fields=('Title',), talk_types=TALK_TYPES):
+        self.years = list(conference_data.keys())
+        self.fields = tuple(fields)
+        self._postings = {}
+        self._texts = {}
+        self._documents = {}
+
+        for year in self.years:
+            postings = {}
+            texts = []
+            for talk_type in talk_types:
+                for talk in conference_data[year].get(talk_type) or []:
+                    tokens_by_field = [field_tokens(talk, field) for field in self.fields]
+                    talk_id = len(texts)
+                    for token in set().union(*tokens_by_field):
+                        postings.setdefault(token, []).append(talk_id)
+                    texts.append(' ' + _FIELD_SEPARATOR.join(' '.join(tokens) for tokens in tokens_by_field) + ' '
+                                 if any(tokens_by_field) else '')
+            self._postings[year] = postings
+            self._texts[year] = texts
+            self._documents[year] = sum(1 for text in texts if text)
+
+    def documents(self, year):
+        """Number of talks of year with text in the indexed fields"""
+        return self._documents.get(year, 0)
+
+    def _posting(self, year, tokens):
+        """Posting list (sorted talk ids) of a tokenised keyword"""
+        postings = self._postings.get(year)
+        if postings is None or not tokens:
+            return []
+        phrase = ' '.join(tokens)
+        posting = postings.get(phrase)
+        if posting is not None or len(tokens) == 1:
+            return posting or []
+
+        # First query for this phrase: check the talks that have all its tokens
+        candidates = sorted((postings.get(token, []) for token in set(tokens)), key=len)
+        talk_ids = set(candidates[0]).intersection(*candidates[1:])
+        texts = self._texts[year]
+        padded = f' {phrase} '
+        posting = sorted(talk_id for talk_id in talk_ids if padded in texts[talk_id])
+        postings[phrase] = posting
+        return posting
+
+    def talks(self, year, keyword):
+        """Sorted ids of the talks of year containing keyword"""
+        return self._posting(year, tokenize(keyword))
+
+    def count(self, year, keyword):
+        """Number of talks of year containing keyword"""
+        return len(self.talks(year, keyword))
+
+    def count_any(self, year, keywords):
+        """Number of talks of year containing at least one of keywords"""
+        talks = set()
+        for keyword in keywords:
+            talks.update(self.talks(year, keyword))
+        return len(talks)
+
+    def share(self, year, keyword):
+        """Percentage of the talks of year (with indexed text) containing keyword"""
+        documents = self.documents(year)
+        return self.count(year, keyword) / documents * 100 if documents else 0
+
+    def trend(self, keyword, years=None):
+        """Talk counts of keyword for each year"""
+        years = self.years if years is None else years
+        return [self.count(year, keyword) for year in years]
@@ -0,0 +1,69 @@
+"""
+Deferred imports for the heavy third-party stacks.
+
+pandas, numpy, matplotlib, pyarrow and requests together take well over a
+second to import. The scripts bind them at module level as LazyModule
+proxies instead, so importing a script only to call one of its lookup or
+classification helpers stays fast, and a stack is loaded the first time one
+of its attributes is used (e.g. the first plt.figure() call).
+"""
+
+import importlib
+import importlib.util
+import threading
+
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Parameters:
+    - name: Dotted module name, e.g. 'matplotlib.pyplot'
+    - on_import: Optional function called with the module right after it
+      is imported (e.g. to apply rcParams)
+    """
+
+    def __init__(self, name, on_import=None):
+        self.__dict__['_name'] = name
+        self.__dict__['_on_import'] = on_import
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_import is not None:
+                        self._on_import(module)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name, on_import=None):
+    """Return a LazyModule for name (see LazyModule)"""
+    return LazyModule(name, on_import)
+
+
+def module_available(name):
+    """True if module name can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,231 @@
+"""
+Reading the saved participant lists and writing the participant outputs.
+
+- iter_participant_file parses a tab-separated man_YYYY.data file line by
+  line; parse_participant_files parses several, in a process pool when
+  there is enough data
+- write_participants writes all_participants.ndjson (one participant per
+  line) and participant_counts.json, the number of participants per event
+  and year
+- load_participant_counts reads only the counts; iter_participants and
+  load_participants read the participants back
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+PARTICIPANTS_DIR = "data/participants"
+PARTICIPANTS_FILE = "all_participants.ndjson"
+COUNTS_FILE = "participant_counts.json"
+COUNTS_VERSION = 1
+
+PARTICIPANT_FIELDS = ['name', 'affiliation', 'country', 'year', 'indico_id']
+
+# Below this many bytes of input the files are parsed in this process;
+# starting worker processes costs more than parsing them
+PARALLEL_MIN_BYTES = 4 << 20
+
+_YEAR_IN_FILENAME = re.compile(r'man_(\d{4})\.data')
+_COUNTRY_CODE = re.compile(r'\(([A-Z]{2,3})\)$')
+
+
+def participant_file_year(data_file):
+    """Year of a man_YYYY.data file, or None"""
+    match = _YEAR_IN_FILENAME.search(data_file)
+    return match.group(1) if match else None
+
+
+def iter_participant_file(data_file, year, indico_id):
+    """
+    Yield the participants of a tab-separated participant file one at a time.
+
+    Lines are either "First Name, Last Name, Affiliation" or "Name,
+    Affiliation"; a first line that does not start with a number is a header.
+    The country is the code in parentheses at the end of the affiliation,
+    if there is one.
+
+    Parameters:
+    - data_file: Path to the data file
+    - year, indico_id: Stored with every participant
+    """
+    has_headers = None
+    with open(data_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            if has_headers is None:
+                # Determine format from first line
+                has_headers = not parts[0].isdigit()
+                if has_headers:
+                    continue
+
+            # Skip if not enough data
+            if len(parts) < 2:
+                continue
+            if len(parts) >= 3:
+                # Format: First Name, Last Name, Affiliation
+                name = f"{parts[0].strip()} {parts[1].strip()}"
+                affiliation = parts[2].strip()
+            else:
+                # Format: Name, Affiliation
+                name = parts[0].strip()
+                affiliation = parts[1].strip()
+
+            country_match = _COUNTRY_CODE.search(affiliation)
+            yield {
+                'name': name,
+                'affiliation': affiliation,
+                'country': country_match.group(1) if country_match else "",
+                'year': year,
+                'indico_id': indico_id,
+            }
+
+
+def parse_participant_file(data_file, year_to_id):
+    """
+    Parse one participant file.
+
+    Returns:
+    - (year, Indico ID, list of participants); (None, None, []) if the file
+      name has no year
+    """
+    year = participant_file_year(data_file)
+    if year is None:
+        print(f"Warning: Could not extract year from filename {data_file}")
+        return None, None, []
+    indico_id = year_to_id.get(year, "unknown")
+    try:
+        participants = list(iter_participant_file(data_file, year, indico_id))
+    except Exception as e:
+        print(f"Error processing {data_file}: {e}")
+        return year, indico_id, []
+    if not participants:
+        print(f"Warning: No data found in {data_file}")
+    return year, indico_id, participants
+
+
+def _parse_task(args):
+    return parse_participant_file(*args)
+
+
+def parse_participant_files(data_files, year_to_id, max_workers=None):
+    """
+    Parse participant files, in parallel processes if there is enough data.
+
+    Parameters:
+    - data_files: Paths of man_YYYY.data files
+    - year_to_id: Dictionary mapping years to Indico IDs
+    - max_workers: Size of the process pool (default: one per file, at most
+      the number of CPUs); 1 parses in this process
+
+    Returns:
+    - Dictionary mapping event identifiers ("year-indicoid") to lists of
+      participants, in the order of the files
+    """
+    data_files = sorted(data_files)
+    if max_workers is None:
+        max_workers = min(len(data_files), os.cpu_count() or 1)
+        if sum(os.path.getsize(path) for path in data_files) < PARALLEL_MIN_BYTES:
+            max_workers = 1
+
+    tasks = [(path, year_to_id) for path in data_files]
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_parse_task, tasks))
+    else:
+        results = [_parse_task(task) for task in tasks]
+
+    all_participants = {}
+    for data_file, (year, indico_id, participants) in zip(data_files, results):
+        if year and participants:
+            print(f"Processed {len(participants)} participants from {data_file}")
+            all_participants[f"{year}-{indico_id}"] = participants
+    return all_participants
+
+
+def _event_year(event_key):
+    return event_key.split('-', 1)[0]
+
+
+def write_participants(all_participants, output_dir=PARTICIPANTS_DIR):
+    """
+    Write all participants as newline-delimited JSON and the per-event and
+    per-year counts next to it.
+
+    Parameters:
+    - all_participants: Dictionary mapping event identifiers to lists (or
+      iterables) of participants
+    - output_dir: Directory of the output files
+
+    Returns:
+    - (participants file, counts file)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    participants_file = os.path.join(output_dir, PARTICIPANTS_FILE)
+    counts_file = os.path.join(output_dir, COUNTS_FILE)
+
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    events = {}
+    years = {}
+    tmp_file = f"{participants_file}.tmp{os.getpid()}"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        for event_key, participants in all_participants.items():
+            count = 0
+            for participant in participants:
+                f.write(encode(participant) + '\n')
+                count += 1
+            events[event_key] = count
+            year = _event_year(event_key)
+            years[year] = years.get(year, 0) + count
+    os.replace(tmp_file, participants_file)
+
+    tmp_file = f"{counts_file}.tmp{os.getpid()}"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': COUNTS_VERSION, 'source': PARTICIPANTS_FILE,
+                   'source_size': os.path.getsize(participants_file),
+                   'events': events, 'years': years}, f, indent=1)
+    os.replace(tmp_file, counts_file)
+    return participants_file, counts_file
+
+
+def iter_participants(participants_file=os.path.join(PARTICIPANTS_DIR, PARTICIPANTS_FILE)):
+    """Yield the participants of an all_participants.ndjson file one at a time"""
+    with open(participants_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_participants(participants_file=os.path.join(PARTICIPANTS_DIR, PARTICIPANTS_FILE)):
+    """Dictionary mapping event identifiers to lists of participants, from the NDJSON file"""
+    all_participants = {}
+    for participant in iter_participants(participants_file):
+        event_key = f"{participant.get('year', '')}-{participant.get('indico_id', '')}"
+        all_participants.setdefault(event_key, []).append(participant)
+    return all_participants
+
+
+def load_participant_counts(participants_dir=PARTICIPANTS_DIR):
+    """
+    Number of participants per year from the count sidecar.
+
+    Returns:
+    - Dictionary mapping years to participant counts, or None if there is no
+      sidecar or the participant list it describes has changed since
+    """
+    counts_file = os.path.join(participants_dir, COUNTS_FILE)
+    try:
+        with open(counts_file, 'r', encoding='utf-8') as f:
+            counts = json.load(f)
+        if counts.get('version') != COUNTS_VERSION:
+            return None
+        source = os.path.join(participants_dir, counts.get('source', PARTICIPANTS_FILE))
+        if os.path.getsize(source) != counts.get('source_size'):
+            return None
+    except (OSError, ValueError, AttributeError):
+        return None
+    return counts.get('years')
@@ -0,0 +1,112 @@
+"""
+Name index for matching talk speakers against participant records, by exact
+name or by one name containing the other.
+"""
+
+from collections import defaultdict
+
+# Match qualities reported by ParticipantIndex.find
+MATCH_EXACT = 'exact'
+MATCH_CASE_INSENSITIVE = 'case-insensitive'
+MATCH_SPEAKER_IN_NAME = 'speaker-in-participant'
+MATCH_NAME_IN_SPEAKER = 'participant-in-speaker'
+
+NGRAM_SIZE = 3
+
+
+def _ngrams(text, size=NGRAM_SIZE):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class ParticipantIndex:
+    """
+    Index over a participant lookup dictionary (name -> participant data).
+
+    Parameters:
+    - participant_lookup: Dictionary as returned by load_participant_data
+    """
+
+    def __init__(self, participant_lookup):
+        self.lookup = participant_lookup
+        self.names = list(participant_lookup.keys())
+        self.lower_names = [name.lower() for name in self.names]
+
+        # First position of every lowercased name, for "name inside speaker"
+        self.position_by_name = {}
+        for position, name in enumerate(self.lower_names):
+            self.position_by_name.setdefault(name, position)
+        self.name_lengths = sorted({len(name) for name in self.position_by_name})
+
+        # Trigram -> ascending list of positions, for "speaker inside name"
+        self.postings = defaultdict(list)
+        for position, name in enumerate(self.lower_names):
+            for gram in _ngrams(name):
+                self.postings[gram].append(position)
+
+    def _first_name_in_speaker(self, speaker_lower):
+        """Lowest position of a participant name contained in the speaker name"""
+        best = None
+        for length in self.name_lengths:
+            if length > len(speaker_lower):
+                break
+            for start in range(len(speaker_lower) - length + 1):
+                position = self.position_by_name.get(speaker_lower[start:start + length])
+                if position is not None and (best is None or position < best):
+                    best = position
+        return best
+
+    def _first_name_containing_speaker(self, speaker_lower):
+        """Lowest position of a participant name that contains the speaker name"""
+        if len(speaker_lower) < NGRAM_SIZE:
+            # Too short for the trigram index; these are rare enough to scan
+            for position, name in enumerate(self.lower_names):
+                if speaker_lower in name:
+                    return position
+            return None
+
+        # Every name containing the speaker contains its rarest trigram too
+        shortest = None
+        for gram in _ngrams(speaker_lower):
+            postings = self.postings.get(gram)
+            if not postings:
+                return None
+            if shortest is None or len(postings) < len(shortest):
+                shortest = postings
+
+        for position in shortest:
+            if speaker_lower in self.lower_names[position]:
+                return position
+        return None
+
+    def find(self, speaker):
+        """
+        Find the participant record for a speaker.
+
+        Parameters:
+        - speaker: Speaker name as it appears in the talk data
+
+        Returns:
+        - Tuple of (participant data, match quality), or (None, None) if no
+          participant matches
+        """
+        participant = self.lookup.get(speaker)
+        if participant:
+            return participant, MATCH_EXACT
+
+        speaker_lower = speaker.lower()
+        containing = self._first_name_containing_speaker(speaker_lower)
+        contained = self._first_name_in_speaker(speaker_lower)
+
+        candidates = [position for position in (containing, contained) if position is not None]
+        if not candidates:
+            return None, None
+
+        position = min(candidates)
+        if self.lower_names[position] == speaker_lower:
+            quality = MATCH_CASE_INSENSITIVE
+        elif position == containing:
+            quality = MATCH_SPEAKER_IN_NAME
+        else:
+            quality = MATCH_NAME_IN_SPEAKER
+
+        return self.lookup[self.names[position]], quality
@@ -0,0 +1,307 @@
+"""
+Person table of the speakers of processed talks.
+
+save_processed_data writes each speaker once to data/processed/persons.csv;
+talks reference their speaker by the integer Person_Key (the row's position
+in the table) and keep the affiliation given for that talk in
+Speaker_Affiliation. A row is one Indico event person, keyed on person_id,
+or on Email_Hash when the payload has no person_id; Email_Hash links a
+person's rows across conferences.
+
+Processed data with speaker payloads in the talk CSVs (Raw_Speaker_Data) is
+converted with:
+
+    python person_table.py migrate data/processed
+"""
+
+import argparse
+import ast
+import csv
+import json
+import os
+import sys
+
+PERSONS_FILE = "data/processed/persons.csv"
+PERSON_KEY_COLUMN = 'Person_Key'
+PAYLOAD_COLUMN = 'Raw_Speaker_Data'
+
+SPEAKER_AFFILIATION_COLUMN = 'Speaker_Affiliation'
+
+# Payload key -> person table column
+PAYLOAD_COLUMNS = {
+    'emailHash': 'Email_Hash',
+    'person_id': 'Person_ID',
+    'fullName': 'Full_Name',
+    'first_name': 'First_Name',
+    'last_name': 'Last_Name',
+    'title': 'Title',
+}
+
+# Payload key -> talk column; these describe the talk, not the person
+TALK_PAYLOAD_COLUMNS = {
+    'affiliation': SPEAKER_AFFILIATION_COLUMN,
+}
+
+# Payload keys that belong to the contribution or the export format, not the person
+DROPPED_PAYLOAD_KEYS = frozenset(['_type', '_fossil', 'id', 'db_id'])
+
+# Any other payload keys are kept as JSON in this column
+OTHER_COLUMN = 'Other'
+
+PERSON_COLUMNS = [PERSON_KEY_COLUMN] + list(PAYLOAD_COLUMNS.values()) + [OTHER_COLUMN]
+
+# Talk lists written by save_processed_data
+TALK_LISTS = ['plenary_talks', 'parallel_talks', 'poster_talks', 'flash_talks', 'other_talks', 'all_talks']
+
+
+def person_fields(payload):
+    """(column, value) pairs of the person table row of a speaker payload"""
+    fields = []
+    other = {}
+    for name, value in payload.items():
+        column = PAYLOAD_COLUMNS.get(name)
+        if column is not None:
+            fields.append((column, value))
+        elif name not in DROPPED_PAYLOAD_KEYS and name not in TALK_PAYLOAD_COLUMNS:
+            other[name] = value
+    if other:
+        fields.append((OTHER_COLUMN, json.dumps(other, ensure_ascii=False, sort_keys=True, default=str)))
+    return fields
+
+
+def talk_fields(payload):
+    """(column, value) pairs of a speaker payload kept on the talk row (None values if no payload)"""
+    if not payload or not isinstance(payload, dict):
+        return [(column, None) for column in TALK_PAYLOAD_COLUMNS.values()]
+    return [(column, payload.get(name)) for name, column in TALK_PAYLOAD_COLUMNS.items()]
+
+
+def _row_identity(fields):
+    """
+    Deduplication key of a row: its Person_ID, else its Email_Hash, else all
+    of its values. Values compare as text, as they are read back from CSV.
+    """
+    fields = [(column, str(value)) for column, value in fields if value not in (None, '')]
+    values = dict(fields)
+    for column in ('Person_ID', 'Email_Hash'):
+        if column in values:
+            return column, values[column]
+    return tuple(sorted(fields))
+
+
+class PersonTable:
+    """
+    Speakers of the processed talks, one row per person (see _row_identity).
+
+    Parameters:
+    - rows: List of row dictionaries with the PERSON_COLUMNS; a row's
+      Person_Key is its position
+    """
+
+    def __init__(self, rows=None):
+        self.rows = []
+        self._keys = {}
+        for row in rows or []:
+            self._append(row, _row_identity((column, row.get(column)) for column in PERSON_COLUMNS[1:]))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _append(self, row, identity):
+        key = len(self.rows)
+        row[PERSON_KEY_COLUMN] = key
+        self.rows.append(row)
+        self._keys.setdefault(identity, key)
+        return key
+
+    def add(self, payload):
+        """
+        Person_Key of the person of a speaker payload, adding the person if new.
+        A person keeps the fields of the first payload seen for them.
+
+        Returns:
+        - Integer key, or None if there is no payload (talk without speaker)
+        """
+        if not payload or not isinstance(payload, dict):
+            return None
+        fields = person_fields(payload)
+        identity = _row_identity(fields)
+        key = self._keys.get(identity)
+        if key is not None:
+            return key
+
+        row = dict.fromkeys(PERSON_COLUMNS)
+        row.update(fields)
+        return self._append(row, identity)
+
+    @staticmethod
+    def _row_payload(row):
+        payload = {name: row[column] for name, column in PAYLOAD_COLUMNS.items()
+                   if row.get(column) not in (None, '')}
+        if row.get(OTHER_COLUMN):
+            payload.update(json.loads(row[OTHER_COLUMN]))
+        return payload
+
+    def payload(self, key, affiliation=None):
+        """
+        Speaker payload of a person (without the dropped keys), or None for a
+        missing key; affiliation is the talk's Speaker_Affiliation.
+        """
+        if key is None or key == '':
+            return None
+        payload = self._row_payload(self.rows[int(key)])
+        if affiliation not in (None, ''):
+            payload['affiliation'] = affiliation
+        return payload
+
+    def lookup(self, keys, column):
+        """Values of one person column for a sequence of Person_Keys (None for missing keys)"""
+        rows = self.rows
+        return [None if key is None or key == '' else rows[int(key)][column] for key in keys]
+
+    def save(self, filename=PERSONS_FILE):
+        """Write the table as CSV"""
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        tmp_file = f"{filename}.tmp{os.getpid()}"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PERSON_COLUMNS, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(self.rows)
+        os.replace(tmp_file, filename)
+
+    @classmethod
+    def load(cls, filename=PERSONS_FILE):
+        """Load a table written with save(); None if there is none"""
+        try:
+            with open(filename, 'r', encoding='utf-8', newline='') as f:
+                rows = [{column: value if value != '' else None for column, value in row.items()}
+                        for row in csv.DictReader(f)]
+        except FileNotFoundError:
+            return None
+        for position, row in enumerate(rows):
+            if int(row[PERSON_KEY_COLUMN]) != position:
+                raise ValueError(f"{filename}: row {position} has {PERSON_KEY_COLUMN} {row[PERSON_KEY_COLUMN]}")
+        return cls(rows)
+
+
+def _talk_row(talk, persons):
+    """
+    Copy of a talk with Person_Key and Speaker_Affiliation in place of the
+    speaker payload, in the same column position
+    """
+    row = {}
+    for column, value in talk.items():
+        if column == PAYLOAD_COLUMN:
+            row[PERSON_KEY_COLUMN] = persons.add(value)
+            row.update(talk_fields(value))
+        else:
+            row[column] = value
+    return row
+
+
+def split_speaker_payloads(conference_data, persons=None):
+    """
+    Move the speaker payloads of all talks into a person table.
+
+    A talk that is in several lists (all_talks and its typed list) becomes
+    one row object shared by the same lists, so writers that identify talks
+    by object (save_talk_store) see the same structure.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk list name -> list of talks
+    - persons: PersonTable to add to (a new one if None)
+
+    Returns:
+    - (PersonTable, dictionary of year -> talk list name -> list of talk rows)
+    """
+    if persons is None:
+        persons = PersonTable()
+    tables = {}
+    for year in sorted(conference_data):
+        data = conference_data[year]
+        rows_by_talk = {}
+        year_tables = tables[year] = {}
+        for talk_list in TALK_LISTS:
+            talks = data.get(talk_list)
+            if not talks:
+                continue
+            rows = []
+            for talk in talks:
+                row = rows_by_talk.get(id(talk))
+                if row is None:
+                    row = rows_by_talk[id(talk)] = _talk_row(talk, persons)
+                rows.append(row)
+            year_tables[talk_list] = rows
+    return persons, tables
+
+
+def _parse_payload(text):
+    """Speaker payload from a legacy CSV cell (dict repr), None if empty"""
+    if not text:
+        return None
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def migrate_processed_dir(processed_dir='data/processed'):
+    """
+    Convert CSVs written with the Raw_Speaker_Data column to Person_Key and
+    Speaker_Affiliation columns and a persons.csv next to the year
+    directories.
+
+    Returns:
+    - (number of files converted, PersonTable)
+    """
+    csv.field_size_limit(sys.maxsize)
+    persons_file = os.path.join(processed_dir, 'persons.csv')
+    persons = PersonTable.load(persons_file) or PersonTable()
+    converted = 0
+    years = sorted(name for name in os.listdir(processed_dir)
+                   if name.isdigit() and os.path.isdir(os.path.join(processed_dir, name)))
+    for year in years:
+        for talk_list in TALK_LISTS:
+            path = os.path.join(processed_dir, year, f'{talk_list}.csv')
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header or PAYLOAD_COLUMN not in header:
+                    continue
+                column = header.index(PAYLOAD_COLUMN)
+                rows = []
+                for row in reader:
+                    payload = _parse_payload(row[column])
+                    key = persons.add(payload)
+                    row[column:column + 1] = ['' if key is None else str(key)] + [
+                        '' if value is None else str(value) for _, value in talk_fields(payload)]
+                    rows.append(row)
+            header[column:column + 1] = [PERSON_KEY_COLUMN] + list(TALK_PAYLOAD_COLUMNS.values())
+            tmp_file = f"{path}.tmp{os.getpid()}"
+            with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(header)
+                writer.writerows(rows)
+            os.replace(tmp_file, path)
+            converted += 1
+    persons.save(persons_file)
+    return converted, persons
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Person table of the processed talks")
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate = commands.add_parser('migrate', help="Convert CSVs with Raw_Speaker_Data to Person_Key, Speaker_Affiliation and persons.csv")
+    migrate.add_argument('processed_dir', nargs='?', default='data/processed')
+    args = parser.parse_args(argv)
+
+    converted, persons = migrate_processed_dir(args.processed_dir)
+    print(f"Converted {converted} files; {len(persons)} persons in "
+          f"{os.path.join(args.processed_dir, 'persons.csv')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
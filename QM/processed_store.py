@@ -0,0 +1,212 @@
+"""
+Optional Parquet copy of the processed talks under data/processed/talks,
+partitioned by year and talk type, from which years, talk types and columns
+can be loaded selectively. Needs pyarrow; without it the store is skipped.
+"""
+
+import json
+import os
+import shutil
+
+from lazy_imports import lazy_module, module_available
+
+# pyarrow is optional and only imported when the store is used
+HAVE_PYARROW = module_available('pyarrow')
+pa = lazy_module('pyarrow')
+ds = lazy_module('pyarrow.dataset')
+pq = lazy_module('pyarrow.parquet')
+
+STORE_DIR = "data/processed/talks"
+
+# Talk lists stored as partitions, in the order they are written
+STORED_TALK_TYPES = ['plenary_talks', 'parallel_talks', 'poster_talks', 'flash_talks', 'other_talks']
+UNLISTED_TALK_TYPE = 'unlisted_talks'
+
+POSITION_COLUMN = 'Position'
+PARTITION_COLUMNS = ['Year', 'Talk_Type']
+
+# Columns whose values are stored as JSON text
+JSON_COLUMNS = ['Raw_Speaker_Data']
+
+
+def have_talk_store_support():
+    """Return True if pyarrow is available for the columnar store"""
+    return HAVE_PYARROW
+
+
+def talk_store_exists(store_dir=STORE_DIR):
+    """Return True if a columnar talk store has been written"""
+    return os.path.isdir(store_dir) and any(name.startswith('Year=') for name in os.listdir(store_dir))
+
+
+def talk_store_files(store_dir=STORE_DIR):
+    """Sorted paths of the Parquet files of the store"""
+    paths = []
+    for root, dirs, files in os.walk(store_dir):
+        # Skip years that are still being written
+        dirs[:] = sorted(name for name in dirs if '.tmp' not in name)
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.parquet'))
+    return paths
+
+
+def _column_array(values):
+    """Arrow array for one column; mixed or unsupported values fall back to strings"""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def _talks_to_table(talks, positions):
+    """Arrow table for a list of talk dictionaries"""
+    columns = []
+    for talk in talks:
+        for key in talk:
+            if key not in columns:
+                columns.append(key)
+
+    arrays = {}
+    for column in columns:
+        values = [talk.get(column) for talk in talks]
+        if column in JSON_COLUMNS:
+            values = [None if value is None else json.dumps(value) for value in values]
+            arrays[column] = pa.array(values, type=pa.string())
+        else:
+            arrays[column] = _column_array(values)
+    arrays[POSITION_COLUMN] = pa.array(positions, type=pa.int64())
+
+    return pa.table(arrays)
+
+
+def save_talk_store(conference_data, store_dir=STORE_DIR):
+    """
+    Write the talks of conference_data to the columnar store.
+
+    Each talk is stored once, in the partition of its talk list; all_talks
+    is rebuilt on load from the Position column, and talks that are only in
+    all_talks go to the 'unlisted_talks' partition. Columns in JSON_COLUMNS
+    are stored as JSON text.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk type -> list of talks
+    - store_dir: Root directory of the Parquet dataset
+
+    Returns:
+    - True if the store was written, False if pyarrow is not available
+    """
+    if not HAVE_PYARROW:
+        print("pyarrow is not installed; skipping the columnar talk store")
+        return False
+
+    for year, data in conference_data.items():
+        all_talks = data.get('all_talks') or []
+        position_by_id = {id(talk): position for position, talk in enumerate(all_talks)}
+
+        partitions = {}
+        listed = set()
+        for talk_type in STORED_TALK_TYPES:
+            talks = data.get(talk_type) or []
+            if talks:
+                partitions[talk_type] = talks
+                listed.update(id(talk) for talk in talks)
+        unlisted = [talk for talk in all_talks if id(talk) not in listed]
+        if unlisted:
+            partitions[UNLISTED_TALK_TYPE] = unlisted
+
+        # Rewrite the whole year so partitions of removed talk types disappear
+        year_dir = os.path.join(store_dir, f'Year={year}')
+        tmp_dir = f"{year_dir}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        for talk_type, talks in partitions.items():
+            positions = [position_by_id.get(id(talk)) for talk in talks]
+            table = _talks_to_table(talks, positions)
+            partition_dir = os.path.join(tmp_dir, f'Talk_Type={talk_type}')
+            os.makedirs(partition_dir, exist_ok=True)
+            pq.write_table(table, os.path.join(partition_dir, 'part-0.parquet'))
+
+        shutil.rmtree(year_dir, ignore_errors=True)
+        if partitions:
+            os.replace(tmp_dir, year_dir)
+
+        print(f"Saved {sum(len(talks) for talks in partitions.values())} talks for {year} to {year_dir}")
+
+    return True
+
+
+def _open_dataset(store_dir):
+    """Open the store with one schema covering the columns of every partition"""
+    partitioning = ds.partitioning(
+        pa.schema([('Year', pa.string()), ('Talk_Type', pa.string())]), flavor='hive'
+    )
+    dataset = ds.dataset(store_dir, format='parquet', partitioning=partitioning)
+
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if not schemas:
+        return dataset
+
+    # Partitions may lack a column, or have it all-null; unify before reading
+    schema = pa.unify_schemas([schema.remove_metadata() for schema in schemas], promote_options='permissive')
+    for name in PARTITION_COLUMNS:
+        schema = schema.append(pa.field(name, pa.string()))
+    return ds.dataset(store_dir, format='parquet', partitioning=partitioning, schema=schema)
+
+
+def load_talk_store(store_dir=STORE_DIR, columns=None, years=None, talk_types=None):
+    """
+    Load talks from the columnar store.
+
+    Parameters:
+    - store_dir: Root directory of the Parquet dataset
+    - columns: Talk columns to load (all if None)
+    - years: Years to load (all if None)
+    - talk_types: Talk lists to load (all if None); all_talks is rebuilt from
+      whichever lists are loaded
+
+    Returns:
+    - Dictionary of year -> talk type -> list of talks, or None if the store
+      is unavailable
+    """
+    if not HAVE_PYARROW or not talk_store_exists(store_dir):
+        return None
+
+    dataset = _open_dataset(store_dir)
+
+    selected = None
+    if columns is not None:
+        names = dataset.schema.names
+        selected = [column for column in columns if column in names]
+        selected += [column for column in PARTITION_COLUMNS + [POSITION_COLUMN] if column not in selected]
+
+    condition = None
+    if years is not None:
+        condition = ds.field('Year').isin([str(year) for year in years])
+    if talk_types is not None:
+        type_condition = ds.field('Talk_Type').isin(list(talk_types) + [UNLISTED_TALK_TYPE])
+        condition = type_condition if condition is None else condition & type_condition
+
+    table = dataset.to_table(columns=selected, filter=condition)
+    talk_columns = [name for name in table.column_names if name not in PARTITION_COLUMNS + [POSITION_COLUMN]]
+    json_columns = [column for column in JSON_COLUMNS if column in talk_columns]
+
+    conference_data = {}
+    positioned = {}
+    for row in table.to_pylist():
+        year = row.pop('Year')
+        talk_type = row.pop('Talk_Type')
+        position = row.pop(POSITION_COLUMN)
+        for column in json_columns:
+            if row[column] is not None:
+                row[column] = json.loads(row[column])
+
+        year_data = conference_data.setdefault(year, {})
+        if talk_type != UNLISTED_TALK_TYPE:
+            year_data.setdefault(talk_type, []).append(row)
+        if position is not None:
+            positioned.setdefault(year, []).append((position, row))
+
+    for year, talks in positioned.items():
+        talks.sort(key=lambda item: item[0])
+        conference_data[year]['all_talks'] = [talk for _, talk in talks]
+
+    return conference_data
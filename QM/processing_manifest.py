@@ -0,0 +1,152 @@
+"""
+Per-event manifest for incremental processing.
+
+For every processed conference year the manifest records the inputs the
+processed data was derived from:
+- source: SHA-256 of the Indico export (see indico_cache.get_export_digest)
+- mapping_db: hash of the institute/country mapping files
+- code_version: hash of the processing code
+
+A year is only fetched and classified again when one of these changes. Past
+QM editions keep the same export, so in practice only the current year, or
+everything after a mapping or code change, is recomputed.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import time
+
+MANIFEST_FILE = "data/processed/manifest.json"
+MANIFEST_VERSION = 1
+
+# Mapping tables read while assigning countries (relative to the working directory)
+MAPPING_FILES = ['institute_country_database.csv', 'data/unknown_institute_mappings.csv']
+
+# Script that produces the processed talks; it and every module of this
+# directory it imports, directly or indirectly, make up the processing code
+CODE_ENTRY = 'generate_conference_data.py'
+
+_CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def hash_files(paths):
+    """SHA-256 over the names and contents of files; missing files hash as absent"""
+    sha256 = hashlib.sha256()
+    for path in paths:
+        sha256.update(os.path.basename(path).encode('utf-8') + b'\0')
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    sha256.update(chunk)
+        except FileNotFoundError:
+            sha256.update(b'<missing>')
+        sha256.update(b'\0')
+    return sha256.hexdigest()
+
+
+def mapping_db_hash():
+    """Hash of the institute/country mapping files"""
+    return hash_files(MAPPING_FILES)
+
+
+def _imported_modules(path):
+    """Top-level names of all modules a source file imports (at any depth of the file)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+        elif (isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'lazy_module'
+              and node.args and isinstance(node.args[0], ast.Constant)):
+            names.add(str(node.args[0].value).split('.')[0])
+    return names
+
+
+def code_files(entry=CODE_ENTRY, code_dir=_CODE_DIR):
+    """
+    File names of the processing code: entry and the modules of code_dir it
+    imports, directly or through each other, in sorted order.
+    """
+    found = set()
+    pending = [entry]
+    while pending:
+        name = pending.pop()
+        if name in found or not os.path.exists(os.path.join(code_dir, name)):
+            continue
+        found.add(name)
+        pending.extend(f'{module}.py' for module in _imported_modules(os.path.join(code_dir, name)))
+    return sorted(found)
+
+
+def code_version():
+    """Hash of the processing code (see code_files)"""
+    return hash_files([os.path.join(_CODE_DIR, name) for name in code_files()])
+
+
+def event_inputs(source_digest, mapping_hash=None, code_hash=None):
+    """
+    Fingerprint of everything one processed year depends on.
+
+    Parameters:
+    - source_digest: SHA-256 of the event's Indico export
+    - mapping_hash: Precomputed mapping_db_hash(), computed if None
+    - code_hash: Precomputed code_version(), computed if None
+    """
+    return {
+        'source': source_digest,
+        'mapping_db': mapping_hash if mapping_hash is not None else mapping_db_hash(),
+        'code_version': code_hash if code_hash is not None else code_version()
+    }
+
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Load the manifest, or return an empty one if it is missing or unreadable"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+        print(f"Manifest {manifest_file} has an old format; all years will be processed")
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"Could not read manifest {manifest_file}: {e}")
+    return {'version': MANIFEST_VERSION, 'events': {}}
+
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    """Write the manifest atomically"""
+    os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+    tmp_file = f"{manifest_file}.tmp{os.getpid()}"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def is_up_to_date(manifest, year, inputs):
+    """True if year was processed from exactly these inputs"""
+    entry = manifest['events'].get(str(year))
+    return entry is not None and entry.get('inputs') == inputs
+
+
+def changed_inputs(manifest, year, inputs):
+    """Names of the inputs that differ from the manifest entry of year"""
+    entry = manifest['events'].get(str(year))
+    if entry is None:
+        return ['not processed yet']
+    recorded = entry.get('inputs', {})
+    return [name for name in inputs if recorded.get(name) != inputs[name]]
+
+
+def record_event(manifest, year, indico_id, inputs):
+    """Record that year was processed from these inputs"""
+    manifest['events'][str(year)] = {
+        'indico_id': str(indico_id),
+        'inputs': inputs,
+        'processed_at': time.time()
+    }
@@ -0,0 +1,486 @@
+"""
+Country lookup for participant affiliations through the Research
+Organization Registry (ROR, https://ror.org).
+
+RorResolver answers an affiliation from, in order:
+- a local index built from a ROR data dump (optional, see RorIndex),
+- a persistent cache of earlier API answers, including affiliations ROR did
+  not know (data/cache/ror/affiliations.json),
+- the ROR API.
+
+resolve_many looks every distinct affiliation (after normalisation) up once.
+API requests go through a session of their own, spaced by the rate limit and
+capped at ROR_MAX_CONNECTIONS at a time.
+
+ROR data dumps are published at https://zenodo.org/communities/ror-data as a
+zip of all records in JSON. build_ror_index turns one into a compact index
+(data/cache/ror/index.json.gz) that later runs load directly:
+
+    python ror_lookup.py build-index v1.63-2025-04-03-ror-data.zip
+    python ror_lookup.py resolve "University of Jyvaskyla" "CERN, Geneva"
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from indico_stream import iter_json_array
+from lazy_imports import lazy_module
+
+requests = lazy_module('requests')
+
+ROR_API_URL = "https://api.ror.org/organizations"
+ROR_CACHE_FILE = "data/cache/ror/affiliations.json"
+ROR_INDEX_FILE = "data/cache/ror/index.json.gz"
+CACHE_VERSION = 1
+INDEX_VERSION = 1
+
+# ROR allows 2000 requests per 5 minutes; stay well below that
+ROR_REQUEST_INTERVAL = 0.25
+
+# Connection and retry settings of the ROR session
+ROR_MAX_CONNECTIONS = 2
+ROR_RETRY_TOTAL = 4
+ROR_RETRY_BACKOFF_FACTOR = 1.0
+ROR_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+ROR_REQUEST_TIMEOUT = 30
+
+# New API answers are written to the cache file after this many lookups,
+# so an interrupted run keeps what it already fetched
+CACHE_SAVE_EVERY = 50
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+_COUNTRY_CODE_SUFFIX = re.compile(r'\s*\([A-Z]{2,3}\)\s*$')
+_SEGMENT_SEPARATORS = re.compile(r'[,;/]| - ')
+
+# Marks a name in the index that belongs to organisations in different countries
+_AMBIGUOUS = -1
+
+_ror_session = None
+_ror_session_lock = threading.Lock()
+_ror_slots = threading.BoundedSemaphore(ROR_MAX_CONNECTIONS)
+
+
+def get_ror_session():
+    """Return the connection-pooled session for ROR API requests, with retry and backoff"""
+    global _ror_session
+    with _ror_session_lock:
+        if _ror_session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=ROR_RETRY_TOTAL,
+                backoff_factor=ROR_RETRY_BACKOFF_FACTOR,
+                status_forcelist=ROR_RETRY_STATUS_CODES,
+                allowed_methods=frozenset(['GET']),
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=ROR_MAX_CONNECTIONS, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _ror_session = session
+        return _ror_session
+
+
+def affiliation_key(affiliation):
+    """
+    Matching key of an affiliation or organisation name: lowercase ASCII
+    words without accents or punctuation.
+    """
+    if not affiliation:
+        return ''
+    text = unicodedata.normalize('NFKD', affiliation.casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def affiliation_segments(affiliation):
+    """
+    Keys of the comma-separated parts of an affiliation, longest first,
+    e.g. "Dept. of Physics, University of Oslo, Norway" -> the keys of
+    "Dept. of Physics", "University of Oslo" and "Norway".
+    """
+    affiliation = _COUNTRY_CODE_SUFFIX.sub('', affiliation or '')
+    keys = {affiliation_key(part) for part in _SEGMENT_SEPARATORS.split(affiliation)}
+    keys.discard('')
+    return sorted(keys, key=lambda key: (-len(key), key))
+
+
+def compact_record(organization):
+    """
+    The fields kept from a ROR organisation record (schema v1 or v2):
+    dictionary with id, name, country and country_code.
+    """
+    name = organization.get('name')
+    country = organization.get('country') or {}
+    if not name:
+        for entry in organization.get('names') or []:
+            if 'ror_display' in (entry.get('types') or []):
+                name = entry.get('value')
+                break
+    if not country:
+        for location in organization.get('locations') or []:
+            country = location.get('geonames_details') or {}
+            if country:
+                break
+    return {
+        'id': organization.get('id', ''),
+        'name': name or '',
+        'country': country.get('country_name') or 'Unknown',
+        'country_code': country.get('country_code') or '',
+    }
+
+
+def _record_names(organization):
+    """All names of a ROR record: name, labels, aliases and acronyms"""
+    names = [organization.get('name')]
+    names.extend(organization.get('aliases') or [])
+    names.extend(organization.get('acronyms') or [])
+    names.extend(label.get('label') for label in organization.get('labels') or [])
+    names.extend(entry.get('value') for entry in organization.get('names') or [])
+    return [name for name in names if name]
+
+
+def iter_dump_records(path):
+    """
+    Yield the organisation records of a ROR data dump, either the JSON file
+    or the zip it is published in, one at a time.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = [name for name in archive.namelist() if name.endswith('.json')]
+            if not members:
+                raise ValueError(f"No JSON file in ROR dump {path}")
+            # Dumps ship the same records in schema v1 and v2; either will do
+            with archive.open(sorted(members)[0]) as raw:
+                yield from iter_json_array(io.TextIOWrapper(raw, encoding='utf-8'))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from iter_json_array(f)
+
+
+class RorIndex:
+    """
+    Offline name -> organisation index over a ROR data dump.
+
+    An affiliation is looked up by its full key first, then by its
+    comma-separated parts (longest first). Names shared by organisations
+    in different countries are not used.
+
+    Parameters:
+    - records: List of [id, name, country, country_code]
+    - names: Affiliation key -> position in records
+    - source: Description of the dump the index was built from
+    """
+
+    def __init__(self, records, names, source=None):
+        self.records = records
+        self.names = names
+        self.source = source or {}
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_dump(cls, path):
+        """Build the index from a ROR data dump file"""
+        records = []
+        names = {}
+        for organization in iter_dump_records(path):
+            if organization.get('status') == 'withdrawn':
+                continue
+            record = compact_record(organization)
+            position = len(records)
+            records.append([record['id'], record['name'], record['country'], record['country_code']])
+            for name in _record_names(organization):
+                key = affiliation_key(name)
+                if not key:
+                    continue
+                other = names.setdefault(key, position)
+                if other not in (position, _AMBIGUOUS) and records[other][2] != record['country']:
+                    names[key] = _AMBIGUOUS
+        return cls(records, names, _file_signature(path))
+
+    @classmethod
+    def load(cls, filename=ROR_INDEX_FILE):
+        """Load an index saved with save(); None if there is none or it is outdated"""
+        try:
+            with gzip.open(filename, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        return cls(data['records'], data['names'], data.get('source'))
+
+    def save(self, filename=ROR_INDEX_FILE):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        tmp_file = f"{filename}.tmp{os.getpid()}"
+        with gzip.open(tmp_file, 'wt', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'source': self.source,
+                       'records': self.records, 'names': self.names}, f, separators=(',', ':'))
+        os.replace(tmp_file, filename)
+
+    def lookup(self, affiliation):
+        """Record dictionary of the organisation named in affiliation, or None"""
+        position = self.names.get(affiliation_key(affiliation))
+        if position is None or position == _AMBIGUOUS:
+            for key in affiliation_segments(affiliation):
+                position = self.names.get(key)
+                if position is not None and position != _AMBIGUOUS:
+                    break
+        if position is None or position == _AMBIGUOUS:
+            return None
+        record_id, name, country, country_code = self.records[position]
+        return {'id': record_id, 'name': name, 'country': country, 'country_code': country_code}
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {'file': os.path.basename(path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def build_ror_index(dump_file, index_file=ROR_INDEX_FILE):
+    """Build the offline index from a ROR data dump and save it; returns the RorIndex"""
+    index = RorIndex.from_dump(dump_file)
+    index.save(index_file)
+    return index
+
+
+def get_ror_index(dump_file=None, index_file=ROR_INDEX_FILE):
+    """
+    The offline index: the saved one, rebuilt first if dump_file is given
+    and the index was not built from it. None if there is neither.
+    """
+    index = RorIndex.load(index_file)
+    if dump_file is not None and (index is None or index.source != _file_signature(dump_file)):
+        print(f"Building ROR index from {dump_file}...")
+        index = build_ror_index(dump_file, index_file)
+        print(f"Indexed {len(index)} organisations ({len(index.names)} names)")
+    return index
+
+
+class RorResolver:
+    """
+    Affiliation -> ROR record resolver with an optional offline index, a
+    persistent answer cache and rate-limited API fallback.
+
+    Parameters:
+    - index: RorIndex to consult first, or None
+    - cache_file: JSON file with earlier API answers (None: no persistence)
+    - offline: Never query the API; unknown affiliations stay unresolved
+    - request_interval: Minimum seconds between API requests
+    """
+
+    def __init__(self, index=None, cache_file=ROR_CACHE_FILE, offline=False,
+                 request_interval=ROR_REQUEST_INTERVAL):
+        self.index = index
+        self.cache_file = cache_file
+        self.offline = offline
+        self.request_interval = request_interval
+        self.cache = self._load_cache()
+        self.stats = {'index': 0, 'cache': 0, 'api': 0, 'unresolved': 0, 'errors': 0}
+        self._memo = {}
+        self._pending = {}
+        self._unsaved = 0
+        self._next_request = 0.0
+        # _lock guards the memo, the cache and the cache file; it is never
+        # held over network I/O. _rate_lock only hands out request times.
+        self._lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+
+    def _load_cache(self):
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if data.get('version') != CACHE_VERSION:
+            return {}
+        return data.get('entries', {})
+
+    def save(self):
+        """Write the API answers to the cache file"""
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        if not self.cache_file or not self._unsaved:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        tmp_file = f"{self.cache_file}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self.cache}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+        self._unsaved = 0
+
+    def _wait_for_turn(self):
+        """Reserve the next request time under the rate lock and sleep until it outside of it"""
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + self.request_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _query_api(self, affiliation):
+        """
+        Best ROR match of affiliation, None if ROR has none; raises on
+        network or server errors so that they are not cached
+        """
+        self._wait_for_turn()
+        with _ror_slots:
+            response = get_ror_session().get(f"{ROR_API_URL}?{urlencode({'query': affiliation})}",
+                                             timeout=ROR_REQUEST_TIMEOUT)
+        response.raise_for_status()
+        items = response.json().get('items') or []
+        return compact_record(items[0]) if items else None
+
+    def resolve(self, affiliation):
+        """ROR record dictionary (id, name, country, country_code) for affiliation, or None"""
+        key = affiliation_key(affiliation)
+        if not key:
+            return None
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = threading.Event()
+        if pending is not None:
+            # Another thread is looking the same key up; use its answer
+            pending.wait()
+            with self._lock:
+                return self._memo.get(key)
+
+        record, source = None, None
+        try:
+            record, source = self._lookup(key, affiliation)
+        finally:
+            with self._lock:
+                if source is not None:
+                    self.stats[source] += 1
+                    self._memo[key] = record
+                self._pending.pop(key).set()
+        return record
+
+    def _lookup(self, key, affiliation):
+        """(record, source) from the index, the cache or the API; source is None after an API error"""
+        record = self.index.lookup(affiliation) if self.index is not None else None
+        if record is not None:
+            return record, 'index'
+        with self._lock:
+            if key in self.cache:
+                return self.cache[key], 'cache'
+        if self.offline:
+            return None, 'unresolved'
+        try:
+            record = self._query_api(affiliation)
+        except Exception as e:
+            # Neither cached nor memoised, so a later call retries
+            print(f"Error looking up {affiliation}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+            return None, None
+        with self._lock:
+            self.cache[key] = record
+            self._unsaved += 1
+            if self._unsaved >= CACHE_SAVE_EVERY:
+                self._save_locked()
+        return record, 'api'
+
+    def resolve_many(self, affiliations, max_workers=ROR_MAX_CONNECTIONS):
+        """
+        Resolve a batch of affiliations; each distinct key is looked up once.
+
+        Parameters:
+        - affiliations: Iterable of affiliation strings
+        - max_workers: Number of threads resolving at the same time
+
+        Returns:
+        - Dictionary affiliation -> record dictionary or None
+        """
+        distinct = list(dict.fromkeys(affiliations))
+        if self.offline or max_workers <= 1 or len(distinct) <= 1:
+            results = {affiliation: self.resolve(affiliation) for affiliation in distinct}
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = dict(zip(distinct, executor.map(self.resolve, distinct)))
+        self.save()
+        return results
+
+    def country(self, affiliation, default='Unknown'):
+        """Country name of affiliation according to ROR"""
+        record = self.resolve(affiliation)
+        return record['country'] if record else default
+
+    def countries(self, affiliations, default='Unknown'):
+        """Dictionary affiliation -> country name for a batch of affiliations"""
+        return {affiliation: record['country'] if record else default
+                for affiliation, record in self.resolve_many(affiliations).items()}
+
+
+_default_resolver = None
+
+
+def get_ror_resolver():
+    """The shared RorResolver, using the saved offline index if there is one"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = RorResolver(index=get_ror_index())
+    return _default_resolver
+
+
+def set_ror_resolver(resolver):
+    """Replace the shared RorResolver (e.g. one that is offline or uses another index)"""
+    global _default_resolver
+    _default_resolver = resolver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve affiliations to countries with ROR")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build-index', help="Build the offline index from a ROR data dump")
+    build.add_argument('dump', help="ROR data dump (.zip or .json)")
+    build.add_argument('--index', default=ROR_INDEX_FILE, help="Index file to write")
+
+    resolve = commands.add_parser('resolve', help="Look affiliations up")
+    resolve.add_argument('affiliations', nargs='+')
+    resolve.add_argument('--offline', action='store_true', help="Do not query the ROR API")
+    resolve.add_argument('--index', default=ROR_INDEX_FILE, help="Offline index to use")
+
+    args = parser.parse_args(argv)
+    if args.command == 'build-index':
+        start = time.time()
+        index = build_ror_index(args.dump, args.index)
+        print(f"Indexed {len(index)} organisations ({len(index.names)} names) in {time.time() - start:.1f}s: "
+              f"{args.index}")
+        return 0
+
+    resolver = RorResolver(index=RorIndex.load(args.index), offline=args.offline)
+    for affiliation, record in resolver.resolve_many(args.affiliations).items():
+        if record:
+            print(f"{affiliation}: {record['country']} ({record['name']}, {record['id']})")
+        else:
+            print(f"{affiliation}: Unknown")
+    print(f"Sources: {resolver.stats}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Table-driven classification of contributions into session types.
+
+SESSION_RULES holds per-year ordered lists of (category, conditions); the
+first rule whose conditions all hold decides. contribution_rules puts the
+contribution-level checks (Sunday, Early Career, 2011 types) in front of a
+year's session rules.
+
+A SessionClassifier matches all keywords of a table in one regex pass and
+memoises the category of each distinct (session, contribution type), so
+repeated sessions cost a dictionary lookup and at most a few title checks.
+"""
+
+import re
+from collections import namedtuple
+
+# Keywords marking non-talk sessions in every year
+OTHER_SESSION_KEYWORDS = ['flash', 'student day', 'teacher', 'award', 'medal',
+                          'opening', 'closing', 'welcome']
+
+# Parallel session names of the years with their own programme structure
+PARALLEL_SESSIONS = {
+    '2014': ['heavy flavor', 'jets', 'correlations and fluctuations',
+             'collective dynamics', 'qcd phase diagram', 'electromagnetic probes',
+             'initial state physics', 'new theoretical developments',
+             'thermodynamics and hadron chemistry', 'approach to equilibrium',
+             'discussion'],  # Include discussions in parallel sessions
+    '2015': ['jets and high pt', 'correlations and fluctuations',
+             'qgp in small systems', 'initial state physics',
+             'open heavy flavors', 'collective dynamics',
+             'quarkonia', 'electromagnetic probes',
+             'discussion'],
+    '2018': ['jet modifications', 'collective dynamics', 'collectivity in small systems',
+             'quarkonia', 'initial state physics', 'correlations and fluctuations',
+             'open heavy flavour', 'chirality', 'phase diagram', 'qcd at high temperature',
+             'electromagnetic and weak probes', 'new theoretical developments',
+             'thermodynamics and hadron chemistry', 'high baryon density',
+             'discussion'],
+    '2023': ['jets', 'heavy flavor', 'collective dynamics', 'new theory',
+             'small systems', 'initial state', 'qcd at finite t',
+             'light flavor', 'em probes', 'critical point', 'chirality',
+             'spin/eic physics', 'future experiments', 'astrophysics', 'upc',
+             'discussion'],
+}
+
+# Text fields conditions can test. Lowercase views are str(value or '').lower().
+# - session, title: lowercase session and title
+# - session_title: lowercase 'title' of a session given as a dictionary (2011 exports)
+# - session_nodash: lowercase session with '-' replaced by ' '
+# - session_raw, title_raw: str() of the value, case-sensitive
+# - type, type_lower: contribution type as given / lowercase
+TITLE_FIELDS = ('title', 'title_raw')
+
+Condition = namedtuple('Condition', ['field', 'op', 'values'])
+
+
+def contains(field, *keywords):
+    """Condition: one of the keywords is a substring of the field"""
+    return Condition(field, 'contains', frozenset(keywords))
+
+
+def equals(field, *values):
+    """Condition: the field is one of the values"""
+    return Condition(field, 'equals', frozenset(values))
+
+
+def _common_rules(session_field='session'):
+    """Rules checked first in every year"""
+    return [
+        ('poster', [contains(session_field, 'poster')]),
+        ('poster', [contains('title', 'poster')]),
+        ('other', [contains(session_field, *OTHER_SESSION_KEYWORDS)]),
+        ('other', [contains('title', *OTHER_SESSION_KEYWORDS)]),
+        # Only exclude discussions from plenary, but keep them for parallel
+        ('other', [contains('title', 'discussion'), contains(session_field, 'plenary')]),
+    ]
+
+
+def _default_year_rules(session_field='session'):
+    """General patterns for years without their own session names"""
+    return [
+        ('plenary', [contains(session_field, 'plenary')]),
+        ('parallel', [contains(session_field, 'parallel', 'discussion')]),
+    ]
+
+
+def _session_rules(year):
+    if year == '2011':
+        # Sessions may be given as dictionaries; their title is classified
+        return [
+            ('plenary', [contains('session_title', 'plenary')]),
+            ('parallel', [contains('session_title', 'parallel', 'track')]),
+            ('poster', [contains('session_title', 'poster')]),
+        ] + _common_rules('session_title') + _default_year_rules('session_title')
+
+    rules = _common_rules()
+    if year in ('2023', '2015'):
+        rules.append(('plenary', [contains('session', 'plenary session')]))
+    elif year in PARALLEL_SESSIONS:
+        rules.append(('plenary', [contains('session', 'plenary')]))
+    else:
+        return rules + _default_year_rules()
+
+    session_field = 'session_nodash' if year == '2015' else 'session'
+    rules.append(('parallel', [contains(session_field, *PARALLEL_SESSIONS[year])]))
+    return rules
+
+
+# Years with their own session rules; all other years use DEFAULT_SESSION_RULES
+SESSION_RULES = {year: _session_rules(year) for year in ['2011', '2014', '2015', '2018', '2023']}
+DEFAULT_SESSION_RULES = _session_rules(None)
+
+
+def contribution_rules(year):
+    """Rules for whole contributions of a year: Sunday, Early Career and 2011 type checks, then SESSION_RULES"""
+    # Sunday sessions are never counted, whatever else matches
+    rules = [
+        ('other', [contains('title_raw', 'sunday', 'Sunday')]),
+        ('other', [contains('session_raw', 'sunday', 'Sunday')]),
+    ]
+    if year == '2011':
+        # 2011 contributions carry their session type; the session given is the track
+        return rules + [
+            ('other', [equals('session_raw', 'Famous plot session')]),
+            ('poster', [equals('type', 'Poster')]),
+            ('plenary', [equals('type', 'Plenary')]),
+            ('parallel', [equals('type', 'Parallel')]),
+            ('flash', [equals('type', 'Flash')]),
+            ('unknown_plenary', [contains('session', 'plenary')]),
+        ]
+    if year == '2025':
+        rules += [
+            ('poster', [contains('session', 'poster')]),
+            ('poster', [contains('type_lower', 'poster')]),
+            ('other', [contains('session_raw', 'Early Career Researcher Day')]),
+        ]
+    return rules + SESSION_RULES.get(year, DEFAULT_SESSION_RULES)
+
+
+class KeywordFinder:
+    """
+    Finds which of a set of keywords occur in a text, as substrings, with
+    one regex pass.
+
+    The regex is a lookahead over the keywords, longest first, so it stops
+    at every position where a keyword starts. Keywords that start at the
+    same position as a longer match are prefixes of it and are added from
+    a precomputed table.
+    """
+
+    def __init__(self, keywords):
+        keywords = sorted({keyword for keyword in keywords if keyword}, key=lambda k: (-len(k), k))
+        self._pattern = None
+        if keywords:
+            self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))', re.DOTALL)
+        self._implied = {keyword: frozenset(other for other in keywords if keyword.startswith(other))
+                         for keyword in keywords}
+
+    def find(self, text):
+        """Set of the keywords contained in text"""
+        if self._pattern is None:
+            return frozenset()
+        found = set()
+        for match in self._pattern.finditer(text):
+            found |= self._implied[match.group(1)]
+        return found
+
+
+def _session_view(field, session, contrib_type):
+    """Text of a session or type field of one contribution"""
+    if field == 'session':
+        return str(session or '').lower()
+    if field == 'session_title':
+        if isinstance(session, dict):
+            return str(session.get('title', '')).lower()
+        return str(session or '').lower()
+    if field == 'session_nodash':
+        return str(session or '').lower().replace('-', ' ')
+    if field == 'session_raw':
+        return str(session)
+    if field == 'type':
+        return str(contrib_type)
+    if field == 'type_lower':
+        return str(contrib_type).lower()
+    raise KeyError(f"Unknown session rule field: {field}")
+
+
+def _title_test(condition):
+    """(case-sensitive, keyword, regex search) testing a title condition on the title text"""
+    raw = condition.field == 'title_raw'
+    if len(condition.values) == 1:
+        return raw, next(iter(condition.values)), None
+    keywords = sorted(condition.values, key=lambda k: (-len(k), k))
+    return raw, None, re.compile('|'.join(map(re.escape, keywords))).search
+
+
+class SessionClassifier:
+    """
+    Compiled rule table.
+
+    Everything that depends on the session and the contribution type is
+    evaluated once per distinct (session, type) and memoised as a plan: the
+    category if no title condition can change it, else the title tests of
+    the remaining rules in priority order. A contribution then only runs
+    the title tests of its session's plan.
+
+    Parameters:
+    - rules: Ordered list of (category, conditions); the first rule whose
+      conditions all hold gives the category
+    - default: Category when no rule applies
+    """
+
+    def __init__(self, rules, default='unknown'):
+        self.rules = [(category, tuple(conditions)) for category, conditions in rules]
+        self.default = default
+
+        # One keyword finder per session/type field over all keywords of that field
+        keywords = {}
+        for _, conditions in self.rules:
+            for condition in conditions:
+                if condition.op == 'contains' and condition.field not in TITLE_FIELDS:
+                    keywords.setdefault(condition.field, set()).update(condition.values)
+        self._finders = {field: KeywordFinder(words) for field, words in keywords.items()}
+        self._title_tests = {condition: _title_test(condition) for _, conditions in self.rules
+                             for condition in conditions if condition.field in TITLE_FIELDS}
+        self._uses_type = any(condition.field in ('type', 'type_lower')
+                              for _, conditions in self.rules for condition in conditions)
+        self._plans = {}
+
+    def _plan(self, session, contrib_type):
+        """(title steps, category when no step applies) for one session and type"""
+        found = {}
+        steps = []
+        for category, conditions in self.rules:
+            title_tests = []
+            for condition in conditions:
+                if condition.field in TITLE_FIELDS:
+                    title_tests.append(self._title_tests[condition])
+                    continue
+                text = _session_view(condition.field, session, contrib_type)
+                if condition.op == 'equals':
+                    holds = text in condition.values
+                else:
+                    if condition.field not in found:
+                        found[condition.field] = self._finders[condition.field].find(text)
+                    holds = not found[condition.field].isdisjoint(condition.values)
+                if not holds:
+                    break
+            else:
+                if not title_tests:
+                    return tuple(steps), category
+                steps.append((tuple(title_tests), category))
+        return tuple(steps), self.default
+
+    def classify(self, session, title, contrib_type=''):
+        """Category of a contribution with the given session, title and type"""
+        session_key = session if isinstance(session, str) else (type(session).__name__, repr(session))
+        key = (session_key, str(contrib_type)) if self._uses_type else session_key
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._plan(session, contrib_type)
+
+        steps, category = plan
+        if not steps:
+            return category
+
+        title_lower = title_raw = None
+        for tests, step_category in steps:
+            for raw, keyword, search in tests:
+                if raw:
+                    if title_raw is None:
+                        title_raw = str(title)
+                    text = title_raw
+                else:
+                    if title_lower is None:
+                        title_lower = str(title or '').lower()
+                    text = title_lower
+                if not (keyword in text if search is None else search(text)):
+                    break
+            else:
+                return step_category
+        return category
+
+
+_session_classifiers = {}
+_contribution_classifiers = {}
+
+
+def get_session_classifier(year):
+    """The compiled SESSION_RULES of a year (categorize_session)"""
+    classifier = _session_classifiers.get(year)
+    if classifier is None:
+        classifier = _session_classifiers[year] = SessionClassifier(SESSION_RULES.get(year, DEFAULT_SESSION_RULES))
+    return classifier
+
+
+def get_contribution_classifier(year):
+    """The compiled contribution_rules of a year"""
+    classifier = _contribution_classifiers.get(year)
+    if classifier is None:
+        default = 'unknown_parallel' if year == '2011' else 'unknown'
+        classifier = _contribution_classifiers[year] = SessionClassifier(contribution_rules(year), default)
+    return classifier
@@ -0,0 +1,162 @@
+"""
+Compact record type for processed talks.
+
+TalkRecord stores the talk fields in __slots__ and interns the strings that
+repeat across talks (session, type, institute, country). The speaker
+payload is kept as a tuple of values with a key layout shared by all
+payloads of the same shape, and turned back into a dictionary when
+Raw_Speaker_Data is read.
+
+A TalkRecord is a MutableMapping with the keys of a talk dictionary, in the
+same order, so talk['...'], talk.get(), `in`, update() and
+pd.DataFrame(talks) work on it; json.dump needs default=talk_record_to_json.
+benchmarks/talk_memory.py compares its memory use with plain dictionaries.
+"""
+
+import sys
+from collections.abc import MutableMapping
+
+TALK_FIELDS = ('Session', 'Type', 'Title', 'Speaker', 'Institute', 'Country', 'Abstract', 'Raw_Speaker_Data')
+
+# Fields whose values repeat across talks and are interned
+INTERNED_FIELDS = frozenset(['Session', 'Type', 'Institute', 'Country'])
+
+# Speaker payload keys whose values repeat across talks and are interned
+INTERNED_PAYLOAD_KEYS = frozenset(['_type', '_fossil', 'affiliation', 'first_name', 'last_name', 'title'])
+
+_SLOTS = {'Session': '_session', 'Type': '_type', 'Title': '_title', 'Speaker': '_speaker',
+          'Institute': '_institute', 'Country': '_country', 'Abstract': '_abstract'}
+
+# Key tuple of a speaker payload -> the shared layout (tuple of interned keys)
+_payload_layouts = {}
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def compact_payload(payload):
+    """(layout, values) form of a speaker payload dictionary; other values are kept as they are"""
+    if type(payload) is not dict:
+        return payload
+    keys = tuple(payload)
+    layout = _payload_layouts.get(keys)
+    if layout is None:
+        layout = _payload_layouts[keys] = tuple(sys.intern(key) if type(key) is str else key for key in keys)
+    return _CompactPayload(layout, tuple(_intern(value) if key in INTERNED_PAYLOAD_KEYS else value
+                                         for key, value in payload.items()))
+
+
+class _CompactPayload(tuple):
+    """Speaker payload as (layout, values)"""
+    __slots__ = ()
+
+    def __new__(cls, layout, values):
+        return tuple.__new__(cls, (layout, values))
+
+    def to_dict(self):
+        return dict(zip(self[0], self[1]))
+
+
+class TalkRecord(MutableMapping):
+    """
+    One processed talk.
+
+    Parameters:
+    - Session, Type, Title, Speaker, Institute, Country, Abstract: Talk fields
+    - Raw_Speaker_Data: Speaker payload from the export (dictionary or None)
+
+    Keys other than TALK_FIELDS can be set as well; they are kept in a
+    dictionary of their own.
+    """
+
+    __slots__ = ('_session', '_type', '_title', '_speaker', '_institute', '_country', '_abstract',
+                 '_payload', '_extra')
+
+    def __init__(self, Session='', Type='', Title='', Speaker='', Institute='', Country='', Abstract='',
+                 Raw_Speaker_Data=None):
+        self._session = _intern(Session)
+        self._type = _intern(Type)
+        self._title = Title
+        self._speaker = Speaker
+        self._institute = _intern(Institute)
+        self._country = _intern(Country)
+        self._abstract = Abstract
+        self._payload = compact_payload(Raw_Speaker_Data)
+        self._extra = None
+
+    def __getitem__(self, key):
+        slot = _SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if key == 'Raw_Speaker_Data':
+            payload = self._payload
+            return payload.to_dict() if type(payload) is _CompactPayload else payload
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        slot = _SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        slot = _SLOTS.get(key)
+        if slot is not None:
+            setattr(self, slot, _intern(value) if key in INTERNED_FIELDS else value)
+        elif key == 'Raw_Speaker_Data':
+            self._payload = compact_payload(value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in TALK_FIELDS:
+            raise KeyError(f"{key} cannot be removed from a TalkRecord")
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key):
+        return key in _SLOTS or key == 'Raw_Speaker_Data' or (self._extra is not None and key in self._extra)
+
+    def __iter__(self):
+        yield from TALK_FIELDS
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self):
+        return len(TALK_FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self):
+        return f"TalkRecord({dict(self)!r})"
+
+    def __reduce__(self):
+        return _talk_record_from_dict, (dict(self),)
+
+    def copy(self):
+        return _talk_record_from_dict(dict(self))
+
+    def to_dict(self):
+        return dict(self)
+
+
+def _talk_record_from_dict(fields):
+    record = TalkRecord(**{key: fields[key] for key in TALK_FIELDS if key in fields})
+    for key, value in fields.items():
+        if key not in TALK_FIELDS:
+            record[key] = value
+    return record
+
+
+def talk_record_to_json(value):
+    """json.dump default= hook writing TalkRecords as dictionaries"""
+    if isinstance(value, TalkRecord):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,111 @@
+"""
+TalkTable: the talks of conference_data as one pandas DataFrame with
+categorical Year, Talk_Type, Country and Institute columns, grouped by year
+and talk type.
+"""
+
+from institute_names import canonical_institute_name
+from lazy_imports import lazy_module
+
+np = lazy_module('numpy')
+pd = lazy_module('pandas')
+
+# Talk types kept for the analyses (see filter_relevant_talk_types)
+TALK_TYPES = ['plenary_talks', 'parallel_talks', 'poster_talks']
+
+# Talk fields that may hold the institute, in order of preference
+INSTITUTE_FIELDS = ['Institute', 'Affiliation', 'institution', 'affiliation']
+
+
+def _talk_country(talk):
+    country = talk.get('Country', 'Unknown')
+    # Empty CSV cells come back as NaN
+    if not isinstance(country, str):
+        return 'Unknown'
+    return country
+
+
+def _talk_institute(talk):
+    for field in INSTITUTE_FIELDS:
+        value = talk.get(field)
+        if value and value != 'Unknown' and isinstance(value, str):
+            return value
+    return None
+
+
+def _categorical(values):
+    """Categorical with categories in order of first appearance"""
+    return pd.Categorical(values, categories=pd.unique(pd.Series(values, dtype=object).dropna()))
+
+
+class TalkTable:
+    """
+    One row per talk of the given talk types.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk type -> list of talks
+    - talk_types: Talk types to include
+    """
+
+    def __init__(self, conference_data, talk_types=TALK_TYPES):
+        # Rows follow the order of conference_data, like the loops they replace
+        self.years = list(conference_data.keys())
+        self.talk_types = list(talk_types)
+        self._slices = {}
+
+        years, types, countries, institutes = [], [], [], []
+        for year in self.years:
+            for talk_type in self.talk_types:
+                talks = conference_data[year].get(talk_type) or []
+                start = len(years)
+                for talk in talks:
+                    years.append(year)
+                    types.append(talk_type)
+                    countries.append(_talk_country(talk))
+                    institutes.append(_talk_institute(talk))
+                self._slices[(year, talk_type)] = slice(start, len(years))
+
+        # Normalise each distinct raw institute string once; code -1 (no
+        # institute) picks the trailing None
+        raw_institutes = _categorical(institutes)
+        labels = np.array([canonical_institute_name(name) for name in raw_institutes.categories] + [None],
+                          dtype=object)
+
+        self.frame = pd.DataFrame({
+            'Year': pd.Categorical(years, categories=self.years),
+            'Talk_Type': pd.Categorical(types, categories=self.talk_types),
+            'Country': _categorical(countries),
+            'Institute': _categorical(labels[raw_institutes.codes]),
+        })
+
+    def __len__(self):
+        return len(self.frame)
+
+    def view(self, year=None, talk_type=None):
+        """
+        Rows of one year and/or talk type.
+
+        A single (year, talk_type) block, or a year across all talk types, is
+        contiguous and returned as a slice; other selections use a mask.
+        """
+        if year is not None and talk_type is not None:
+            return self.frame.iloc[self._slices.get((year, talk_type), slice(0, 0))]
+        if year is not None:
+            blocks = [self._slices[(year, t)] for t in self.talk_types if (year, t) in self._slices]
+            if not blocks:
+                return self.frame.iloc[0:0]
+            return self.frame.iloc[blocks[0].start:blocks[-1].stop]
+        if talk_type is not None:
+            return self.frame[self.frame['Talk_Type'] == talk_type]
+        return self.frame
+
+
+def count_talks(conference_data, talk_types=TALK_TYPES):
+    """Number of talks of the given types over all years"""
+    return sum(len(data.get(talk_type) or []) for data in conference_data.values() if isinstance(data, dict)
+               for talk_type in talk_types)
+
+
+def talks_to_table(talks):
+    """Build a TalkTable from a plain list of talks"""
+    return TalkTable({'all': {'all_talks': talks}}, talk_types=['all_talks'])
@@ -0,0 +1,147 @@
+"""
+Per-talk tokenisation cache for the keyword analyses.
+
+get_talk_tokens returns the TalkTokens entry of a talk, kept in a side table
+keyed by the talk's id. An entry computes each tokenisation (title words,
+title keywords and bigrams, the abstract's "Keywords:" section, index
+tokens) on first use and keeps it until the talk's Title or Abstract
+changes.
+"""
+
+import re
+
+# Words never counted as keywords (same list as fetch_and_analyze_conferences.py)
+KEYWORD_STOPWORDS = frozenset([
+    'and', 'the', 'in', 'of', 'for', 'on', 'with', 'at', 'from', 'by',
+    'to', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'but', 'or', 'as', 'if',
+    'then', 'else', 'when', 'up', 'down', 'conference', 'study', 'analysis',
+    'measurement', 'results', 'data', 'using', 'via', 'new', 'recent',
+    'quark', 'matter', 'qm', 'physics', 'collision', 'collisions', 'ion', 'ions',
+    'heavy', 'experiment', 'experimental', 'theory', 'theoretical', 'model', 'models'
+])
+
+# Maximum number of talks kept in the cache
+TOKEN_CACHE_SIZE = 65536
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_KEYWORD_SECTION = re.compile(r'keywords?:?\s*(.*?)(?:\.|$)')
+_KEYWORD_SEPARATORS = re.compile(r'[,;]')
+
+# Index tokens: lowercase letters and digits, plural 's' removed from
+# tokens of four or more characters unless they end in 'ss'
+_TOKEN = re.compile(r'[a-z0-9]+')
+_PLURAL = re.compile(r'(?<=[a-z0-9]{3})(?<!s)s(?![a-z0-9])')
+
+
+def is_valid_keyword(word):
+    """True unless word is a stop word, shorter than three characters or a number"""
+    return (word.lower() not in KEYWORD_STOPWORDS
+            and len(word) > 2  # Skip very short words
+            and not word.isdigit())  # Skip pure numbers
+
+
+def tokenize(text):
+    """Normalised index tokens of text; non-string values (NaN, None) have none"""
+    if not isinstance(text, str):
+        return []
+    return _TOKEN.findall(_PLURAL.sub('', text.lower()))
+
+
+class TalkTokens:
+    """
+    Tokenisations of one talk's title and abstract, computed on first use.
+
+    Parameters:
+    - title: The talk's Title value
+    - abstract: The talk's Abstract value
+    """
+
+    __slots__ = ('title', 'abstract', '_title_words', '_title_keywords', '_abstract_keywords',
+                 '_index_tokens')
+
+    def __init__(self, title, abstract):
+        self.title = title
+        self.abstract = abstract
+        self._title_words = None
+        self._title_keywords = None
+        self._abstract_keywords = None
+        self._index_tokens = {}
+
+    def matches(self, title, abstract):
+        """True if the entry was computed from this title and abstract"""
+        # 'is' first: NaN never equals itself
+        return ((self.title is title or self.title == title)
+                and (self.abstract is abstract or self.abstract == abstract))
+
+    @property
+    def title_words(self):
+        """Lowercase words of the title, punctuation removed"""
+        if self._title_words is None:
+            title = self.title if isinstance(self.title, str) else ''
+            self._title_words = _PUNCTUATION.sub(' ', title.lower()).split()
+        return self._title_words
+
+    @property
+    def title_keywords(self):
+        """Keywords of the title: valid single words followed by bigrams with a valid word"""
+        if self._title_keywords is None:
+            tokens = self.title_words
+            keywords = [word for word in tokens if is_valid_keyword(word)]
+
+            bigrams = []
+            for first, second in zip(tokens, tokens[1:]):
+                # At least one part should not be a stopword, and be a valid keyword
+                if not (first in KEYWORD_STOPWORDS and second in KEYWORD_STOPWORDS):
+                    if is_valid_keyword(first) or is_valid_keyword(second):
+                        bigrams.append(f"{first} {second}")
+
+            self._title_keywords = keywords + bigrams
+        return self._title_keywords
+
+    @property
+    def abstract_keywords(self):
+        """Keywords listed in a "Keywords:" section of the abstract (empty if there is none)"""
+        if self._abstract_keywords is None:
+            keywords = []
+            if isinstance(self.abstract, str):
+                keyword_section = _KEYWORD_SECTION.search(self.abstract.lower())
+                if keyword_section:
+                    keywords = [k.strip() for k in _KEYWORD_SEPARATORS.split(keyword_section.group(1))]
+                    keywords = [k for k in keywords if k and is_valid_keyword(k)]
+            self._abstract_keywords = keywords
+        return self._abstract_keywords
+
+    def index_tokens(self, field):
+        """Normalised index tokens (see tokenize) of 'Title' or 'Abstract'"""
+        tokens = self._index_tokens.get(field)
+        if tokens is None:
+            tokens = tokenize(self.title if field == 'Title' else self.abstract)
+            self._index_tokens[field] = tokens
+        return tokens
+
+
+_token_cache = {}
+
+
+def get_talk_tokens(talk):
+    """Return the (cached) TalkTokens of a talk dictionary"""
+    title = talk.get('Title')
+    abstract = talk.get('Abstract')
+    key = id(talk)
+
+    entry = _token_cache.get(key)
+    if entry is None or not entry.matches(title, abstract):
+        entry = TalkTokens(title, abstract)
+        if key not in _token_cache and len(_token_cache) >= TOKEN_CACHE_SIZE:
+            # Drop the oldest entry
+            del _token_cache[next(iter(_token_cache))]
+        _token_cache[key] = entry
+    return entry
+
+
+def field_tokens(talk, field):
+    """Index tokens of one field of a talk; Title and Abstract come from the cache"""
+    if field in ('Title', 'Abstract'):
+        return get_talk_tokens(talk).index_tokens(field)
+    return tokenize(talk.get(field))
@@ -0,0 +1,11 @@
+"""Columns the analysis loads for a selection of paper figures."""
+
+from analyze_conference_data import analysis_columns
+
+
+def test_abstract_only_for_topic_figures():
+    assert 'Abstract' in analysis_columns()
+    assert 'Abstract' in analysis_columns(['theory/experiment balance'])
+    assert 'Abstract' not in analysis_columns(['keywords'])
+    assert 'Abstract' not in analysis_columns(['institutes', 'regional diversity'])
+    assert 'Title' in analysis_columns(['keywords'])
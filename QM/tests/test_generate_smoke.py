@@ -0,0 +1,58 @@
+"""generate_conference_data.py end to end on one small event served by the replay stand-in."""
+
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+QM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(QM_DIR, 'benchmarks'))
+from synthetic_conference import generate_event  # noqa: E402
+
+pytest.importorskip('requests')
+pytest.importorskip('pandas')
+
+from indico_cache import EXPORT_PATH  # noqa: E402
+from indico_replay import IndicoStandIn, save_recording  # noqa: E402
+
+YEAR = '2019'
+INDICO_ID = '424242'
+TALKS = 30
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    """Working directory with the script's input files and one recorded event"""
+    shutil.copy(os.path.join(QM_DIR, 'institute_country_database.csv'), tmp_path)
+    (tmp_path / 'listofQMindigo').write_text(f"# Year IndicoID\n{YEAR} {INDICO_ID}\n")
+    (tmp_path / 'data').mkdir()
+
+    body = json.dumps(generate_event(TALKS, year=YEAR, seed=1)).encode('utf-8')
+    save_recording(EXPORT_PATH.format(indico_id=INDICO_ID), 200, {'Content-Type': 'application/json'}, [body],
+                   str(tmp_path / 'recordings'))
+    return tmp_path
+
+
+def test_main_path(workdir):
+    server = IndicoStandIn(str(workdir / 'recordings'), port=0).start()
+    try:
+        env = dict(os.environ, INDICO_URL=server.url, MPLBACKEND='Agg')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [QM_DIR, env.get('PYTHONPATH')]))
+        result = subprocess.run([sys.executable, os.path.join(QM_DIR, 'generate_conference_data.py')],
+                                cwd=workdir, env=env, capture_output=True, text=True, timeout=300)
+    finally:
+        server.stop()
+
+    assert result.returncode == 0, result.stdout[-3000:] + result.stderr[-3000:]
+    assert 'Error:' not in result.stdout
+
+    with open(workdir / 'data' / 'processed' / YEAR / 'all_talks.csv', encoding='utf-8') as f:
+        talks = list(csv.DictReader(f))
+    assert 0 < len(talks) <= TALKS
+    assert (workdir / 'data' / 'processed' / 'persons.csv').exists()
+    with open(workdir / 'data' / 'processed_conference_data.json', encoding='utf-8') as f:
+        assert YEAR in json.load(f)
@@ -0,0 +1,51 @@
+"""Indico export cache: validators and run cache are kept per server."""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip('requests')
+
+import indico_cache  # noqa: E402
+from indico_cache import EXPORT_PATH, clear_run_cache, fetch_event_export, get_indico_url, set_indico_url  # noqa: E402
+from indico_replay import IndicoStandIn, save_recording  # noqa: E402
+
+INDICO_ID = '4242'
+
+
+def _stand_in(tmp_path, name, content):
+    recording_dir = str(tmp_path / name)
+    body = json.dumps({'server': name, 'results': [{'contributions': []}]}).encode('utf-8')
+    save_recording(EXPORT_PATH.format(indico_id=INDICO_ID), 200, {'ETag': f'"{content}"'}, [body], recording_dir)
+    return IndicoStandIn(recording_dir, port=0).start()
+
+
+def test_servers_do_not_share_validators(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first, second = _stand_in(tmp_path, 'first', 'a'), _stand_in(tmp_path, 'second', 'b')
+    previous = get_indico_url()
+    try:
+        results = {}
+        for server in (first, second):
+            set_indico_url(server.url)
+            path, status = fetch_event_export(INDICO_ID, cache_dir=cache_dir)
+            with open(path, encoding='utf-8') as f:
+                results[server.url] = (status, json.load(f)['server'])
+        assert results[first.url] == ('fetched', 'first')
+        assert results[second.url] == ('fetched', 'second')
+
+        # A later run revalidates each server with its own ETag
+        clear_run_cache()
+        for server in (first, second):
+            set_indico_url(server.url)
+            assert fetch_event_export(INDICO_ID, cache_dir=cache_dir)[1] == 'not-modified'
+            assert server.stats['not_modified'] == 1
+        entries = [indico_cache._read_index(INDICO_ID, server.url, cache_dir) for server in (first, second)]
+        assert [entry['etag'] for entry in entries] == ['"a"', '"b"']
+        assert len(os.listdir(os.path.join(cache_dir, 'events'))) == 2
+    finally:
+        set_indico_url(previous)
+        clear_run_cache()
+        first.stop()
+        second.stop()
@@ -0,0 +1,83 @@
+"""Incremental export reader: results must not depend on where chunks end."""
+
+import io
+import json
+import os
+import sys
+
+import pytest
+
+from indico_stream import iter_event_contributions, iter_json_array, read_export_header
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_conference import generate_event  # noqa: E402
+
+EXPORT = {
+    'count': 1,
+    'ts': 1712345678.125,
+    'results': [{
+        'id': '1334113',
+        'title': 'Quark Matter 2025',
+        'startDate': {'date': '2025-04-06', 'tz': 'Europe/Paris'},
+        'rating': -12.5e-3,
+        'contributions': [
+            {'id': 101, 'title': 'Jets', 'duration': 20, 'weight': 1.5, 'score': -0.25,
+             'big': 12345678901234567890, 'exp': 6.02e23, 'speakers': [], 'board': None, 'flag': True},
+            {'id': 102, 'title': 'Flow', 'duration': 25.75, 'position': [0.5, -1.0, 3e-7, 10]},
+            {'id': 103, 'title': 'Last', 'duration': 7},
+        ],
+    }],
+    'total': 3,
+}
+
+
+class ChunkedReader(io.StringIO):
+    """Text file whose read() returns at most chunk characters, like a network body"""
+
+    def __init__(self, text, chunk):
+        super().__init__(text)
+        self.chunk = chunk
+
+    def read(self, size=-1):
+        return super().read(self.chunk if size is None or size < 0 else min(size, self.chunk))
+
+
+def _contributions(export):
+    return export['results'][0]['contributions']
+
+
+def _header(export):
+    header = json.loads(json.dumps(export))
+    del header['results'][0]['contributions']
+    return header
+
+
+@pytest.mark.parametrize('separators', [(',', ':'), (', ', ': ')])
+def test_every_chunk_size(separators):
+    text = json.dumps(EXPORT, separators=separators)
+    for chunk in range(1, len(text) + 1):
+        header = {}
+        contributions = list(iter_event_contributions(ChunkedReader(text, chunk), header))
+        assert contributions == _contributions(EXPORT), f"chunk size {chunk}"
+        assert header == _header(EXPORT), f"chunk size {chunk}"
+
+
+def test_synthetic_export_chunk_sizes():
+    export = generate_event(20, seed=3)
+    text = json.dumps(export)
+    expected = _contributions(export)
+    for chunk in list(range(1, 200)) + [997, 4096, len(text)]:
+        assert list(iter_event_contributions(ChunkedReader(text, chunk))) == expected, f"chunk size {chunk}"
+
+
+def test_read_export_header_chunk_sizes():
+    text = json.dumps(EXPORT)
+    for chunk in range(1, len(text) + 1):
+        assert read_export_header(ChunkedReader(text, chunk)) == _header(EXPORT), f"chunk size {chunk}"
+
+
+def test_json_array_of_numbers():
+    values = [1, -2.5, 3e10, 0, 12.75, -0.001, 7]
+    text = json.dumps(values)
+    for chunk in range(1, len(text) + 1):
+        assert list(iter_json_array(ChunkedReader(text, chunk))) == values, f"chunk size {chunk}"
@@ -0,0 +1,48 @@
+"""Person table: one row per person, affiliation kept with the talk."""
+
+from person_table import PERSON_KEY_COLUMN, SPEAKER_AFFILIATION_COLUMN, PersonTable, split_speaker_payloads
+
+
+def _payload(person_id, affiliation, email='e1', talk_id=1, **extra):
+    payload = {'_type': 'ContributionPersonLink', 'id': talk_id, 'db_id': talk_id, 'person_id': person_id,
+               'emailHash': email, 'fullName': 'Doe, Jane', 'first_name': 'Jane', 'last_name': 'Doe',
+               'affiliation': affiliation}
+    payload.update(extra)
+    return payload
+
+
+def test_rows_keyed_on_person_id():
+    persons = PersonTable()
+    first = persons.add(_payload(7, 'CERN', talk_id=1))
+    assert persons.add(_payload(7, 'GSI', talk_id=2)) == first
+    assert persons.add(_payload(8, 'CERN', talk_id=3)) != first
+    assert len(persons) == 2
+
+
+def test_email_hash_fallback():
+    persons = PersonTable()
+    first = persons.add(_payload(None, 'CERN', email='e9'))
+    assert persons.add(_payload(None, 'BNL', email='e9', talk_id=2)) == first
+    assert len(persons) == 1
+
+
+def test_talk_keeps_affiliation(tmp_path):
+    talk_a = {'Title': 'A', 'Raw_Speaker_Data': _payload(7, 'CERN', talk_id=1)}
+    talk_b = {'Title': 'B', 'Raw_Speaker_Data': _payload(7, 'GSI', talk_id=2)}
+    talk_c = {'Title': 'C', 'Raw_Speaker_Data': None}
+    data = {'2019': {'plenary_talks': [talk_a, talk_b], 'all_talks': [talk_a, talk_b, talk_c]}}
+    persons, tables = split_speaker_payloads(data)
+
+    rows = tables['2019']['all_talks']
+    assert rows[0] is tables['2019']['plenary_talks'][0]
+    assert list(rows[0]) == ['Title', PERSON_KEY_COLUMN, SPEAKER_AFFILIATION_COLUMN]
+    assert rows[0][PERSON_KEY_COLUMN] == rows[1][PERSON_KEY_COLUMN]
+    assert [row[SPEAKER_AFFILIATION_COLUMN] for row in rows] == ['CERN', 'GSI', None]
+    assert rows[2][PERSON_KEY_COLUMN] is None
+
+    persons.save(str(tmp_path / 'persons.csv'))
+    loaded = PersonTable.load(str(tmp_path / 'persons.csv'))
+    assert len(loaded) == 1
+    payload = loaded.payload(rows[1][PERSON_KEY_COLUMN], rows[1][SPEAKER_AFFILIATION_COLUMN])
+    assert payload['affiliation'] == 'GSI' and payload['person_id'] == '7'
+    assert loaded.add(_payload(7, 'BNL', talk_id=4)) == 0
@@ -0,0 +1,20 @@
+"""Processing code version: every local module of the ingest path is hashed."""
+
+from processing_manifest import CODE_ENTRY, code_files
+
+
+def test_ingest_modules_are_code_files():
+    files = code_files()
+    assert CODE_ENTRY in files
+    for name in ['talk_record.py', 'person_table.py', 'participant_index.py', 'indico_cache.py',
+                 'affiliation_matcher.py', 'session_rules.py', 'indico_stream.py']:
+        assert name in files
+
+
+def test_imports_are_followed(tmp_path):
+    (tmp_path / 'main.py').write_text("import os\nfrom helper import f\n\ndef g():\n    import lazy\n")
+    (tmp_path / 'helper.py').write_text("from nested.deep import x\nnp = lazy_module('numpy')\n")
+    (tmp_path / 'lazy.py').write_text("")
+    (tmp_path / 'nested.py').write_text("")
+    (tmp_path / 'unused.py').write_text("")
+    assert code_files('main.py', str(tmp_path)) == ['helper.py', 'lazy.py', 'main.py', 'nested.py']
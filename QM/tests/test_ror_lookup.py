@@ -0,0 +1,79 @@
+"""RorResolver lookups against a slow local stand-in for the ROR API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip('requests')
+
+import ror_lookup  # noqa: E402
+from ror_lookup import RorResolver, affiliation_key  # noqa: E402
+
+LATENCY = 0.3
+
+
+class _SlowRor(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)['query'][0]
+        self.requests_seen.append(query)
+        time.sleep(LATENCY)
+        body = json.dumps({'items': [{
+            'id': f"https://ror.org/{len(query)}", 'names': [{'value': query, 'types': ['ror_display']}],
+            'locations': [{'geonames_details': {'country_name': 'Finland', 'country_code': 'FI'}}],
+        }]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ror_server(monkeypatch):
+    _SlowRor.requests_seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowRor)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(ror_lookup, 'ROR_API_URL', f"http://127.0.0.1:{server.server_address[1]}/organizations")
+    yield _SlowRor
+    server.shutdown()
+    server.server_close()
+
+
+def test_cache_hits_do_not_wait_for_api(ror_server, tmp_path):
+    resolver = RorResolver(cache_file=str(tmp_path / 'ror.json'), request_interval=0)
+    resolver.cache[affiliation_key('Known Institute')] = {'id': 'x', 'name': 'Known Institute',
+                                                          'country': 'Finland', 'country_code': 'FI'}
+    lookup = threading.Thread(target=resolver.resolve, args=('Unknown Institute',))
+    lookup.start()
+    time.sleep(LATENCY / 3)
+
+    start = time.monotonic()
+    assert resolver.country('Known Institute') == 'Finland'
+    assert time.monotonic() - start < LATENCY / 3
+    lookup.join()
+    assert resolver.stats['api'] == 1
+
+
+def test_resolve_many_overlaps_requests(ror_server, tmp_path):
+    resolver = RorResolver(cache_file=str(tmp_path / 'ror.json'), request_interval=0)
+    affiliations = ['Institute A', 'Institute B', 'Institute A', 'Institute C', 'Institute D']
+
+    start = time.monotonic()
+    countries = resolver.countries(affiliations)
+    elapsed = time.monotonic() - start
+
+    assert set(countries.values()) == {'Finland'}
+    assert sorted(ror_server.requests_seen) == ['Institute A', 'Institute B', 'Institute C', 'Institute D']
+    assert elapsed < 4 * LATENCY
+    with open(tmp_path / 'ror.json', encoding='utf-8') as f:
+        assert len(json.load(f)['entries']) == 4
@@ -0,0 +1,186 @@
+"""
+Whole-word topic matching for the physics, detector and theory/experiment
+figures: TopicMatrix flags, per talk, every keyword its title and abstract
+mention, and the figures aggregate the flags per year.
+"""
+
+from lazy_imports import lazy_module
+from talk_table import TALK_TYPES
+from talk_tokens import field_tokens, tokenize
+
+np = lazy_module('numpy')
+
+# Physics categories of analyze_physics_evolution
+PHYSICS_CATEGORIES = {
+    'QGP Properties': ['qgp', 'temperature', 'viscosity', 'eos', 'equation of state'],
+    'Heavy Flavor': ['charm', 'bottom', 'quarkonia', 'quarkonium', 'j/psi', 'upsilon'],
+    'Jets': ['jet', 'energy loss', 'quenching', 'high-pt', 'high pt'],
+    'Flow': ['flow', 'harmonic', 'collective', 'azimuthal', 'anisotropy'],
+    'Small Systems': ['small system', 'pp', 'p-p', 'p-pb', 'p-a'],
+    'EM Probes': ['photon', 'dilepton', 'electromagnetic'],
+    'Future Facilities': ['future', 'upgrade', 'sphenix', 'eic', 'electron-ion', 'fair', 'nica'],
+    'Machine Learning': ['machine learning', 'deep learning', 'neural', 'ai', 'artificial intelligence']
+}
+
+# Detectors/experiments of create_detector_focus_plot
+DETECTORS = {
+    'ALICE': ['alice'],
+    'ATLAS': ['atlas'],
+    'CMS': ['cms'],
+    'STAR': ['star'],
+    'PHENIX': ['phenix'],
+    'sPHENIX': ['sphenix'],
+    'HADES': ['hades'],
+    'CBM': ['cbm'],
+    'NA61': ['na61', 'shine'],
+    'LHCb': ['lhcb'],
+    'NICA': ['nica'],
+    'EIC': ['eic', 'electron-ion']
+}
+
+# Keywords that indicate theoretical or experimental work
+THEORY_KEYWORDS = [
+    'theory', 'theoretical', 'model', 'models', 'simulation', 'simulations',
+    'calculation', 'calculations', 'lattice', 'qcd', 'effective field theory',
+    'eft', 'hydrodynamic', 'hydro', 'transport', 'monte carlo', 'perturbative',
+    'non-perturbative', 'framework', 'approach', 'formalism', 'equation of state',
+    'eos', 'viscosity', 'predict', 'prediction', 'predicted', 'microscopic'
+]
+
+EXPERIMENT_KEYWORDS = [
+    'experiment', 'experimental', 'measurement', 'measurements', 'data',
+    'results', 'observed', 'observation', 'detector', 'detectors', 'measured',
+    'alice', 'atlas', 'cms', 'lhcb', 'star', 'phenix', 'brahms', 'phobos',
+    'reconstruction', 'trigger', 'calibration', 'analysis', 'beam', 'collision'
+]
+
+
+def topic_keywords():
+    """All keywords of the topic tables, in table order"""
+    keywords = []
+    for table in (PHYSICS_CATEGORIES, DETECTORS):
+        for group in table.values():
+            keywords.extend(group)
+    return keywords + THEORY_KEYWORDS + EXPERIMENT_KEYWORDS
+
+
+class TopicMatcher:
+    """
+    Token trie over a set of keywords, matched on whole tokens.
+
+    Each distinct normalised keyword is one column; keywords that normalise
+    to the same tokens ('model' and 'models') share it.
+
+    Parameters:
+    - keywords: Iterable of keyword strings
+    """
+
+    def __init__(self, keywords):
+        self.columns = {}  # normalised keyword -> column
+        self._trie = {}
+        for keyword in keywords:
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            phrase = ' '.join(tokens)
+            if phrase in self.columns:
+                continue
+            column = len(self.columns)
+            self.columns[phrase] = column
+
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, ({}, []))
+                node, ends = node
+            ends.append(column)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def column(self, keyword):
+        """Column of keyword; KeyError if it was not compiled into the matcher"""
+        return self.columns[' '.join(tokenize(keyword))]
+
+    def match(self, tokens, found):
+        """Add the columns of all keywords occurring in the token list tokens to the set found"""
+        trie = self._trie
+        for start, token in enumerate(tokens):
+            entry = trie.get(token)
+            position = start + 1
+            while entry is not None:
+                children, ends = entry
+                found.update(ends)
+                if position == len(tokens) or not children:
+                    break
+                entry = children.get(tokens[position])
+                position += 1
+        return found
+
+
+class TopicMatrix:
+    """
+    Talks x keywords boolean matrix of the titles and abstracts.
+
+    Rows follow the order of conference_data and, within a year, of
+    talk_types.
+
+    Parameters:
+    - conference_data: Dictionary of year -> talk type -> list of talks
+    - talk_types: Talk types to include
+    - keywords: Keywords to match (default: all keywords of the topic tables)
+    """
+
+    def __init__(self, conference_data, talk_types=TALK_TYPES, keywords=None):
+        self.years = list(conference_data.keys())
+        self.matcher = TopicMatcher(topic_keywords() if keywords is None else keywords)
+
+        rows, year_codes, has_text = [], [], []
+        for code, year in enumerate(self.years):
+            for talk_type in talk_types:
+                for talk in conference_data[year].get(talk_type) or []:
+                    found = set()
+                    text = False
+                    for field in ('Title', 'Abstract'):
+                        tokens = field_tokens(talk, field)
+                        if tokens:
+                            text = True
+                            self.matcher.match(tokens, found)
+                    rows.append(found)
+                    year_codes.append(code)
+                    has_text.append(text)
+
+        self.matrix = np.zeros((len(rows), len(self.matcher)), dtype=bool)
+        for row, columns in enumerate(rows):
+            if columns:
+                self.matrix[row, list(columns)] = True
+        self.year_codes = np.array(year_codes, dtype=np.int32)
+        self.has_text = np.array(has_text, dtype=bool)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def _columns(self, keywords):
+        return sorted({self.matcher.column(keyword) for keyword in keywords})
+
+    def mentions(self, keywords):
+        """Boolean array: talks mentioning at least one of keywords"""
+        return self.matrix[:, self._columns(keywords)].any(axis=1)
+
+    def scores(self, keywords):
+        """Integer array: number of distinct keywords each talk mentions"""
+        return self.matrix[:, self._columns(keywords)].sum(axis=1)
+
+    def per_year(self, values, years=None):
+        """
+        Sum of a per-talk array for each year (of years, default: all years
+        in conference_data order); a boolean array gives talk counts.
+        """
+        totals = np.bincount(self.year_codes, weights=np.asarray(values, dtype=float), minlength=len(self.years))
+        if years is None:
+            return totals
+        positions = {year: code for code, year in enumerate(self.years)}
+        return np.array([totals[positions[year]] if year in positions else 0 for year in years])
+
+    def talks_per_year(self, years=None, with_text=False):
+        """Number of talks per year; with_text only counts talks with a title or abstract"""
+        return self.per_year(self.has_text if with_text else np.ones(len(self), dtype=bool), years)
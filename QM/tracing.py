@@ -0,0 +1,399 @@
+"""
+Stage timing and tracing for the fetch and analysis pipelines.
+
+Stages are wrapped in spans:
+
+    with span('save', items=len(talks)):
+        save_processed_data(conference_data)
+
+A span records wall time, CPU time, peak resident memory and an item count.
+Helpers called once per contribution are wrapped with timed()/timed_iter(),
+which only add their call count and time to the enclosing span and to a
+per-name total, and cost nothing while tracing is off.
+
+Tracing is off unless QM_TRACE names an output file (or enable() is called).
+export_trace() then writes either a JSON summary or, for file names ending
+in .trace.json, a Chrome trace (chrome://tracing, https://ui.perfetto.dev).
+
+Progress messages of spans go to the 'qm' logger; QM_LOG_LEVEL (DEBUG, INFO,
+WARNING, ...) sets how much of it is shown. At DEBUG every finished span is
+logged with its timings.
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACE_ENV = 'QM_TRACE'
+LOG_LEVEL_ENV = 'QM_LOG_LEVEL'
+
+log = logging.getLogger('qm')
+
+
+def configure_logging(level=None):
+    """
+    Send 'qm' log messages to stdout, without decoration, like the prints
+    they replace. Does nothing if the logger already has a handler.
+
+    Parameters:
+    - level: Log level name or number (default: QM_LOG_LEVEL, else INFO)
+    """
+    if log.handlers:
+        return
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV, 'INFO')
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(handler)
+    log.setLevel(level)
+    log.propagate = False
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+class Span:
+    """
+    One timed stage. Created by Tracer.span; item counts may be added while
+    the span is open.
+
+    Attributes:
+    - name, category: Labels of the stage
+    - start: Wall-clock start (seconds since the epoch)
+    - wall, cpu: Elapsed wall and CPU seconds (set when the span ends)
+    - peak_rss_mb: Peak resident memory of the process at the end of the span
+    - items: Number of items processed, or None
+    - timers: timed() name -> [calls, wall seconds, cpu seconds] inside this span
+    - args: Further values shown with the span
+    """
+
+    __slots__ = ('name', 'category', 'start', 'wall', 'cpu', 'peak_rss_mb', 'items', 'timers', 'args',
+                 'pid', 'tid', 'depth', '_perf', '_cpu')
+
+    def __init__(self, name, category='stage', items=None, args=None):
+        self.name = name
+        self.category = category
+        self.items = items
+        self.args = dict(args or {})
+        self.timers = {}
+        self.wall = self.cpu = self.peak_rss_mb = None
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.depth = 0
+
+    def add_items(self, count=1):
+        self.items = (self.items or 0) + count
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'category': self.category,
+            'start': self.start,
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'peak_rss_mb': self.peak_rss_mb,
+            'items': self.items,
+            'depth': self.depth,
+            'pid': self.pid,
+            'tid': self.tid,
+            'timers': {name: _timer_dict(timer) for name, timer in self.timers.items()},
+            'args': self.args,
+        }
+
+
+def _timer_dict(timer):
+    calls, wall, cpu = timer
+    return {'calls': calls, 'wall': wall, 'cpu': cpu}
+
+
+class Tracer:
+    """
+    Collects finished spans and per-name timer totals.
+
+    Parameters:
+    - enabled: Record spans and timers (spans are still timed and logged
+      when False)
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = []
+        self.timers = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, items=None, category='stage', level=logging.DEBUG, **args):
+        """
+        Time the enclosed block.
+
+        Parameters:
+        - name: Stage name
+        - items: Number of items the stage handles (can also be added with
+          Span.add_items)
+        - category: Group of the span in the trace (e.g. 'stage', 'figure')
+        - level: Log level of the start message; the timing line is always
+          logged at DEBUG
+        - args: Further values recorded with the span
+
+        Yields:
+        - The Span
+        """
+        configure_logging()
+        record = Span(name, category, items, args)
+        stack = self._stack()
+        record.depth = len(stack)
+        log.log(level, "%s...", name)
+
+        stack.append(record)
+        record.start = time.time()
+        record._perf = time.perf_counter()
+        record._cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - record._perf
+            record.cpu = time.process_time() - record._cpu
+            record.peak_rss_mb = peak_rss_mb()
+            stack.pop()
+            self._finish(record)
+
+    def record_span(self, name, start, wall, cpu=None, peak_rss_mb=None, items=None, category='stage',
+                    pid=None, **args):
+        """
+        Add a span measured elsewhere, e.g. in a worker process.
+
+        Parameters:
+        - start: Wall-clock start (seconds since the epoch)
+        - wall, cpu: Elapsed wall and CPU seconds
+        - peak_rss_mb: Peak resident memory of the measuring process
+        - pid: Process the span ran in (default: this one)
+        """
+        record = Span(name, category, items, args)
+        record.start = start
+        record.wall = wall
+        record.cpu = cpu
+        record.peak_rss_mb = peak_rss_mb
+        if pid is not None:
+            record.pid = record.tid = pid
+        record.depth = len(self._stack())
+        self._finish(record)
+        return record
+
+    def _finish(self, record):
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s", format_span(record))
+        if self.enabled:
+            with self._lock:
+                self.spans.append(record)
+
+    def add_time(self, name, wall, cpu, calls=1):
+        """Add one timed() call to the totals and to the innermost open span"""
+        stack = self._stack()
+        with self._lock:
+            _accumulate(self.timers, name, calls, wall, cpu)
+            if stack:
+                _accumulate(stack[-1].timers, name, calls, wall, cpu)
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+            self.timers = {}
+
+    def summary(self):
+        """JSON-ready dictionary of all spans and timer totals"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda record: record.start)
+            timers = dict(self.timers)
+        return {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'argv': sys.argv,
+            'spans': [record.as_dict() for record in spans],
+            'timers': {name: _timer_dict(timer) for name, timer in timers.items()},
+        }
+
+    def chrome_trace(self):
+        """Spans as Chrome trace events ("X" complete events, times in microseconds)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda record: record.start)
+            timers = dict(self.timers)
+        events = []
+        for record in spans:
+            args = dict(record.args)
+            args.update(cpu_ms=_ms(record.cpu), peak_rss_mb=record.peak_rss_mb)
+            if record.items is not None:
+                args['items'] = record.items
+            for name, (calls, wall, cpu) in record.timers.items():
+                args[name] = {'calls': calls, 'wall_ms': _ms(wall), 'cpu_ms': _ms(cpu)}
+            events.append({
+                'name': record.name,
+                'cat': record.category,
+                'ph': 'X',
+                'ts': record.start * 1e6,
+                'dur': record.wall * 1e6,
+                'pid': record.pid,
+                'tid': record.tid,
+                'args': args,
+            })
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {name: _timer_dict(timer) for name, timer in timers.items()},
+        }
+
+    def export(self, path, format=None):
+        """
+        Write the trace to a file.
+
+        Parameters:
+        - path: Output file
+        - format: 'json' (summary) or 'chrome'; default: 'chrome' for names
+          ending in .trace.json, else 'json'
+        """
+        if format is None:
+            format = 'chrome' if path.endswith('.trace.json') else 'json'
+        data = self.chrome_trace() if format == 'chrome' else self.summary()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+        return path
+
+
+def _accumulate(timers, name, calls, wall, cpu):
+    timer = timers.get(name)
+    if timer is None:
+        timers[name] = [calls, wall, cpu]
+    else:
+        timer[0] += calls
+        timer[1] += wall
+        timer[2] += cpu
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def format_span(record):
+    """One-line timing summary of a finished span"""
+    parts = [f"{record.wall:.2f}s wall"]
+    if record.cpu is not None:
+        parts.append(f"{record.cpu:.2f}s cpu")
+    if record.peak_rss_mb is not None:
+        parts.append(f"peak {record.peak_rss_mb:.0f} MB")
+    if record.items is not None:
+        parts.append(f"{record.items} items")
+    for name, (calls, wall, _) in record.timers.items():
+        parts.append(f"{name} {wall:.2f}s/{calls}")
+    return f"[{record.name}] " + ", ".join(parts)
+
+
+_tracer = Tracer(enabled=bool(os.environ.get(TRACE_ENV)))
+
+
+def get_tracer():
+    """The process-wide Tracer"""
+    return _tracer
+
+
+def enable(enabled=True):
+    """Start (or stop) recording spans in the process-wide tracer"""
+    _tracer.enabled = enabled
+
+
+def span(name, items=None, category='stage', level=logging.DEBUG, **args):
+    """Span of the process-wide tracer (see Tracer.span)"""
+    return _tracer.span(name, items=items, category=category, level=level, **args)
+
+
+def stage(name, items=None, **args):
+    """Span whose start message is logged at INFO, for the main pipeline stages"""
+    return _tracer.span(name, items=items, level=logging.INFO, **args)
+
+
+def timed(name):
+    """
+    Decorator adding the calls of a function to the timer name; a plain
+    call while tracing is off.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return function(*args, **kwargs)
+            perf, cpu = time.perf_counter(), time.process_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _tracer.add_time(name, time.perf_counter() - perf, time.process_time() - cpu)
+        return wrapper
+    return decorator
+
+
+def timed_iter(iterable, name):
+    """
+    Iterate over iterable, adding the time spent producing each item to the
+    timer name (e.g. decoding a streamed export); the iterable itself while
+    tracing is off.
+    """
+    if not _tracer.enabled:
+        return iterable
+    return _timed_iter(iter(iterable), name)
+
+
+def _timed_iter(iterator, name):
+    while True:
+        perf, cpu = time.perf_counter(), time.process_time()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            _tracer.add_time(name, time.perf_counter() - perf, time.process_time() - cpu, calls=0)
+            return
+        _tracer.add_time(name, time.perf_counter() - perf, time.process_time() - cpu)
+        yield item
+
+
+def export_trace(path=None, format=None):
+    """
+    Write the process-wide trace if tracing is on.
+
+    Parameters:
+    - path: Output file (default: QM_TRACE)
+    - format: See Tracer.export
+
+    Returns:
+    - The path written, or None
+    """
+    path = path or os.environ.get(TRACE_ENV)
+    if not _tracer.enabled or not path:
+        return None
+    _tracer.export(path, format)
+    log.info("Trace written to %s", path)
+    return path